@@ -0,0 +1,224 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from precompare import MATCHED, PARTIALLY_MATCHED
+
+
+# Local analytics database behind the Performance dashboard; empty disables recording
+PIPELINE_ANALYTICS_DB = os.environ.get(
+    "PIPELINE_ANALYTICS_DB", os.path.join(tempfile.gettempdir(), "audio-analysis-analytics.sqlite")
+)
+_default_analytics_store = None
+
+UNKNOWN_AGENT = "unknown"
+
+# Counters kept per call and summed into every rollup
+COUNTERS = (
+    "calls", "completed", "rejected", "questions",
+    "asked_properly", "asked", "not_asked",
+    "matched", "partially_matched", "not_matched",
+    "wall_seconds", "model_calls", "prompt_tokens", "output_tokens",
+)
+
+_QUALITY_COUNTERS = {"asked properly": "asked_properly", "asked": "asked", "not asked": "not_asked"}
+_SEMANTIC_COUNTERS = {MATCHED: "matched", PARTIALLY_MATCHED: "partially_matched", "not matched": "not_matched"}
+
+_COUNTER_COLUMNS = ", ".join(
+    f"{name} {'REAL' if name == 'wall_seconds' else 'INTEGER'} NOT NULL DEFAULT 0" for name in COUNTERS
+)
+
+
+def call_counters(final: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Per-call counters from a final output
+
+    Every question of the final output is ``[agent, ai, asked, semantic]``; a
+    call rejected by the pre-filter carries ``{"status": "rejected"}`` under
+    "summary" and counts no questions as asked or compared.
+    """
+    counters = dict.fromkeys(COUNTERS, 0)
+    counters["calls"] = 1
+    summary = final.get("summary") if isinstance(final.get("summary"), dict) else {}
+    counters["rejected" if summary.get("status") == "rejected" else "completed"] = 1
+    for section_key, section in final.items():
+        if section_key == "summary" or not isinstance(section, dict):
+            continue
+        for values in section.values():
+            counters["questions"] += 1
+            if not isinstance(values, list) or len(values) < 4:
+                continue
+            quality = _QUALITY_COUNTERS.get(str(values[2]).strip().lower())
+            semantic = _SEMANTIC_COUNTERS.get(str(values[3]).strip().lower())
+            if quality:
+                counters[quality] += 1
+            if semantic:
+                counters[semantic] += 1
+    return counters
+
+
+class AnalyticsStore:
+    """
+    SQLite store of per-call results with incrementally maintained rollups
+
+    Each recorded call keeps its final output, evaluation and comparison
+    summaries and timings in ``calls``; the same transaction adds its counters
+    to ``agent_rollups``, ``daily_rollups`` (agent, local day) and
+    ``hourly_rollups`` (agent, hour of day). Dashboards read only the rollups,
+    so their cost depends on the number of agents and days, not calls.
+    Recording a call id again replaces the earlier record and its
+    contribution. Safe to share between threads and processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS calls ("
+                " call_id TEXT PRIMARY KEY, agent TEXT NOT NULL, day TEXT NOT NULL, hour INTEGER NOT NULL,"
+                f" recorded_at REAL NOT NULL, {_COUNTER_COLUMNS},"
+                " evaluation_summary TEXT, comparison_summary TEXT, final_output TEXT NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS calls_agent_day ON calls (agent, day);"
+                f"CREATE TABLE IF NOT EXISTS agent_rollups (agent TEXT PRIMARY KEY, {_COUNTER_COLUMNS});"
+                f"CREATE TABLE IF NOT EXISTS daily_rollups (agent TEXT NOT NULL, day TEXT NOT NULL, {_COUNTER_COLUMNS},"
+                " PRIMARY KEY (agent, day));"
+                f"CREATE TABLE IF NOT EXISTS hourly_rollups (agent TEXT NOT NULL, hour INTEGER NOT NULL, {_COUNTER_COLUMNS},"
+                " PRIMARY KEY (agent, hour));"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record_call(self, call_id: str, agent: Optional[str], final: Dict[str, Any],
+                    evaluation: Optional[Dict[str, Any]] = None, comparison: Optional[Dict[str, Any]] = None,
+                    metrics: Optional[Dict[str, Any]] = None, wall_seconds: Optional[float] = None,
+                    recorded_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Record one call and add it to the rollups
+
+        Args:
+            call_id: Stable id of the call; recording it again replaces the earlier record
+            agent: Agent the call is attributed to
+            final: The call's final output
+            evaluation: Optional evaluation output (its "summary" is kept)
+            comparison: Optional comparison output (its "summary" is kept)
+            metrics: Optional telemetry record from process_audio (result["metrics"])
+            wall_seconds: Processing time when no telemetry record is available
+            recorded_at: Epoch time of the call (defaults to the telemetry start, else now)
+
+        Returns:
+            The call's counters
+        """
+        agent = agent or UNKNOWN_AGENT
+        counters = call_counters(final)
+        totals = (metrics or {}).get("totals", {})
+        for name in ("model_calls", "prompt_tokens", "output_tokens"):
+            counters[name] = int(totals.get(name, 0))
+        counters["wall_seconds"] = float((metrics or {}).get("wall_seconds", wall_seconds or 0.0))
+        recorded_at = recorded_at or (metrics or {}).get("started_at") or time.time()
+        local = time.localtime(recorded_at)
+        day, hour = time.strftime("%Y-%m-%d", local), local.tm_hour
+
+        def summary_json(output):
+            summary = output.get("summary") if isinstance(output, dict) else None
+            return json.dumps(summary, ensure_ascii=False) if summary is not None else None
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = conn.execute("SELECT * FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+                if previous is not None:
+                    self._apply(conn, previous["agent"], previous["day"], previous["hour"],
+                                {name: previous[name] for name in COUNTERS}, -1)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO calls (call_id, agent, day, hour, recorded_at, {', '.join(COUNTERS)},"
+                    " evaluation_summary, comparison_summary, final_output)"
+                    f" VALUES ({', '.join('?' * (8 + len(COUNTERS)))})",
+                    (call_id, agent, day, hour, recorded_at, *(counters[name] for name in COUNTERS),
+                     summary_json(evaluation), summary_json(comparison), json.dumps(final, ensure_ascii=False))
+                )
+                self._apply(conn, agent, day, hour, counters, 1)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return counters
+
+    def record_result(self, call_id: str, agent: Optional[str], result: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a process_audio result dict"""
+        return self.record_call(call_id, agent, result["final"], evaluation=result.get("evaluation"),
+                                comparison=result.get("comparison"), metrics=result.get("metrics"))
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, agent: str, day: str, hour: int,
+               counters: Dict[str, Any], sign: int) -> None:
+        values = [sign * counters[name] for name in COUNTERS]
+        updates = ", ".join(f"{name} = {name} + excluded.{name}" for name in COUNTERS)
+        placeholders = ", ".join("?" * len(COUNTERS))
+        for table, keys, key_values in (
+            ("agent_rollups", ("agent",), (agent,)),
+            ("daily_rollups", ("agent", "day"), (agent, day)),
+            ("hourly_rollups", ("agent", "hour"), (agent, hour)),
+        ):
+            conn.execute(
+                f"INSERT INTO {table} ({', '.join(keys)}, {', '.join(COUNTERS)})"
+                f" VALUES ({', '.join('?' * len(keys))}, {placeholders})"
+                f" ON CONFLICT({', '.join(keys)}) DO UPDATE SET {updates}",
+                (*key_values, *values)
+            )
+
+    def _rollup(self, table: str, group: Optional[str], agent: Optional[str], where: str = "",
+                params: tuple = ()) -> List[Dict[str, Any]]:
+        sums = ", ".join(f"SUM({name}) AS {name}" for name in COUNTERS)
+        clauses = ([where] if where else []) + (["agent = ?"] if agent is not None else [])
+        query = f"SELECT {group + ', ' if group else ''}{sums} FROM {table}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        if group:
+            alias = group.split(" AS ")[-1]
+            query += f" GROUP BY {alias} ORDER BY {alias}"
+        with self._connect() as conn:
+            rows = conn.execute(query, (*params, *((agent,) if agent is not None else ()))).fetchall()
+        return [{key: (row[key] or 0) for key in row.keys()} for row in rows]
+
+    def agents(self) -> List[str]:
+        """Agents with at least one recorded call"""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT agent FROM agent_rollups WHERE calls > 0 ORDER BY agent")]
+
+    def totals(self, agent: Optional[str] = None) -> Dict[str, Any]:
+        """Summed counters for one agent, or all agents if None"""
+        return self._rollup("agent_rollups", None, agent)[0]
+
+    def daily(self, agent: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Counters per day (``YYYY-MM-DD``), optionally from ``since`` on"""
+        return self._rollup("daily_rollups", "day", agent, "day >= ?" if since else "", (since,) if since else ())
+
+    def monthly(self, agent: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Counters per month (``YYYY-MM``), summed from the daily rollups"""
+        return self._rollup("daily_rollups", "substr(day, 1, 7) AS month", agent)
+
+    def hourly(self, agent: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Counters per local hour of day (0-23)"""
+        return self._rollup("hourly_rollups", "hour", agent)
+
+
+def get_default_analytics_store() -> Optional[AnalyticsStore]:
+    """Return the process-wide analytics store, or None if PIPELINE_ANALYTICS_DB is empty"""
+    global _default_analytics_store
+    if _default_analytics_store is None and PIPELINE_ANALYTICS_DB:
+        _default_analytics_store = AnalyticsStore(PIPELINE_ANALYTICS_DB)
+    return _default_analytics_store
@@ -1,10 +1,23 @@
+import datetime
 import json
+import math
+import mimetypes
+import os
+import subprocess
+import threading
 import time
-import tempfile
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 import streamlit as st
 import pandas as pd
-from dummy_processor import run_pipeline
+from audio_preprocess import ffmpeg_available, parse_timestamp
+from columnar_export import final_output_table, parquet_bytes
+from pipeline_jobs import PipelineJobExecutor
+from pipeline_pool import get_default_pool
+from result_cache import sha256_file
+from analytics_store import get_default_analytics_store
+from artifact_store import get_default_artifact_store
 
 st.set_page_config(
     page_title="YBrantWorks • Conversation Intelligence",
@@ -111,17 +124,23 @@ def _init_state():
     """Initialize session state variables"""
     for k, v in {
         "step": "landing",
+        "session_id": uuid.uuid4().hex,  # owner of this session's uploads and outputs in the artifact store
         "audio_file": None,
         "json_file_1": None,
         "json_file_2": None,
         "audio_path": None,
+        "audio_hash": None,
         "json_path_1": None,
         "json_path_2": None,
         "transcription_path": None,
         "analysis_path": None,
+        "analysis_hash": None,
         "transcription_raw": None,
         "analysis_raw": None,
+        "output_dir": None,
+        "job_id": None,
         "show_matrix": False,
+        "analytics_warning": None,
         "show_login": False,
         "authenticated": False,
         "username": "",
@@ -131,44 +150,255 @@ def _init_state():
 
 _init_state()
 
-def _save_temp(uploaded_file, suffix: str) -> Path:
-    """Save uploaded file to temporary location"""
+@st.cache_resource
+def _artifact_store():
+    """Disk store for uploads and pipeline outputs, with quota and eviction"""
+    return get_default_artifact_store()
+
+@st.cache_resource
+def _analytics_store():
+    """Per-call results and rollups behind the Performance dashboard (None if disabled)"""
+    return get_default_analytics_store()
+
+@st.cache_resource
+def _pipeline_pool():
+    """Warm pipelines shared by every session and rerun"""
+    return get_default_pool()
+
+@st.cache_resource
+def _job_executor():
+    """Background pipeline jobs shared by every session; sessions keep only the job id"""
+    return PipelineJobExecutor(max_workers=4)
+
+# Keep this session's uploads and runs safe from eviction while it is open
+if time.time() - st.session_state.get("artifacts_seen_at", 0) > 60:
+    _artifact_store().touch_session(st.session_state.session_id)
+    st.session_state.artifacts_seen_at = time.time()
+
+@st.fragment(run_every=1.0)
+def _job_progress():
+    """Poll the session's job and show its real stage progress; reruns the app when it ends"""
+    job = _job_executor().get(st.session_state.job_id) if st.session_state.job_id else None
+    if job is None:
+        # Lost (expired or server restarted): submit again, resuming from checkpoints
+        st.session_state.job_id = None
+        st.rerun()
+    st.progress(job.progress)
+    st.text(f"🔄 {job.message}")
+    if job.completed_stages:
+        st.caption(" • ".join(f"✅ {stage} ({job.stage_seconds[stage]:.1f}s)" for stage in job.completed_stages))
+    if job.finished:
+        st.rerun()
+    # Early results while the remaining stages run
+    if "transcription" not in job.outputs and job.partial_transcript:
+        with st.expander(f"📋 Transcript (streaming, {len(job.partial_transcript)} segments so far)", expanded=True):
+            st.dataframe(
+                _generate_transcript_table({"Call Details": {"Transcript": job.partial_transcript}}),
+                use_container_width=True, hide_index=True
+            )
+    if "transcription" in job.outputs:
+        with st.expander("📋 Transcript (ready)", expanded=True):
+            tdf = _generate_transcript_table(job.outputs["transcription"])
+            if not tdf.empty:
+                st.dataframe(tdf, use_container_width=True, hide_index=True)
+            else:
+                st.info("No transcript segments found.")
+    if "evaluation" in job.outputs:
+        with st.expander("🎯 Agent Evaluation (ready)"):
+            st.json(job.outputs["evaluation"])
+
+# Memory the shared recording cache may hold per replica; larger recordings are read per rerun
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get("PIPELINE_AUDIO_CACHE_BYTES", 256 * 1024 * 1024))
+
+@st.cache_resource
+def _audio_cache():
+    """Recording bytes by content hash (least recently used first) and the lock guarding them"""
+    return OrderedDict(), threading.Lock()
+
+def _audio_bytes(audio_hash: str, audio_path: str) -> bytes:
+    """
+    Recording bytes read once per content hash and shared by every rerun and session
+
+    The cache is bounded by AUDIO_CACHE_MAX_BYTES rather than a number of
+    recordings. st.audio registers the bytes with Streamlit's media endpoint,
+    which serves HTTP Range requests, so the browser seeks without another
+    full download.
+    """
+    cache, lock = _audio_cache()
+    with lock:
+        if audio_hash in cache:
+            cache.move_to_end(audio_hash)
+            return cache[audio_hash]
+    with open(audio_path, "rb") as f:
+        data = f.read()
+    if len(data) <= AUDIO_CACHE_MAX_BYTES:
+        with lock:
+            cache[audio_hash] = data
+            total = sum(len(value) for value in cache.values())
+            while total > AUDIO_CACHE_MAX_BYTES:
+                total -= len(cache.popitem(last=False)[1])
+    return data
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _segment_clip(audio_hash: str, _audio_path: str, start_time: float, end_time: float) -> bytes:
+    """One transcript segment cut out of the recording as a small MP3 (needs ffmpeg)"""
+    return subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error",
+         "-ss", f"{start_time:.3f}", "-i", _audio_path, "-t", f"{end_time - start_time:.3f}",
+         "-vn", "-ac", "1", "-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3", "pipe:1"],
+        capture_output=True, check=True
+    ).stdout
+
+def _audio_player(start_time=None, end_time=None):
+    """Audio player for the session's recording, optionally limited to one segment"""
+    if not st.session_state.audio_hash:
+        st.session_state.audio_hash = sha256_file(st.session_state.audio_path)
+    audio_path = str(st.session_state.audio_path)
+    if start_time is not None and end_time is not None and ffmpeg_available():
+        # Only the segment reaches memory and the browser
+        st.audio(_segment_clip(st.session_state.audio_hash, audio_path, start_time, end_time), format="audio/mp3")
+        return
+    st.audio(
+        _audio_bytes(st.session_state.audio_hash, audio_path),
+        format=mimetypes.guess_type(audio_path)[0] or "audio/wav",
+        start_time=start_time or 0,
+        end_time=end_time
+    )
+
+def _segment_times(segment):
+    """(start, end) seconds of a transcript table row, or None without a usable Start"""
+    start, end = parse_timestamp(segment.get("Start")), parse_timestamp(segment.get("End"))
+    if start is None:
+        return None
+    return math.floor(start[0]), (math.ceil(end[0]) if end is not None and end[0] > start[0] else None)
+
+def _save_upload(uploaded_file, suffix: str):
+    """Stream an uploaded file into the artifact store for this session; returns (path, sha256)"""
     ext = Path(uploaded_file.name).suffix or suffix
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
-    tmp.write(uploaded_file.getvalue())
-    tmp.flush()
-    tmp.close()
-    return Path(tmp.name)
+    path, sha256 = _artifact_store().save_upload(uploaded_file, ext, session_id=st.session_state.session_id,
+                                                 label=uploaded_file.name)
+    return Path(path), sha256
+
+def _rate(part, whole):
+    return part / whole if whole else 0.0
+
+def _performance_dashboard(analytics, agent=None):
+    """KPIs and trends for one agent (or all) read from the analytics rollups"""
+    totals = analytics.totals(agent)
+    calls, questions = totals["calls"], totals["questions"]
+    compared = totals["matched"] + totals["partially_matched"] + totals["not_matched"]
+    avg_seconds = _rate(totals["wall_seconds"], calls)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label="📞 Total Calls", value=f"{calls:,}")
+    with col2:
+        st.metric(label="✅ Completed Calls", value=f"{totals['completed']:,}",
+                  delta=f"{_rate(totals['completed'], calls):.1%} completion rate", delta_color="off")
+    with col3:
+        st.metric(label="⏱️ Avg Processing Time", value=f"{int(avg_seconds // 60)}m {int(avg_seconds % 60)}s")
+    with col4:
+        st.metric(label="🚫 Rejected Recordings", value=f"{totals['rejected']:,}")
+
+    st.markdown("---")
+
+    col5, col6, col7, col8 = st.columns(4)
+    with col5:
+        st.metric(label="🎯 Asked Properly", value=f"{_rate(totals['asked_properly'], questions):.0%}")
+    with col6:
+        st.metric(label="📋 Question Coverage",
+                  value=f"{_rate(totals['asked_properly'] + totals['asked'], questions):.0%}")
+    with col7:
+        st.metric(label="🤝 Answers Matched", value=f"{_rate(totals['matched'], compared):.0%}")
+    with col8:
+        st.metric(label="❌ Answers Not Matched", value=f"{_rate(totals['not_matched'], compared):.0%}")
+
+    st.markdown("---")
+
+    week_start = (datetime.date.today() - datetime.timedelta(days=6)).isoformat()
+    daily = pd.DataFrame(analytics.daily(agent, since=week_start))
+    col_chart1, col_chart2 = st.columns(2)
+    with col_chart1:
+        st.markdown("#### 📈 Daily Calls Trend (Last 7 Days)")
+        if not daily.empty:
+            st.line_chart(daily.set_index("day")[["calls"]])
+    with col_chart2:
+        st.markdown("#### 🤝 Match Rate Trend (Last 7 Days)")
+        if not daily.empty:
+            compared_daily = daily[["matched", "partially_matched", "not_matched"]].sum(axis=1)
+            st.line_chart(pd.DataFrame({
+                "day": daily["day"],
+                "Match Rate": (daily["matched"] / compared_daily.where(compared_daily > 0)).fillna(0.0)
+            }).set_index("day"))
+
+    st.markdown("---")
+
+    st.markdown("#### 📊 Monthly Performance Comparison")
+    monthly = pd.DataFrame(analytics.monthly(agent))
+    if not monthly.empty:
+        monthly_compared = monthly[["matched", "partially_matched", "not_matched"]].sum(axis=1)
+        st.dataframe(pd.DataFrame({
+            "Month": monthly["month"],
+            "Calls Completed": monthly["completed"],
+            "Asked Properly %": (100 * monthly["asked_properly"] / monthly["questions"].where(monthly["questions"] > 0)).round(1),
+            "Match Rate %": (100 * monthly["matched"] / monthly_compared.where(monthly_compared > 0)).round(1),
+        }).fillna(0.0), use_container_width=True, hide_index=True)
+
+    st.markdown("---")
+
+    col_hour1, col_hour2 = st.columns(2)
+    with col_hour1:
+        st.markdown("#### 🕐 Calls by Hour of Day")
+        hourly = pd.DataFrame(analytics.hourly(agent))
+        if not hourly.empty:
+            st.bar_chart(pd.DataFrame({
+                "Hour": hourly["hour"].map(lambda h: f"{h:02d}:00"), "Calls": hourly["calls"]
+            }).set_index("Hour"))
+    with col_hour2:
+        st.markdown("#### 🎯 Answer Comparison Distribution")
+        st.bar_chart(pd.DataFrame({
+            "Outcome": ["Matched", "Partially Matched", "Not Matched", "Not Available"],
+            "Count": [totals["matched"], totals["partially_matched"], totals["not_matched"], questions - compared]
+        }).set_index("Outcome"))
+
+MATRIX_COLUMNS = ["Section", "Question_no", "agent_recorded", "ai_finding", "agent_asked", "symantic"]
+SEMANTIC_COLORS = {"matched": "color: #10b981", "not matched": "color: #ef4444", "fuzzy match": "color: #f59e0b"}
 
 def _generate_matrix_table(analysis_json):
-    """Generate matrix table from analysis JSON"""
-    table_rows = []
-    for section_key, section_data in analysis_json.items():
-        if section_key == "summary":
-            continue
-        questions = section_data
-        for question_key, responses in questions.items():
-            if len(responses) >= 4:
-                row = {
-                    "Section": section_key,
-                    "Question_no": question_key,
-                    "agent_recorded": responses[0],
-                    "ai_finding": responses[1],
-                    "agent_asked": responses[2],
-                    "symantic": responses[3],
-                }
-            else:
-                row = {
-                    "Section": section_key,
-                    "Question_no": question_key,
-                    "agent_recorded": responses[0] if len(responses) > 0 else "Not Available",
-                    "ai_finding": responses[1] if len(responses) > 1 else "Not Available",
-                    "agent_asked": responses[2] if len(responses) > 2 else "Not Available",
-                    "symantic": responses[3] if len(responses) > 3 else "Not Available",
-                }
-            table_rows.append(row)
-    df = pd.DataFrame(table_rows)
-    return df
+    """Generate matrix table from analysis JSON in one pass (missing responses become Not Available)"""
+    padding = ["Not Available"] * 4
+    rows = [
+        (section_key, question_key, *(list(responses) + padding)[:4])
+        for section_key, questions in analysis_json.items() if section_key != "summary"
+        for question_key, responses in questions.items()
+    ]
+    return pd.DataFrame.from_records(rows, columns=MATRIX_COLUMNS)
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _matrix_for_artifact(artifact_hash: str, _analysis_path: str):
+    """
+    Matrix table and its CSV bytes for one final output, cached by content hash
+
+    cache_resource hands back the same objects without copying; callers must
+    not modify the DataFrame.
+    """
+    with open(_analysis_path, "r", encoding="utf-8") as f:
+        matrix_df = _generate_matrix_table(json.load(f))
+    return matrix_df, matrix_df.to_csv(index=False).encode("utf-8")
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _parquet_for_artifact(artifact_hash: str, call_id: str, agent, _final):
+    """
+    Parquet bytes of one final output, cached by content hash, call and agent
+
+    ``call_id`` is the run directory's name, the id analytics and the batch
+    export use for the same call.
+    """
+    return parquet_bytes(final_output_table(_final, call_id=call_id, agent=agent))
+
+def _semantic_colors(column: pd.Series) -> pd.Series:
+    """Column-wise styler colouring the semantic verdicts"""
+    return column.astype(str).str.lower().map(SEMANTIC_COLORS).fillna("")
 
 def _generate_transcript_table(transcription_json):
     """Build 2-column table from transcription JSON"""
@@ -196,8 +426,10 @@ def _generate_transcript_table(transcription_json):
         text = seg.get("Voice") or seg.get("Text") or seg.get("Utterance") or ""
         if isinstance(text, dict):
             text = text.get("content", "") or str(text)
-        rows.append({"Speaker": speaker, "Text": text})
-    return pd.DataFrame(rows, columns=["Speaker", "Text"])
+        timestamp = seg.get("Timestamp") if isinstance(seg.get("Timestamp"), dict) else {}
+        rows.append({"Speaker": speaker, "Start": timestamp.get("Start", ""), "End": timestamp.get("End", ""),
+                     "Text": text})
+    return pd.DataFrame(rows, columns=["Speaker", "Start", "End", "Text"])
 
 def _stepper():
     """Display progress stepper"""
@@ -338,7 +570,7 @@ elif st.session_state.step == "audio":
                 st.rerun()
         with col2:
             if st.button("Next ➡️", use_container_width=True):
-                st.session_state.audio_path = _save_temp(audio_file, ".m4a")
+                st.session_state.audio_path, st.session_state.audio_hash = _save_upload(audio_file, ".m4a")
                 st.session_state.step = "json1"
                 st.rerun()
 
@@ -359,7 +591,7 @@ elif st.session_state.step == "json1":
                 st.rerun()
         with col2:
             if st.button("Next ➡️", use_container_width=True):
-                st.session_state.json_path_1 = _save_temp(json_file_1, ".json")
+                st.session_state.json_path_1, _ = _save_upload(json_file_1, ".json")
                 st.session_state.step = "json2"
                 st.rerun()
 
@@ -380,7 +612,7 @@ elif st.session_state.step == "json2":
                 st.rerun()
         with col2:
             if st.button("Process All Files ➡️", use_container_width=True):
-                st.session_state.json_path_2 = _save_temp(json_file_2, ".json")
+                st.session_state.json_path_2, _ = _save_upload(json_file_2, ".json")
                 st.session_state.step = "ready"
                 st.rerun()
 
@@ -410,48 +642,71 @@ elif st.session_state.step == "processing":
     _stepper()
     _display_logo()
     st.markdown('<h2 style="color: #dc2626;">⚙️ Processing...</h2>', unsafe_allow_html=True)
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    try:
-        status_text.text("📤 Uploading files...")
-        progress_bar.progress(20)
-        time.sleep(0.5)
-        status_text.text("🔄 Crunching the Conversation...")
-        progress_bar.progress(40)
-        transcription_path, _, final_path, transcription_raw, final_raw = run_pipeline(
+    executor = _job_executor()
+    if not st.session_state.job_id:
+        # Keep one output directory per session so "Try Again" resumes from
+        # the last completed stage instead of rerunning every step
+        if not st.session_state.output_dir:
+            st.session_state.output_dir = _artifact_store().new_run_dir(
+                session_id=st.session_state.session_id, label=Path(st.session_state.audio_path).name
+            )
+        output_dir = st.session_state.output_dir
+        st.session_state.job_id = executor.submit(
+            # Record the run's real size for the quota, whether it succeeded or failed
+            on_finish=lambda: _artifact_store().touch(output_dir),
             audio_path=st.session_state.audio_path,
             json_path_1=st.session_state.json_path_1,
-            json_path_2=st.session_state.json_path_2
+            json_path_2=st.session_state.json_path_2,
+            output_dir=st.session_state.output_dir,
+            resume=True,
+            pool=_pipeline_pool()
         )
-        progress_bar.progress(80)
-        status_text.text("✅ Processing complete!")
+    job = executor.get(st.session_state.job_id)
+    if job is not None and job.status == "done":
+        transcription_path, _, final_path, transcription_raw, final_raw = job.result
         st.session_state.transcription_path = transcription_path
         st.session_state.analysis_path = final_path
+        st.session_state.analysis_hash = sha256_file(final_path)
         st.session_state.transcription_raw = transcription_raw
         st.session_state.analysis_raw = final_raw
-        progress_bar.progress(100)
-        time.sleep(1)
+        if _analytics_store() is not None:
+            try:
+                _analytics_store().record_call(
+                    Path(st.session_state.output_dir).name, st.session_state.username, final_raw,
+                    evaluation=job.outputs.get("evaluation"), comparison=job.outputs.get("comparison"),
+                    wall_seconds=job.finished_at - job.started_at, recorded_at=job.started_at
+                )
+            except Exception as e:
+                # Shown on the results page; st.rerun below would clear a warning rendered here
+                st.session_state.analytics_warning = f"Could not record call analytics: {e}"
+        executor.forget(st.session_state.job_id)
+        st.session_state.job_id = None
         st.session_state.step = "result"
         st.rerun()
-    except Exception as e:
-        st.error(f"❌ Error during processing: {str(e)}")
+    elif job is not None and job.status == "failed":
+        st.error(f"❌ Error during processing: {job.error}")
         if st.button("🔄 Try Again"):
+            executor.forget(st.session_state.job_id)
+            st.session_state.job_id = None
             st.session_state.step = "ready"
             st.rerun()
+    else:
+        _job_progress()
 
 # ==================== RESULTS ====================
 elif st.session_state.step == "result":
     _stepper()
     _display_logo()
     st.markdown('<h2 style="color: #dc2626;">📊 Insight Scoop</h2>', unsafe_allow_html=True)
+    if st.session_state.analytics_warning:
+        st.warning(st.session_state.analytics_warning)
+        st.session_state.analytics_warning = None
 
     # Audio Player
     st.markdown("### 🎵 Spin the Track")
     st.markdown("Play & Verify:")
     try:
-        with open(st.session_state.audio_path, 'rb') as audio_file:
-            audio_bytes = audio_file.read()
-            st.audio(audio_bytes)
+        _audio_player()
     except Exception as e:
         st.warning(f"Could not load audio file: {str(e)}")
 
@@ -486,7 +741,22 @@ elif st.session_state.step == "result":
         if st.session_state.transcription_raw:
             tdf = _generate_transcript_table(st.session_state.transcription_raw)
             if not tdf.empty:
-                st.dataframe(tdf, use_container_width=True, hide_index=True)
+                st.caption("Select a row to play its segment.")
+                selection = st.dataframe(
+                    tdf, use_container_width=True, hide_index=True,
+                    on_select="rerun", selection_mode="single-row", key="transcript_rows"
+                ).selection
+                if selection.rows:
+                    segment = tdf.iloc[selection.rows[0]]
+                    times = _segment_times(segment)
+                    if times is None:
+                        st.info("This segment has no timestamp.")
+                    else:
+                        st.markdown(f"▶️ **{segment['Speaker']}** ({segment['Start']} - {segment['End']})")
+                        try:
+                            _audio_player(*times)
+                        except Exception as e:
+                            st.warning(f"Could not load audio file: {str(e)}")
                 csv_t = tdf.to_csv(index=False).encode("utf-8")
                 st.download_button(
                     label="💾 Download Transcript CSV",
@@ -518,119 +788,18 @@ elif st.session_state.step == "result":
 
     with tab_performance:
         st.markdown("### 📊 Agent Performance Dashboard")
-        st.markdown("**Agent:** Rajesh Kumar | **Manager:** John Smith | **Team:** Survey Operations")
-        st.markdown("---")
-        
-        # KPI Metrics Row 1
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric(
-                label="📞 Total Calls",
-                value="1,247",
-                delta="↑ 12% vs last month"
-            )
-        with col2:
-            st.metric(
-                label="✅ Successful Calls",
-                value="1,089",
-                delta="87.3% success rate"
-            )
-        with col3:
-            st.metric(
-                label="⏱️ Avg Call Duration",
-                value="4m 32s",
-                delta="↓ 15s vs target"
-            )
-        with col4:
-            st.metric(
-                label="⭐ Rating Score",
-                value="8.7/10",
-                delta="↑ 0.4"
-            )
-        
-        st.markdown("---")
-        
-        # KPI Metrics Row 2
-        col5, col6, col7, col8 = st.columns(4)
-        with col5:
-            st.metric(
-                label="🎯 First Call Resolution",
-                value="80%",
-                delta="↑ 2% vs last month"
-            )
-        with col6:
-            st.metric(
-                label="😊 Sentiment analysis-Happy",
-                value="80%",
-                delta="↑ 3% vs last month"
-            )
-        with col7:
-            st.metric(
-                label="🔄 Callback Rate",
-                value="20%",
-                delta="5% vs last month",
-                delta_color="inverse"
-            )
-        with col8:
-            st.metric(
-                label="📋 Compliance Score",
-                value="95%",
-                delta="↑ 3% vs last month"
+        analytics = _analytics_store()
+        agents = analytics.agents() if analytics is not None else []
+        if not agents:
+            st.info("No calls recorded yet. Metrics appear here once calls have been processed.")
+        else:
+            options = ["All agents"] + agents
+            agent_choice = st.selectbox(
+                "Agent", options,
+                index=options.index(st.session_state.username) if st.session_state.username in agents else 0
             )
-        
-        st.markdown("---")
-        
-        # Charts Section
-        col_chart1, col_chart2 = st.columns(2)
-        
-        with col_chart1:
-            st.markdown("#### 📈 Daily Calls Trend (Last 7 Days)")
-            daily_calls_data = pd.DataFrame({
-                "Day": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
-                "Calls": [42, 48, 45, 51, 47, 38, 41]
-            })
-            st.line_chart(daily_calls_data.set_index("Day"))
-        
-        with col_chart2:
-            st.markdown("#### ⭐ Rating Score Trend (Last 7 Days)")
-            quality_data = pd.DataFrame({
-                "Day": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
-                "Score": [8.5, 8.7, 8.4, 8.9, 8.6, 8.8, 8.7]
-            })
-            st.line_chart(quality_data.set_index("Day"))
-        
-        st.markdown("---")
-        
-        # Performance Comparison
-        st.markdown("#### 📊 Monthly Performance Comparison")
-        monthly_perf = pd.DataFrame({
-            "Month": ["Aug", "Sep", "Oct"],
-            "Calls Completed": [1156, 1198, 1247],
-            "Rating Score": [8.2, 8.5, 8.7],
-            "Success Rate": [84, 86, 87]
-        })
-        st.dataframe(monthly_perf, use_container_width=True, hide_index=True)
-        
-        st.markdown("---")
-        
-        # Hourly Performance
-        col_hour1, col_hour2 = st.columns(2)
-        
-        with col_hour1:
-            st.markdown("#### 🕐 Peak Response Hours(Call Receiver)")
-            hourly_data = pd.DataFrame({
-                "Hour": ["9-10", "10-11", "11-12", "12-1", "2-3", "3-4", "4-5"],
-                "Calls": [8, 12, 15, 10, 14, 11, 9]
-            })
-            st.bar_chart(hourly_data.set_index("Hour"))
-        
-        with col_hour2:
-            st.markdown("#### 🎯 Call Outcome Distribution")
-            outcome_data = pd.DataFrame({
-                "Outcome": ["Successful", "No Answer", "Callback", "Rejected"],
-                "Count": [1089, 98, 45, 15]
-            })
-            st.bar_chart(outcome_data.set_index("Outcome"))
+            agent = None if agent_choice == "All agents" else agent_choice
+            _performance_dashboard(analytics, agent)
 
     # Matrix button
     st.markdown("---")
@@ -642,31 +811,11 @@ if st.session_state.show_matrix:
     st.markdown("### 📊 Matrix Output")
     st.markdown("---")
     try:
-        with open(st.session_state.analysis_path, 'r', encoding='utf-8') as f:
-            final_json = json.load(f)
-        matrix_df = _generate_matrix_table(final_json)
-
-        def highlight_response4(row):
-            colors = []
-            for col in matrix_df.columns:
-                if col == 'symantic':
-                    val = str(row[col]).lower()
-                    if 'matched' == val:
-                        colors.append('color: #10b981')
-                    elif 'not matched' == val:
-                        colors.append('color: #ef4444')
-                    elif 'fuzzy match' == val:
-                        colors.append('color: #f59e0b')
-                    else:
-                        colors.append('')
-                else:
-                    colors.append('')
-            return colors
-
-        styled_df = matrix_df.style.apply(highlight_response4, axis=1)
+        analysis_hash = st.session_state.analysis_hash or sha256_file(st.session_state.analysis_path)
+        matrix_df, csv = _matrix_for_artifact(analysis_hash, st.session_state.analysis_path)
+        styled_df = matrix_df.style.apply(_semantic_colors, subset=["symantic"])
         st.dataframe(styled_df, use_container_width=True, hide_index=True, height=600)
 
-        csv = matrix_df.to_csv(index=False).encode('utf-8')
         st.download_button(
             label="💾 Download Matrix as CSV",
             data=csv,
@@ -675,6 +824,15 @@ if st.session_state.show_matrix:
             use_container_width=True,
             key="download_matrix_csv"
         )
+        st.download_button(
+            label="💾 Download Matrix as Parquet",
+            data=_parquet_for_artifact(analysis_hash, Path(st.session_state.output_dir).name,
+                                       st.session_state.username or None, st.session_state.analysis_raw),
+            file_name="matrix_output.parquet",
+            mime="application/vnd.apache.parquet",
+            use_container_width=True,
+            key="download_matrix_parquet"
+        )
     except Exception as e:
         st.error(f"Error generating matrix: {str(e)}")
         st.exception(e)
@@ -683,8 +841,11 @@ if st.session_state.show_matrix:
     col1, col2 = st.columns([1, 1])
     with col1:
         if st.button("🔄 Process New Files", use_container_width=True):
+            # This session's uploads and outputs are no longer needed unless another session shares them
+            _artifact_store().release_session(st.session_state.session_id)
             for key in ["audio_file", "json_file_1", "json_file_2", "audio_path", "json_path_1", "json_path_2",
-                        "transcription_path", "analysis_path", "transcription_raw", "analysis_raw"]:
+                        "transcription_path", "analysis_path", "transcription_raw", "analysis_raw", "output_dir",
+                        "job_id", "analysis_hash", "audio_hash"]:
                 st.session_state[key] = None
             st.session_state.step = "landing"
             st.rerun()
@@ -0,0 +1,259 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from upload_store import UploadStore
+
+
+# Managed store for the app's uploads and per-call output directories
+PIPELINE_ARTIFACT_DIR = os.environ.get(
+    "PIPELINE_ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "audio-analysis-artifacts")
+)
+PIPELINE_ARTIFACT_MAX_BYTES = int(os.environ.get("PIPELINE_ARTIFACT_MAX_BYTES", 10 * 1024 * 1024 * 1024))
+PIPELINE_ARTIFACT_MAX_AGE = float(os.environ.get("PIPELINE_ARTIFACT_MAX_AGE", 7 * 24 * 60 * 60))
+_default_artifact_store = None
+_default_artifact_store_lock = threading.Lock()
+
+INDEX_FILENAME = "index.sqlite"
+
+
+@dataclass
+class ArtifactEntry:
+    """One indexed upload or run directory"""
+    key: str
+    kind: str  # "upload" or "run"
+    path: str
+    bytes: int
+    sha256: Optional[str]
+    label: Optional[str]
+    created: float
+    last_used: float
+
+
+def _tree_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ArtifactStore:
+    """
+    Disk store for uploads and pipeline outputs with an index and a quota
+
+    Uploads are content-addressed (see UploadStore) under ``uploads/`` and
+    each pipeline call gets a directory under ``runs/``. A SQLite index records
+    every artifact's size, hash, label and last use, plus which sessions
+    reference it. ``release_session`` drops a session's references and
+    deletes what no other session still uses. After every new artifact,
+    unreferenced entries unused for ``max_age_seconds`` are removed, then the
+    least recently used unreferenced ones until the store is under 90% of
+    ``max_bytes``. Artifacts referenced by a live session (its uploads,
+    queued or running jobs, inputs kept for "Try Again") are never evicted;
+    a session not seen (``touch_session``) for ``session_timeout_seconds``
+    is treated as gone and its references are dropped. Nothing used within
+    ``min_idle_seconds`` is evicted either.
+    """
+
+    def __init__(self, root: str, max_bytes: int = PIPELINE_ARTIFACT_MAX_BYTES,
+                 max_age_seconds: float = PIPELINE_ARTIFACT_MAX_AGE, min_idle_seconds: float = 30 * 60,
+                 session_timeout_seconds: float = 24 * 60 * 60):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.min_idle_seconds = min_idle_seconds
+        self.session_timeout_seconds = session_timeout_seconds
+        self.uploads = UploadStore(os.path.join(root, "uploads"))
+        self.runs_dir = os.path.join(root, "runs")
+        os.makedirs(self.runs_dir, exist_ok=True)
+        self._index_path = os.path.join(root, INDEX_FILENAME)
+        # Held from choosing artifacts to delete until their files are gone, and
+        # while saving and registering, so a deduplicated upload is never removed
+        # between the two
+        self._lock = threading.RLock()
+        with self._index() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                " key TEXT PRIMARY KEY, kind TEXT NOT NULL, path TEXT NOT NULL, bytes INTEGER NOT NULL,"
+                " sha256 TEXT, label TEXT, created REAL NOT NULL, last_used REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS artifacts_sha256 ON artifacts (sha256);"
+                "CREATE INDEX IF NOT EXISTS artifacts_last_used ON artifacts (last_used);"
+                "CREATE TABLE IF NOT EXISTS session_refs ("
+                " session_id TEXT NOT NULL, key TEXT NOT NULL, last_seen REAL NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (session_id, key));"
+                "CREATE INDEX IF NOT EXISTS session_refs_key ON session_refs (key);"
+            )
+
+    @contextmanager
+    def _index(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._index_path, timeout=30.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _register(self, key: str, kind: str, path: str, size: int, sha256: Optional[str],
+                  label: Optional[str], session_id: Optional[str]) -> None:
+        now = time.time()
+        with self._index() as conn:
+            conn.execute(
+                "INSERT INTO artifacts (key, kind, path, bytes, sha256, label, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET last_used = excluded.last_used, bytes = excluded.bytes,"
+                " label = COALESCE(excluded.label, artifacts.label)",
+                (key, kind, path, size, sha256, label, now, now)
+            )
+            if session_id:
+                conn.execute(
+                    "INSERT INTO session_refs (session_id, key, last_seen) VALUES (?, ?, ?)"
+                    " ON CONFLICT(session_id, key) DO UPDATE SET last_seen = excluded.last_seen",
+                    (session_id, key, now)
+                )
+
+    def save_upload(self, source: BinaryIO, suffix: str = "", session_id: Optional[str] = None,
+                    label: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Store an upload (deduplicated by content) and reference it from ``session_id``
+
+        Returns:
+            Tuple of (stored path, SHA-256 of the content)
+        """
+        with self._lock:
+            path, sha256 = self.uploads.save(source, suffix)
+            self._register(f"upload:{os.path.basename(path)}", "upload", path, os.path.getsize(path),
+                           sha256, label, session_id)
+        self.enforce_quota()
+        return path, sha256
+
+    def new_run_dir(self, session_id: Optional[str] = None, label: Optional[str] = None) -> str:
+        """Create and index an empty output directory for one pipeline call"""
+        run_id = uuid.uuid4().hex
+        path = os.path.join(self.runs_dir, run_id)
+        os.makedirs(path)
+        self._register(f"run:{run_id}", "run", path, 0, None, label, session_id)
+        self.enforce_quota()
+        return path
+
+    def touch(self, path: str) -> None:
+        """Mark an artifact as used now and refresh its recorded size (e.g. after a run completes)"""
+        size = _tree_size(path) if os.path.exists(path) else 0
+        with self._index() as conn:
+            conn.execute("UPDATE artifacts SET last_used = ?, bytes = ? WHERE path = ?", (time.time(), size, path))
+
+    def touch_session(self, session_id: str) -> None:
+        """Mark the session as alive, keeping everything it references safe from eviction"""
+        with self._index() as conn:
+            conn.execute("UPDATE session_refs SET last_seen = ? WHERE session_id = ?", (time.time(), session_id))
+
+    def find(self, sha256: Optional[str] = None, kind: Optional[str] = None,
+             session_id: Optional[str] = None) -> List[ArtifactEntry]:
+        """Indexed artifacts matching every given filter, most recently used first"""
+        query = "SELECT a.key, a.kind, a.path, a.bytes, a.sha256, a.label, a.created, a.last_used FROM artifacts a"
+        clauses, params = [], []
+        if session_id is not None:
+            query += " JOIN session_refs r ON r.key = a.key"
+            clauses.append("r.session_id = ?")
+            params.append(session_id)
+        if sha256 is not None:
+            clauses.append("a.sha256 = ?")
+            params.append(sha256)
+        if kind is not None:
+            clauses.append("a.kind = ?")
+            params.append(kind)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._index() as conn:
+            rows = conn.execute(query + " ORDER BY a.last_used DESC", params).fetchall()
+        return [ArtifactEntry(*row) for row in rows]
+
+    def total_bytes(self) -> int:
+        with self._index() as conn:
+            return conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()[0]
+
+    def release_session(self, session_id: str) -> int:
+        """Drop the session's references and delete artifacts nobody else references; returns the count"""
+        with self._lock:
+            with self._index() as conn:
+                keys = [row[0] for row in conn.execute(
+                    "SELECT key FROM session_refs WHERE session_id = ?", (session_id,)
+                )]
+                conn.execute("DELETE FROM session_refs WHERE session_id = ?", (session_id,))
+            return self._delete(keys)
+
+    def enforce_quota(self) -> int:
+        """Evict expired, then least recently used, unreferenced idle artifacts; returns the number removed"""
+        with self._lock:
+            return self._enforce_quota_locked()
+
+    def _enforce_quota_locked(self) -> int:
+        now = time.time()
+        idle_before = now - self.min_idle_seconds
+        evictable = "last_used < ? AND key NOT IN (SELECT key FROM session_refs)"
+        with self._index() as conn:
+            # Sessions that went away without releasing (closed browser tab)
+            conn.execute("DELETE FROM session_refs WHERE last_seen < ?", (now - self.session_timeout_seconds,))
+            expired = [row[0] for row in conn.execute(
+                f"SELECT key FROM artifacts WHERE {evictable} AND last_used < ?",
+                (idle_before, now - self.max_age_seconds)
+            )]
+        removed = self._delete(expired)
+
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return removed
+        target = int(self.max_bytes * 0.9)
+        with self._index() as conn:
+            candidates = conn.execute(
+                f"SELECT key, bytes FROM artifacts WHERE {evictable} ORDER BY last_used", (idle_before,)
+            ).fetchall()
+        victims = []
+        for key, size in candidates:
+            if total <= target:
+                break
+            victims.append(key)
+            total -= size
+        return removed + self._delete(victims)
+
+    def _delete(self, keys: List[str]) -> int:
+        """Delete the given artifacts that no session references (re-checked in the same transaction)"""
+        if not keys:
+            return 0
+        with self._index() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"SELECT key, path FROM artifacts WHERE key IN ({','.join('?' * len(keys))})"
+                " AND key NOT IN (SELECT key FROM session_refs)", keys
+            ).fetchall()
+            conn.executemany("DELETE FROM artifacts WHERE key = ?", [(key,) for key, _ in rows])
+        for _, path in rows:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return len(rows)
+
+
+def get_default_artifact_store() -> ArtifactStore:
+    """Return the process-wide artifact store under PIPELINE_ARTIFACT_DIR"""
+    global _default_artifact_store
+    with _default_artifact_store_lock:
+        if _default_artifact_store is None:
+            _default_artifact_store = ArtifactStore(PIPELINE_ARTIFACT_DIR)
+        return _default_artifact_store
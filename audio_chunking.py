@@ -0,0 +1,256 @@
+import difflib
+import json
+import subprocess
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from audio_preprocess import (
+    CODECS, detect_silences, ffmpeg_available, parse_timestamp, probe_duration, shift_transcript_timestamps
+)
+from result_cache import sha256_text
+
+
+# Bump when windowing or stitching changes so cached transcripts are not reused
+CHUNKING_VERSION = "1"
+
+
+@dataclass
+class ChunkWindow:
+    """
+    One transcription window
+
+    ``start``/``end`` is the audio sent to the model (including overlap);
+    ``own_start``/``own_end`` is the span whose turns this window keeps.
+    """
+    index: int
+    start: float
+    end: float
+    own_start: float
+    own_end: float
+
+
+def plan_windows(duration: float, silences: List[Tuple[float, float]], window_seconds: float,
+                 overlap_seconds: float, search_seconds: float) -> List[ChunkWindow]:
+    """
+    Split ``duration`` seconds into windows of about ``window_seconds``
+
+    Each cut is placed mid-way through the longest silence centred within
+    ``search_seconds`` before the target boundary (or at the boundary if there is none), and
+    windows extend ``overlap_seconds`` past each cut on both sides.
+    """
+    cuts = [0.0]
+    while duration - cuts[-1] > window_seconds:
+        target = cuts[-1] + window_seconds
+        candidates = [
+            (end - start, (start + end) / 2)
+            for start, end in ((start, min(end, duration)) for start, end in silences)
+            if target - search_seconds <= (start + end) / 2 <= target
+        ]
+        cuts.append(max(candidates)[1] if candidates else target)
+    cuts.append(duration)
+
+    return [
+        ChunkWindow(
+            index=i,
+            start=max(0.0, own_start - overlap_seconds),
+            end=min(duration, own_end + overlap_seconds),
+            own_start=own_start,
+            own_end=own_end
+        )
+        for i, (own_start, own_end) in enumerate(zip(cuts, cuts[1:]))
+    ]
+
+
+def _turn_times(turn: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    timestamp = turn.get("Timestamp") if isinstance(turn, dict) else None
+    if not isinstance(timestamp, dict):
+        return None
+    start, end = parse_timestamp(timestamp.get("Start")), parse_timestamp(timestamp.get("End"))
+    if start is None:
+        return None
+    return start[0], (end[0] if end is not None else start[0])
+
+
+def _similarity(a: Any, b: Any) -> float:
+    if not isinstance(a, str) or not isinstance(b, str):
+        return 0.0
+    return difflib.SequenceMatcher(None, a.strip(), b.strip()).ratio()
+
+
+def _speaker_mapping(previous: List[Dict[str, Any]], turns: List[Dict[str, Any]],
+                     overlap: Tuple[float, float], used_labels: List[str]) -> Dict[str, str]:
+    """
+    Map this window's speaker labels onto the labels already in the stitched transcript
+
+    Turns of both windows inside the overlap vote for a pairing, weighted by
+    how much they overlap in time and, above all, by matching text; pairings are
+    assigned greedily and one-to-one. Unmatched labels keep their name unless
+    another label of this window was mapped onto it, in which case they get a
+    new "Speaker N" label.
+    """
+    votes: Dict[Tuple[str, str], float] = defaultdict(float)
+    overlap_start, overlap_end = overlap
+    for turn in turns:
+        times = _turn_times(turn)
+        if times is None or times[1] < overlap_start or times[0] > overlap_end:
+            continue
+        for earlier in previous:
+            earlier_times = _turn_times(earlier)
+            if earlier_times is None:
+                continue
+            shared = min(times[1], earlier_times[1]) - max(times[0], earlier_times[0])
+            similarity = _similarity(turn.get("Voice"), earlier.get("Voice"))
+            # The same utterance heard by both windows is the strongest evidence
+            weight = max(shared, 0.0) * (1.0 + similarity) + (10.0 if similarity >= 0.8 else 0.0)
+            if weight > 0:
+                votes[(turn.get("Speaker"), earlier.get("Speaker"))] += weight
+
+    mapping: Dict[str, str] = {}
+    for (label, target), _ in sorted(votes.items(), key=lambda item: -item[1]):
+        if label not in mapping and target not in mapping.values():
+            mapping[label] = target
+
+    claimed = set(mapping.values())
+    taken = set(used_labels) | claimed
+    for turn in turns:
+        label = turn.get("Speaker")
+        if label in mapping:
+            continue
+        if label not in claimed or label in ("Unknown", None):
+            mapping[label] = label
+        else:
+            number = len(taken) + 1
+            while f"Speaker {number}" in taken:
+                number += 1
+            mapping[label] = f"Speaker {number}"
+        taken.add(mapping[label])
+    return mapping
+
+
+def stitch_transcripts(windows: List[ChunkWindow], transcripts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Stitch per-window "Call Details" transcripts into one
+
+    Window-relative timestamps are shifted to the full recording, each window
+    keeps only the turns centred in the span it owns, a turn repeating the
+    previous one across a cut is dropped, and speaker labels are carried over
+    from window to window through the overlaps.
+    """
+    stitched: List[Dict[str, Any]] = []
+    labels: List[str] = []
+    previous: List[Dict[str, Any]] = []
+    previous_end = 0.0
+
+    for window, transcript in zip(windows, transcripts):
+        shift_transcript_timestamps(transcript, lambda seconds, offset=window.start: seconds + offset)
+        turns = [t for t in transcript.get("Call Details", {}).get("Transcript", []) if isinstance(t, dict)]
+
+        mapping = _speaker_mapping(previous, turns, (window.start, previous_end), labels)
+        for turn in turns:
+            turn["Speaker"] = mapping.get(turn.get("Speaker"), turn.get("Speaker"))
+            if turn["Speaker"] not in labels:
+                labels.append(turn["Speaker"])
+
+        is_last = window.index == len(windows) - 1
+        for turn in turns:
+            times = _turn_times(turn)
+            if times is not None:
+                midpoint = (times[0] + times[1]) / 2
+                if midpoint < window.own_start or (midpoint >= window.own_end and not is_last):
+                    continue
+            if stitched and turn["Speaker"] == stitched[-1].get("Speaker") \
+                    and _similarity(turn.get("Voice"), stitched[-1].get("Voice")) > 0.9:
+                continue
+            stitched.append(turn)
+        previous, previous_end = turns, window.end
+
+    speakers = {turn.get("Speaker") for turn in stitched} - {"Unknown", None}
+    return {"Call Details": {"Number of Speakers": str(len(speakers)), "Transcript": stitched}}
+
+
+class LongAudioChunker:
+    """
+    Long-audio mode for Step 1
+
+    Recordings of at least ``min_duration_seconds`` are split at silences into
+    overlapping windows that are transcribed in parallel (up to
+    ``max_parallel`` at a time) and stitched back into one transcript.
+
+    Requires the ffmpeg and ffprobe executables.
+    """
+
+    def __init__(
+        self,
+        min_duration_seconds: float = 10 * 60,
+        window_seconds: float = 5 * 60,
+        overlap_seconds: float = 5.0,
+        search_seconds: float = 30.0,
+        max_parallel: int = 8,
+        noise_db: float = -35.0,
+        min_silence: float = 0.5,
+        sample_rate: int = 16000,
+        codec: str = "opus",
+        bitrate: str = "24k"
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        if not ffmpeg_available():
+            raise RuntimeError("Long-audio transcription requires ffmpeg and ffprobe on PATH")
+        self.min_duration_seconds = min_duration_seconds
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.search_seconds = search_seconds
+        self.max_parallel = max_parallel
+        self.noise_db = noise_db
+        self.min_silence = min_silence
+        self.sample_rate = sample_rate
+        self.codec = codec
+        self.bitrate = bitrate
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the settings that affect the stitched transcript"""
+        return sha256_text(json.dumps({
+            "version": CHUNKING_VERSION,
+            "min_duration_seconds": self.min_duration_seconds,
+            "window_seconds": self.window_seconds,
+            "overlap_seconds": self.overlap_seconds,
+            "search_seconds": self.search_seconds,
+            "noise_db": self.noise_db,
+            "min_silence": self.min_silence,
+            "sample_rate": self.sample_rate,
+            "codec": self.codec,
+            "bitrate": self.bitrate,
+        }, sort_keys=True))
+
+    @property
+    def mime_type(self) -> str:
+        return CODECS[self.codec][2]
+
+    @property
+    def extension(self) -> str:
+        return CODECS[self.codec][1]
+
+    def plan(self, file_path: str) -> Optional[List[ChunkWindow]]:
+        """Windows for ``file_path``, or None if it is short enough for a single request"""
+        duration = probe_duration(file_path)
+        if duration < self.min_duration_seconds:
+            return None
+        silences = detect_silences(file_path, self.noise_db, self.min_silence)
+        windows = plan_windows(duration, silences, self.window_seconds, self.overlap_seconds, self.search_seconds)
+        return windows if len(windows) > 1 else None
+
+    def extract(self, file_path: str, window: ChunkWindow, output_path: str) -> str:
+        """Write the window's audio to ``output_path`` (mono, resampled, compact codec)"""
+        encoder = CODECS[self.codec][0]
+        command = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-ss", f"{window.start:.3f}", "-i", file_path, "-t", f"{window.end - window.start:.3f}",
+            "-ac", "1", "-ar", str(self.sample_rate), "-c:a", encoder,
+        ]
+        if self.codec != "flac":
+            command += ["-b:a", self.bitrate]
+        command.append(output_path)
+        subprocess.run(command, capture_output=True, text=True, check=True)
+        return output_path
@@ -0,0 +1,142 @@
+import json
+import os
+import subprocess
+import wave
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from audio_preprocess import detect_silences, ffmpeg_available, probe_duration
+from result_cache import sha256_text
+
+
+# Bump when the gate's rules change so checkpointed rejections are re-evaluated
+GATE_VERSION = "1"
+
+# Leading bytes of the containers we accept
+_SIGNATURES = (
+    (0, b"RIFF"),       # WAV
+    (0, b"ID3"),        # MP3 with ID3 tag
+    (0, b"\xff\xfb"),   # MP3 frame sync
+    (0, b"\xff\xf3"),
+    (0, b"\xff\xf2"),
+    (0, b"\xff\xf1"),   # AAC ADTS
+    (0, b"\xff\xf9"),
+    (4, b"ftyp"),       # M4A / MP4
+    (0, b"OggS"),       # Ogg (Opus / Vorbis)
+    (0, b"fLaC"),       # FLAC
+    (0, b"\x1aE\xdf\xa3"),  # WebM / Matroska
+)
+
+
+@dataclass
+class GateDecision:
+    """Outcome of the pre-filter for one recording"""
+    accepted: bool
+    reason: Optional[str] = None
+    detail: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    speech_seconds: Optional[float] = None
+    speech_ratio: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _has_audio_signature(file_path: str) -> bool:
+    with open(file_path, "rb") as f:
+        head = f.read(16)
+    return any(head[offset:offset + len(magic)] == magic for offset, magic in _SIGNATURES)
+
+
+def _wav_duration(file_path: str) -> Optional[float]:
+    try:
+        with wave.open(file_path, "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
+
+
+class AudioGate:
+    """
+    Cheap local pre-filter run before any model call
+
+    Rejects recordings that are not decodable audio, shorter than
+    ``min_duration_seconds`` (unanswered calls, ringing) or with too little
+    speech: less than ``min_speech_seconds`` or ``min_speech_ratio`` of the
+    call above the ``noise_db`` silence threshold.
+
+    Duration and speech ratio come from ffprobe / ffmpeg silencedetect; without
+    ffmpeg only the container signature, size and (for WAV) duration are checked.
+    """
+
+    def __init__(
+        self,
+        min_bytes: int = 4 * 1024,
+        min_duration_seconds: float = 10.0,
+        min_speech_seconds: float = 3.0,
+        min_speech_ratio: float = 0.15,
+        noise_db: float = -35.0,
+        min_silence: float = 0.5
+    ):
+        self.min_bytes = min_bytes
+        self.min_duration_seconds = min_duration_seconds
+        self.min_speech_seconds = min_speech_seconds
+        self.min_speech_ratio = min_speech_ratio
+        self.noise_db = noise_db
+        self.min_silence = min_silence
+
+    @property
+    def fingerprint(self) -> str:
+        return sha256_text(json.dumps({
+            "version": GATE_VERSION,
+            "min_bytes": self.min_bytes,
+            "min_duration_seconds": self.min_duration_seconds,
+            "min_speech_seconds": self.min_speech_seconds,
+            "min_speech_ratio": self.min_speech_ratio,
+            "noise_db": self.noise_db,
+            "min_silence": self.min_silence,
+        }, sort_keys=True))
+
+    def check(self, file_path: str) -> GateDecision:
+        """Probe ``file_path`` and decide whether it is worth sending to the models"""
+        try:
+            size = os.path.getsize(file_path)
+        except OSError as e:
+            return GateDecision(False, "invalid_audio", f"Cannot read audio file: {e}")
+        if size < self.min_bytes:
+            return GateDecision(False, "invalid_audio", f"File is only {size} bytes")
+        if not _has_audio_signature(file_path):
+            return GateDecision(False, "invalid_audio", "File is not a recognised audio container")
+
+        if not ffmpeg_available():
+            duration = _wav_duration(file_path)
+            if duration is not None and duration < self.min_duration_seconds:
+                return self._too_short(duration)
+            return GateDecision(True, duration_seconds=duration)
+
+        try:
+            duration = probe_duration(file_path)
+            silences = detect_silences(file_path, self.noise_db, self.min_silence)
+        except (subprocess.CalledProcessError, ValueError):
+            return GateDecision(False, "invalid_audio", "Audio could not be decoded")
+        if duration < self.min_duration_seconds:
+            return self._too_short(duration)
+
+        silence = sum(min(end, duration) - start for start, end in silences)
+        speech = max(0.0, duration - silence)
+        ratio = speech / duration if duration > 0 else 0.0
+        decision = GateDecision(
+            True, duration_seconds=round(duration, 3), speech_seconds=round(speech, 3), speech_ratio=round(ratio, 3)
+        )
+        if speech < self.min_speech_seconds or ratio < self.min_speech_ratio:
+            decision.accepted = False
+            decision.reason = "insufficient_speech"
+            decision.detail = f"Only {speech:.1f} s of speech ({ratio:.0%} of the call)"
+        return decision
+
+    def _too_short(self, duration: float) -> GateDecision:
+        return GateDecision(
+            False, "too_short",
+            f"Call lasts {duration:.1f} s, below the {self.min_duration_seconds:g} s minimum",
+            duration_seconds=round(duration, 3)
+        )
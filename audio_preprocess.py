@@ -0,0 +1,281 @@
+import bisect
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from result_cache import sha256_text
+
+
+# Bump when the processing chain changes so cached transcripts are not reused
+PREPROCESS_VERSION = "1"
+
+# codec name -> (ffmpeg encoder, file extension, MIME type)
+CODECS = {
+    "opus": ("libopus", ".ogg", "audio/ogg"),
+    "mp3": ("libmp3lame", ".mp3", "audio/mp3"),
+    "flac": ("flac", ".flac", "audio/flac"),
+}
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+def probe_duration(file_path: str) -> float:
+    """Duration of an audio file in seconds (via ffprobe)"""
+    completed = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", file_path],
+        capture_output=True, text=True, check=True
+    )
+    return float(completed.stdout.strip())
+
+
+def detect_silences(file_path: str, noise_db: float = -35.0, min_silence: float = 0.5) -> List[Tuple[float, float]]:
+    """(start, end) seconds of every silence of at least ``min_silence`` (via ffmpeg silencedetect)"""
+    completed = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostats", "-i", file_path,
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}", "-f", "null", "-"],
+        capture_output=True, text=True, check=True
+    )
+    silences, start = [], None
+    for line in completed.stderr.splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    if start is not None:
+        # Silence running to the end of the file has no silence_end line
+        silences.append((start, float("inf")))
+    return silences
+
+
+class OffsetMap:
+    """
+    Maps times in preprocessed audio back to the original recording
+
+    ``segments`` are the (start, end) spans of the original that were kept,
+    in order; the processed audio is their concatenation.
+    """
+
+    def __init__(self, segments: List[Tuple[float, float]]):
+        self.segments = [(float(start), float(end)) for start, end in segments]
+        self._processed_starts = []
+        position = 0.0
+        for start, end in self.segments:
+            self._processed_starts.append(position)
+            position += end - start
+        self.processed_duration = position
+
+    @classmethod
+    def identity(cls, duration: float) -> "OffsetMap":
+        return cls([(0.0, duration)])
+
+    def to_original(self, seconds: float) -> float:
+        """Original-recording time for a time in the processed audio"""
+        if not self.segments:
+            return seconds
+        index = max(0, bisect.bisect_right(self._processed_starts, seconds) - 1)
+        start, end = self.segments[index]
+        original = start + (seconds - self._processed_starts[index])
+        # Only the last segment may run past its end (model timestamps can overshoot slightly)
+        return original if index == len(self.segments) - 1 else min(original, end)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"segments": [[start, end] for start, end in self.segments]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OffsetMap":
+        return cls([tuple(span) for span in data["segments"]])
+
+
+def parse_timestamp(value: Any) -> Optional[Tuple[float, Tuple[int, int]]]:
+    """
+    Parse "SS", "MM:SS" or "HH:MM:SS" (optionally fractional, "," or ".")
+
+    Returns:
+        (seconds, style) where style is (number of fields, decimal places),
+        or None if ``value`` is not a timestamp
+    """
+    if isinstance(value, (int, float)):
+        return float(value), (1, 0 if isinstance(value, int) else 3)
+    if not isinstance(value, str):
+        return None
+    text = value.strip().replace(",", ".")
+    if not re.fullmatch(r"\d+(:\d{1,2}){0,2}(\.\d+)?", text):
+        return None
+    fields = text.split(":")
+    decimals = len(fields[-1].split(".")[1]) if "." in fields[-1] else 0
+    seconds = 0.0
+    for field in fields:
+        seconds = seconds * 60 + float(field)
+    return seconds, (len(fields), decimals)
+
+
+def format_timestamp(seconds: float, style: Tuple[int, int]) -> str:
+    """Format ``seconds`` in the style returned by parse_timestamp"""
+    fields, decimals = style
+    seconds = max(0.0, round(seconds, decimals))
+    whole = int(seconds)
+    fraction = f"{seconds - whole:.{decimals}f}"[1:] if decimals else ""
+    if fields == 1:
+        return f"{whole}{fraction}"
+    hours, remainder = divmod(whole, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if fields == 2:
+        return f"{hours * 60 + minutes:02d}:{secs:02d}{fraction}"
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{fraction}"
+
+
+def shift_transcript_timestamps(transcript: Any, convert) -> Any:
+    """
+    Apply ``convert(seconds) -> seconds`` to every Timestamp Start/End of a
+    "Call Details" transcript, keeping each value's original format
+
+    Unparseable timestamps are left untouched. Returns the same object.
+    """
+    if not isinstance(transcript, dict):
+        return transcript
+    turns = transcript.get("Call Details", {}).get("Transcript", [])
+    for turn in turns if isinstance(turns, list) else []:
+        timestamp = turn.get("Timestamp") if isinstance(turn, dict) else None
+        if not isinstance(timestamp, dict):
+            continue
+        for key in ("Start", "End"):
+            parsed = parse_timestamp(timestamp.get(key))
+            if parsed is not None:
+                timestamp[key] = format_timestamp(convert(parsed[0]), parsed[1])
+    return transcript
+
+
+@dataclass
+class PreparedAudio:
+    """Output of AudioPreprocessor.prepare; ``path`` lives in a temp dir removed by cleanup()"""
+    path: str
+    mime_type: str
+    offset_map: OffsetMap
+    original_duration: float
+    original_bytes: int
+
+    @property
+    def processed_bytes(self) -> int:
+        return os.path.getsize(self.path)
+
+    def cleanup(self) -> None:
+        shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+
+
+class AudioPreprocessor:
+    """
+    Optional Step 0: shrink a recording before it is sent for transcription
+
+    Downmixes to mono, resamples to ``sample_rate``, re-encodes with a compact
+    speech codec and trims leading/trailing silence. Internal silences longer
+    than ``max_internal_silence`` are shortened to ``keep_silence``. The
+    returned OffsetMap converts transcript times back to the original.
+
+    Requires the ffmpeg and ffprobe executables.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        codec: str = "opus",
+        bitrate: str = "24k",
+        noise_db: float = -35.0,
+        min_silence: float = 0.5,
+        max_internal_silence: float = 1.5,
+        keep_silence: float = 0.5
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        if not ffmpeg_available():
+            raise RuntimeError("Audio preprocessing requires ffmpeg and ffprobe on PATH")
+        self.sample_rate = sample_rate
+        self.codec = codec
+        self.bitrate = bitrate
+        self.noise_db = noise_db
+        self.min_silence = min_silence
+        self.max_internal_silence = max_internal_silence
+        self.keep_silence = keep_silence
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the settings; part of the transcription cache key and checkpoint fingerprint"""
+        return sha256_text(json.dumps({
+            "version": PREPROCESS_VERSION,
+            "sample_rate": self.sample_rate,
+            "codec": self.codec,
+            "bitrate": self.bitrate,
+            "noise_db": self.noise_db,
+            "min_silence": self.min_silence,
+            "max_internal_silence": self.max_internal_silence,
+            "keep_silence": self.keep_silence,
+        }, sort_keys=True))
+
+    def kept_segments(self, duration: float, silences: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        """Spans of the original to keep given its detected silences"""
+        pad = self.keep_silence / 2
+        segments, position = [], 0.0
+        for start, end in silences:
+            end = min(end, duration)
+            leading, trailing = start <= 0.0, end >= duration
+            if not (leading or trailing) and end - start <= self.max_internal_silence:
+                continue
+            cut_start = start if leading else start + pad
+            cut_end = end if trailing else end - pad
+            if cut_end <= cut_start:
+                continue
+            if cut_start > position:
+                segments.append((position, cut_start))
+            position = max(position, cut_end)
+        if position < duration:
+            segments.append((position, duration))
+        # Nothing but silence: keep the file as is rather than sending empty audio
+        return segments or [(0.0, duration)]
+
+    def prepare(self, file_path: str) -> PreparedAudio:
+        """Write the preprocessed recording to a new temp dir and return it with its offset map"""
+        duration = probe_duration(file_path)
+        segments = self.kept_segments(duration, detect_silences(file_path, self.noise_db, self.min_silence))
+        encoder, extension, mime_type = CODECS[self.codec]
+
+        filters = []
+        if segments != [(0.0, duration)]:
+            selection = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in segments)
+            filters.append(f"aselect='{selection}',asetpts=N/SR/TB")
+
+        work_dir = tempfile.mkdtemp(prefix="audio-preprocess-")
+        output_path = os.path.join(work_dir, "audio" + extension)
+        command = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", file_path]
+        if filters:
+            command += ["-af", ",".join(filters)]
+        command += ["-ac", "1", "-ar", str(self.sample_rate), "-c:a", encoder]
+        if self.codec != "flac":
+            command += ["-b:a", self.bitrate]
+        command.append(output_path)
+        try:
+            subprocess.run(command, capture_output=True, text=True, check=True)
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+        return PreparedAudio(
+            path=output_path,
+            mime_type=mime_type,
+            offset_map=OffsetMap(segments),
+            original_duration=duration,
+            original_bytes=os.path.getsize(file_path)
+        )
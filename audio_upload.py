@@ -0,0 +1,170 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import google.generativeai as genai
+
+
+class GeminiFileBackend:
+    """Uploads audio through the Gemini File API (streamed from disk, no base64)"""
+
+    def __init__(self, poll_interval: float = 2.0, processing_timeout: float = 300.0):
+        self.poll_interval = poll_interval
+        self.processing_timeout = processing_timeout
+
+    def upload(self, file_path: str, mime_type: str):
+        """Upload ``file_path`` and wait until the file is ready to be referenced"""
+        handle = genai.upload_file(path=file_path, mime_type=mime_type)
+        deadline = time.time() + self.processing_timeout
+        while handle.state.name == "PROCESSING":
+            if time.time() > deadline:
+                self.delete(handle)
+                raise TimeoutError(f"File API processing timed out for {file_path}")
+            time.sleep(self.poll_interval)
+            handle = genai.get_file(handle.name)
+        if handle.state.name == "FAILED":
+            self.delete(handle)
+            raise RuntimeError(f"File API processing failed for {file_path}")
+        return handle
+
+    def part(self, handle):
+        """Content part referencing an uploaded file"""
+        return handle
+
+    def delete(self, handle) -> None:
+        genai.delete_file(handle.name)
+
+
+class LocalFileBackend:
+    """
+    Local stand-in for the File API, for tests and offline runs
+
+    Files are copied into ``root_dir`` and referenced by a ``file://`` URI part.
+    """
+
+    def __init__(self, root_dir: Optional[str] = None):
+        self.root_dir = root_dir or tempfile.mkdtemp(prefix="audio-uploads-")
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.uploads = 0
+        self.deletes = 0
+
+    def upload(self, file_path: str, mime_type: str) -> Dict[str, str]:
+        name = f"files/{uuid.uuid4().hex}"
+        stored_path = os.path.join(self.root_dir, name.split("/", 1)[1] + os.path.splitext(file_path)[1])
+        shutil.copyfile(file_path, stored_path)
+        self.uploads += 1
+        return {"name": name, "path": stored_path, "mime_type": mime_type}
+
+    def part(self, handle: Dict[str, str]) -> Dict[str, str]:
+        return {"mime_type": handle["mime_type"], "file_uri": "file://" + os.path.abspath(handle["path"])}
+
+    def delete(self, handle: Dict[str, str]) -> None:
+        try:
+            os.remove(handle["path"])
+        except FileNotFoundError:
+            pass
+        self.deletes += 1
+
+
+class _Upload:
+    def __init__(self):
+        self.handle = None
+        self.refcount = 0
+        self.lock = threading.Lock()
+
+
+class AudioLease:
+    """
+    One caller's use of an uploaded recording
+
+    The upload happens lazily on the first ``part()`` call, so a stage cache
+    hit never uploads anything. ``release()`` (or leaving the ``with`` block)
+    drops the reference; the remote file is deleted with the last one.
+    """
+
+    def __init__(self, manager: "AudioUploadManager", key: str, file_path: str, mime_type: str):
+        self._manager = manager
+        self._key = key
+        self._file_path = file_path
+        self._mime_type = mime_type
+        self._released = False
+
+    def part(self) -> Any:
+        """Content part for the recording, uploading it on first use"""
+        return self._manager._part(self._key, self._file_path, self._mime_type)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._manager._release(self._key)
+
+    def __enter__(self) -> "AudioLease":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class AudioUploadManager:
+    """
+    Shares one remote upload per recording between concurrent users
+
+    Leases are keyed by the audio content hash: a recording that is already
+    uploaded (e.g. by another call or chunk in flight) is reused rather than
+    uploaded again, and cleaned up once no lease references it.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or GeminiFileBackend()
+        self._uploads: Dict[str, _Upload] = {}
+        self._lock = threading.Lock()
+
+    def lease(self, file_path: str, mime_type: str, content_hash: str) -> AudioLease:
+        key = f"{content_hash}:{mime_type}"
+        with self._lock:
+            upload = self._uploads.setdefault(key, _Upload())
+            upload.refcount += 1
+        return AudioLease(self, key, file_path, mime_type)
+
+    def _part(self, key: str, file_path: str, mime_type: str) -> Any:
+        with self._lock:
+            upload = self._uploads[key]
+        with upload.lock:
+            if upload.handle is None:
+                upload.handle = self.backend.upload(file_path, mime_type)
+            return self.backend.part(upload.handle)
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            upload = self._uploads[key]
+            upload.refcount -= 1
+            if upload.refcount > 0:
+                return
+            del self._uploads[key]
+        with upload.lock:
+            if upload.handle is not None:
+                self.backend.delete(upload.handle)
+                upload.handle = None
+
+
+class InlineAudio:
+    """Lease-compatible wrapper for the inline transport: the part is built by ``loader``"""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def part(self) -> Any:
+        return self._loader()
+
+    def release(self) -> None:
+        pass
+
+    def __enter__(self) -> "InlineAudio":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
@@ -0,0 +1,383 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from analytics_store import AnalyticsStore
+from audio_chunking import LongAudioChunker
+from audio_gate import AudioGate
+from audio_preprocess import AudioPreprocessor
+from columnar_export import ParquetResultWriter
+from dummy_processor import AudioAnalysisPipeline
+from pipeline_metrics import metrics_sink_for_path
+from prompt_cache import PromptContextCache
+from rate_limiter import ModelRateLimiter, RateLimit
+from result_cache import StageCache
+
+
+# Per-worker pipeline state. Threads keep one pipeline each in a thread-local,
+# processes build theirs once in the pool initializer.
+_thread_state = threading.local()
+_process_pipeline = None
+_pipeline_kwargs: Dict[str, Any] = {}
+
+
+def load_manifest(manifest_path: str) -> List[Dict[str, str]]:
+    """
+    Load a batch manifest of (audio, agent survey JSON) pairs
+
+    Supported formats:
+        - JSON lines: {"audio": "...", "survey": "...", "id": "optional", "agent": "optional"}
+        - CSV with header columns audio, survey and optional id and agent
+
+    Relative paths are resolved against the manifest's directory.
+    """
+    manifest_path = Path(manifest_path)
+    base_dir = manifest_path.parent
+
+    if manifest_path.suffix.lower() == ".csv":
+        with open(manifest_path, "r", encoding="utf-8", newline="") as f:
+            rows = [dict(row) for row in csv.DictReader(f)]
+    else:
+        rows = []
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    rows.append(json.loads(line))
+
+    jobs = []
+    seen_ids = set()
+    for index, row in enumerate(rows):
+        audio = row.get("audio") or row.get("audio_path")
+        survey = row.get("survey") or row.get("json_path_2")
+        if not audio or not survey:
+            raise ValueError(f"Manifest entry {index} needs both 'audio' and 'survey': {row}")
+
+        audio_path = Path(audio) if os.path.isabs(audio) else base_dir / audio
+        survey_path = Path(survey) if os.path.isabs(survey) else base_dir / survey
+
+        job_id = str(row.get("id") or f"{index:05d}-{audio_path.stem}")
+        if job_id in seen_ids:
+            raise ValueError(f"Duplicate manifest id: {job_id}")
+        seen_ids.add(job_id)
+
+        jobs.append({"id": job_id, "audio": str(audio_path), "survey": str(survey_path),
+                     "agent": row.get("agent") or None})
+    return jobs
+
+
+def _build_pipeline(pipeline_kwargs: Dict[str, Any]) -> AudioAnalysisPipeline:
+    """Create a pipeline from picklable kwargs (caches are rebuilt from their settings)"""
+    kwargs = dict(pipeline_kwargs)
+    cache_dir = kwargs.pop("cache_dir", None)
+    cache = StageCache(cache_dir) if cache_dir else None
+    context_cache = PromptContextCache() if kwargs.pop("context_cache", False) else None
+    metrics_path = kwargs.pop("metrics_path", None)
+    metrics_hook = _get_metrics_sink(metrics_path) if metrics_path else None
+    preprocessor = AudioPreprocessor() if kwargs.pop("preprocess_audio", False) else None
+    chunker = LongAudioChunker() if kwargs.pop("long_audio", False) else None
+    gate = AudioGate() if kwargs.pop("audio_gate", False) else None
+    rate_limiter = ModelRateLimiter(
+        default_limit=RateLimit(kwargs.pop("requests_per_minute", 0), kwargs.pop("tokens_per_minute", 0)),
+        state_path=kwargs.pop("rate_limit_state", None),
+        max_retries=kwargs.pop("max_retries", 5)
+    )
+    return AudioAnalysisPipeline(cache=cache, context_cache=context_cache, metrics_hook=metrics_hook,
+                                 preprocessor=preprocessor, chunker=chunker, gate=gate,
+                                 rate_limiter=rate_limiter, **kwargs)
+
+
+_metrics_sinks: Dict[str, Any] = {}
+_metrics_sinks_lock = threading.Lock()
+
+
+def _get_metrics_sink(metrics_path: str):
+    """One metrics sink per path and process, shared by that process's workers"""
+    with _metrics_sinks_lock:
+        if metrics_path not in _metrics_sinks:
+            _metrics_sinks[metrics_path] = metrics_sink_for_path(metrics_path)
+        return _metrics_sinks[metrics_path]
+
+
+_analytics_stores: Dict[str, AnalyticsStore] = {}
+_analytics_stores_lock = threading.Lock()
+
+
+def _get_analytics_store(analytics_path: str) -> AnalyticsStore:
+    """One analytics store per path and process; SQLite serialises writers across processes"""
+    with _analytics_stores_lock:
+        if analytics_path not in _analytics_stores:
+            _analytics_stores[analytics_path] = AnalyticsStore(analytics_path)
+        return _analytics_stores[analytics_path]
+
+
+def _init_process_worker(pipeline_kwargs: Dict[str, Any]) -> None:
+    """Build the pipeline once per worker process"""
+    global _process_pipeline
+    _process_pipeline = _build_pipeline(pipeline_kwargs)
+
+
+def _get_pipeline() -> AudioAnalysisPipeline:
+    """Return the pipeline owned by the current worker"""
+    if _process_pipeline is not None:
+        return _process_pipeline
+    pipeline = getattr(_thread_state, "pipeline", None)
+    if pipeline is None:
+        pipeline = _build_pipeline(_pipeline_kwargs)
+        _thread_state.pipeline = pipeline
+    return pipeline
+
+
+def _run_job(job: Dict[str, str], output_root: str, resume: bool = False,
+             analytics_path: Optional[str] = None) -> Dict[str, Any]:
+    """Run one manifest entry through process_audio and report the outcome"""
+    started = time.time()
+    record = {"id": job["id"], "audio": job["audio"], "survey": job["survey"]}
+    try:
+        result = _get_pipeline().process_audio(
+            audio_file_path=job["audio"],
+            json_path_2=job["survey"],
+            output_dir=os.path.join(output_root, job["id"]),
+            verbose=False,
+            resume=resume
+        )
+        record.update(status="ok", final_path=result["final_path"], metrics=result["metrics"]["totals"])
+        if result.get("gate") and not result["gate"]["accepted"]:
+            record.update(status="skipped", reason=result["gate"]["reason"], detail=result["gate"]["detail"])
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    else:
+        if analytics_path:
+            # The call itself succeeded and its outputs exist; keep its status for --resume
+            try:
+                _get_analytics_store(analytics_path).record_result(job["id"], job.get("agent"), result)
+            except Exception as e:
+                record["analytics_error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.time() - started, 3)
+    return record
+
+
+def _emit(event: Dict[str, Any]) -> None:
+    """Print one JSON-lines progress event"""
+    sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def run_batch(
+    manifest_path: str,
+    credentials_path: str,
+    output_root: str = "./batch_output",
+    workers: int = 4,
+    executor: str = "thread",
+    project_id: Optional[str] = None,
+    location: str = "us-central1",
+    summary_filename: str = "batch_summary.json",
+    cache_dir: Optional[str] = None,
+    resume: bool = False,
+    audio_transport: str = "inline",
+    context_cache: bool = False,
+    metrics_path: Optional[str] = None,
+    preprocess_audio: bool = False,
+    long_audio: bool = False,
+    audio_gate: bool = False,
+    requests_per_minute: float = 0,
+    tokens_per_minute: float = 0,
+    max_retries: int = 5,
+    analytics_path: Optional[str] = None,
+    parquet_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run process_audio over every entry of a manifest using a worker pool
+
+    Args:
+        manifest_path: Path to the JSON-lines or CSV manifest
+        credentials_path: Path to Google Cloud credentials JSON file
+        output_root: Directory receiving one sub-directory per call
+        workers: Number of concurrent workers
+        executor: "thread" or "process"
+        project_id: Google Cloud project ID
+        location: Google Cloud location
+        summary_filename: Name of the summary file written into output_root
+        cache_dir: Optional stage cache directory shared by all workers
+        resume: Resume each call from the stage checkpoints in its output directory
+        audio_transport: "inline" (base64 in the request) or "upload" (File API)
+        context_cache: Cache the static prompts provider-side (one cache per worker)
+        metrics_path: Optional per-call telemetry sink: a JSON-lines file, or a
+            Prometheus textfile if it ends in .prom (thread executor only)
+        preprocess_audio: Downmix, resample, re-encode and trim silence before
+            transcription (requires ffmpeg)
+        long_audio: Transcribe long recordings as overlapping windows in parallel
+            (requires ffmpeg)
+        audio_gate: Skip model calls for invalid, very short or near-silent recordings
+        requests_per_minute: Per-model request quota shared by all workers (0 = unlimited)
+        tokens_per_minute: Per-model token quota shared by all workers (0 = unlimited)
+        max_retries: Retries of a model call after 429/5xx errors
+        analytics_path: Optional analytics database recording every call (keyed by
+            manifest id) for the Performance dashboard
+        parquet_dir: Optional Parquet dataset (partitioned by call date) receiving one
+            row per call and question of every completed call (calls already in it are skipped)
+
+    Returns:
+        Summary dictionary (also written to output_root/summary_filename)
+    """
+    global _pipeline_kwargs
+
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Unknown executor: {executor}")
+    if metrics_path and executor == "process" and metrics_path.lower().endswith(".prom"):
+        # Each process would aggregate and overwrite the textfile independently
+        raise ValueError("Prometheus metrics output requires the thread executor; use a JSON-lines path")
+
+    jobs = load_manifest(manifest_path)
+    os.makedirs(output_root, exist_ok=True)
+
+    pipeline_kwargs = {
+        "credentials_path": str(credentials_path),
+        "project_id": project_id,
+        "location": location,
+        "cache_dir": cache_dir,
+        "audio_transport": audio_transport,
+        "context_cache": context_cache,
+        "metrics_path": metrics_path,
+        "preprocess_audio": preprocess_audio,
+        "long_audio": long_audio,
+        "audio_gate": audio_gate,
+        # Workers (threads or processes) share their quota windows and 429 backoff through this file
+        "rate_limit_state": os.path.join(output_root, ".rate_limits.sqlite"),
+        "requests_per_minute": requests_per_minute,
+        "tokens_per_minute": tokens_per_minute,
+        "max_retries": max_retries,
+    }
+    _pipeline_kwargs = pipeline_kwargs
+
+    if executor == "process":
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_process_worker,
+            initargs=(pipeline_kwargs,)
+        )
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-worker")
+
+    started = time.time()
+    _emit({"event": "start", "total": len(jobs), "workers": workers, "executor": executor})
+
+    records = []
+    agents = {job["id"]: job.get("agent") for job in jobs}
+    writer = ParquetResultWriter(parquet_dir) if parquet_dir else None
+    with pool:
+        futures = [pool.submit(_run_job, job, output_root, resume, analytics_path) for job in jobs]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            if writer is not None and record["status"] in ("ok", "skipped"):
+                writer.add_file(record["final_path"], record["id"], agents[record["id"]])
+            _emit({"event": "done", "completed": len(records), "total": len(jobs), **record})
+    if writer is not None:
+        writer.close()
+
+    elapsed = time.time() - started
+    succeeded = [r for r in records if r["status"] in ("ok", "skipped")]
+    order = {job["id"]: i for i, job in enumerate(jobs)}
+    records.sort(key=lambda r: order[r["id"]])
+
+    summary = {
+        "manifest": str(manifest_path),
+        "total": len(jobs),
+        "succeeded": len(succeeded),
+        "failed": len(records) - len(succeeded),
+        "skipped": sum(1 for r in records if r["status"] == "skipped"),
+        "workers": workers,
+        "executor": executor,
+        "wall_seconds": round(elapsed, 3),
+        "mean_call_seconds": round(sum(r["seconds"] for r in records) / len(records), 3) if records else 0.0,
+        "calls_per_minute": round(len(records) * 60.0 / elapsed, 2) if elapsed > 0 else 0.0,
+        "parquet_rows": writer.rows_written if writer is not None else 0,
+        "results": records,
+    }
+
+    summary_path = os.path.join(output_root, summary_filename)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    _emit({
+        "event": "summary",
+        "total": summary["total"],
+        "succeeded": summary["succeeded"],
+        "failed": summary["failed"],
+        "wall_seconds": summary["wall_seconds"],
+        "summary_path": summary_path,
+    })
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the audio analysis pipeline over a manifest of calls")
+    parser.add_argument("manifest", help="JSON-lines or CSV manifest of audio/survey pairs")
+    parser.add_argument("--credentials", required=True, help="Path to Google Cloud credentials JSON")
+    parser.add_argument("--output-dir", default="./batch_output", help="Root directory for per-call outputs")
+    parser.add_argument("--workers", type=int, default=4, help="Number of concurrent workers")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="Worker pool type")
+    parser.add_argument("--project-id", default=None, help="Google Cloud project ID")
+    parser.add_argument("--location", default="us-central1", help="Google Cloud location")
+    parser.add_argument("--cache-dir", default=None, help="Stage cache directory (disabled if omitted)")
+    parser.add_argument("--resume", action="store_true", help="Resume calls from existing stage checkpoints")
+    parser.add_argument("--audio-transport", choices=["inline", "upload"], default="inline",
+                        help="Send audio inline as base64 or upload it through the File API")
+    parser.add_argument("--context-cache", action="store_true",
+                        help="Cache the static evaluation/analysis/comparison prompts provider-side")
+    parser.add_argument("--metrics-file", default=None,
+                        help="Append per-call stage telemetry as JSON lines (or Prometheus text for *.prom)")
+    parser.add_argument("--preprocess-audio", action="store_true",
+                        help="Downmix, resample, re-encode and trim silence before transcription (needs ffmpeg)")
+    parser.add_argument("--long-audio", action="store_true",
+                        help="Split long recordings into overlapping windows transcribed in parallel (needs ffmpeg)")
+    parser.add_argument("--audio-gate", action="store_true",
+                        help="Skip model calls for invalid, very short or near-silent recordings")
+    parser.add_argument("--rpm", type=float, default=0,
+                        help="Per-model requests-per-minute quota shared by all workers (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=0,
+                        help="Per-model tokens-per-minute quota shared by all workers (0 = unlimited)")
+    parser.add_argument("--max-retries", type=int, default=5,
+                        help="Retries of a model call after 429/5xx errors")
+    parser.add_argument("--analytics-db", default=None,
+                        help="Record each call's results and timings into this analytics database")
+    parser.add_argument("--parquet-dir", default=None,
+                        help="Append one row per call and question to this partitioned Parquet dataset"
+                             " (calls already exported are skipped)")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(
+        manifest_path=args.manifest,
+        credentials_path=args.credentials,
+        output_root=args.output_dir,
+        workers=args.workers,
+        executor=args.executor,
+        project_id=args.project_id,
+        location=args.location,
+        cache_dir=args.cache_dir,
+        resume=args.resume,
+        audio_transport=args.audio_transport,
+        context_cache=args.context_cache,
+        metrics_path=args.metrics_file,
+        preprocess_audio=args.preprocess_audio,
+        long_audio=args.long_audio,
+        audio_gate=args.audio_gate,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        max_retries=args.max_retries,
+        analytics_path=args.analytics_db,
+        parquet_dir=args.parquet_dir
+    )
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+# One row per call and question; the final output's [agent, ai, asked, semantic]
+# lists become one typed column each. Section and question keys repeat across
+# calls and are dictionary-encoded; the value columns are free model text.
+RESULT_SCHEMA = pa.schema([
+    ("call_id", pa.string()),
+    ("agent", pa.string()),
+    ("recorded_at", pa.timestamp("ms", tz="UTC")),
+    ("section", pa.dictionary(pa.int32(), pa.string())),
+    ("question", pa.dictionary(pa.int32(), pa.string())),
+    ("question_number", pa.int16()),
+    ("agent_recorded", pa.string()),
+    ("ai_finding", pa.string()),
+    ("agent_asked", pa.string()),
+    ("semantic", pa.string()),
+    ("call_date", pa.string()),  # partition column (UTC day of recorded_at)
+])
+PARTITION_COLUMN = "call_date"
+_VALUE_COLUMNS = ("agent_recorded", "ai_finding", "agent_asked", "semantic")
+
+_QUESTION_NUMBER = re.compile(r"(\d+)$")
+
+
+def final_output_columns(final: Dict[str, Any], call_id: str, agent: Optional[str] = None,
+                         recorded_at: Optional[float] = None) -> Dict[str, List[Any]]:
+    """
+    Column lists for one final output (the "summary" entry of rejected calls is skipped)
+
+    Returns:
+        ``{column: [value per question]}`` for every column of RESULT_SCHEMA
+    """
+    recorded_at = recorded_at if recorded_at is not None else time.time()
+    call_date = time.strftime("%Y-%m-%d", time.gmtime(recorded_at))
+    columns: Dict[str, List[Any]] = {name: [] for name in RESULT_SCHEMA.names}
+    for section_key, section in final.items():
+        if section_key == "summary" or not isinstance(section, dict):
+            continue
+        for question_key, values in section.items():
+            number = _QUESTION_NUMBER.search(str(question_key))
+            values = values if isinstance(values, list) else []
+            columns["section"].append(section_key)
+            columns["question"].append(question_key)
+            columns["question_number"].append(int(number.group(1)) if number else None)
+            for index, name in enumerate(_VALUE_COLUMNS):
+                value = values[index] if index < len(values) else None
+                columns[name].append(None if value is None else str(value))
+    rows = len(columns["section"])
+    columns["call_id"] = [call_id] * rows
+    columns["agent"] = [agent] * rows
+    columns["recorded_at"] = [int(recorded_at * 1000)] * rows
+    columns["call_date"] = [call_date] * rows
+    return columns
+
+
+def results_table(columns: Dict[str, List[Any]]) -> pa.Table:
+    """Arrow table in RESULT_SCHEMA from column lists"""
+    return pa.Table.from_pydict(
+        {name: pa.array(columns[name], type=RESULT_SCHEMA.field(name).type) for name in RESULT_SCHEMA.names},
+        schema=RESULT_SCHEMA
+    )
+
+
+def final_output_table(final: Dict[str, Any], call_id: str, agent: Optional[str] = None,
+                       recorded_at: Optional[float] = None) -> pa.Table:
+    """Arrow table with one row per question of one final output"""
+    return results_table(final_output_columns(final, call_id, agent, recorded_at))
+
+
+def parquet_bytes(table: pa.Table) -> bytes:
+    """Serialize a table as a single Parquet file"""
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def exported_call_ids(root: str) -> Set[str]:
+    """Distinct call ids already in a Parquet dataset (empty if it has no files yet)"""
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    if not dataset.files:
+        return set()
+    return set(dataset.to_table(columns=["call_id"]).column("call_id").unique().to_pylist())
+
+
+class ParquetResultWriter:
+    """
+    Appends per-question rows to a Parquet dataset partitioned by ``call_date``
+
+    Rows are buffered column-wise and written as one new part file per
+    partition each time ``rows_per_file`` rows have been added (and on
+    ``close``), so existing files are never rewritten and several writers may
+    append to the same root. Calls whose ``call_id`` is already in the
+    dataset (or buffered) are skipped, so re-exporting a resumed batch does
+    not duplicate rows; concurrent writers do not see each other's calls
+    until they flush. Read it back with
+    ``pyarrow.dataset.dataset(root, partitioning="hive")`` or any engine that
+    understands hive partitions.
+    """
+
+    def __init__(self, root: str, rows_per_file: int = 250_000):
+        self.root = root
+        self.rows_per_file = rows_per_file
+        self.rows_written = 0
+        self._columns: Dict[str, List[Any]] = {name: [] for name in RESULT_SCHEMA.names}
+        os.makedirs(root, exist_ok=True)
+        self.exported = exported_call_ids(root)
+
+    def add(self, final: Dict[str, Any], call_id: str, agent: Optional[str] = None,
+            recorded_at: Optional[float] = None) -> bool:
+        """Buffer one call's rows, flushing if the buffer is full; False if the call was already exported"""
+        if call_id in self.exported:
+            return False
+        self.exported.add(call_id)
+        for name, values in final_output_columns(final, call_id, agent, recorded_at).items():
+            self._columns[name].extend(values)
+        if len(self._columns["call_id"]) >= self.rows_per_file:
+            self.flush()
+        return True
+
+    def add_file(self, final_path: str, call_id: str, agent: Optional[str] = None,
+                 recorded_at: Optional[float] = None) -> bool:
+        """Buffer the rows of a final_output.json; False if the call was already exported"""
+        if call_id in self.exported:
+            return False
+        with open(final_path, "r", encoding="utf-8") as f:
+            final = json.load(f)
+        return self.add(final, call_id, agent, os.path.getmtime(final_path) if recorded_at is None else recorded_at)
+
+    def flush(self) -> None:
+        """Write buffered rows as new part files"""
+        rows = len(self._columns["call_id"])
+        if not rows:
+            return
+        pq.write_to_dataset(
+            results_table(self._columns), self.root,
+            partition_cols=[PARTITION_COLUMN],
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            compression="zstd"
+        )
+        self.rows_written += rows
+        self._columns = {name: [] for name in RESULT_SCHEMA.names}
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ParquetResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def export_output_root(output_root: str, parquet_dir: str, final_filename: str = "final_output.json") -> int:
+    """
+    Append every ``<output_root>/<call id>/final_output.json`` to a Parquet dataset
+
+    Returns:
+        Number of rows written
+    """
+    with ParquetResultWriter(parquet_dir) as writer:
+        for final_path in sorted(Path(output_root).glob(f"*/{final_filename}")):
+            writer.add_file(str(final_path), call_id=final_path.parent.name)
+    return writer.rows_written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export pipeline final outputs to partitioned Parquet")
+    parser.add_argument("output_root", help="Directory with one sub-directory per call (e.g. a batch output)")
+    parser.add_argument("parquet_dir", help="Parquet dataset root to append to")
+    args = parser.parse_args(argv)
+
+    rows = export_output_root(args.output_root, args.parquet_dir)
+    print(f"Wrote {rows} rows to {args.parquet_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
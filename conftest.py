@@ -0,0 +1 @@
+# Rootdir conftest: puts the repository's top-level modules on sys.path for tests/
@@ -1,11 +1,148 @@
+import asyncio
+import contextvars
 import json
 import base64
+import functools
 import os
+import queue
+import threading
+import time
+import weakref
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 import vertexai
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import AsyncIterator, Callable, Iterator, List, Tuple, Dict, Any, Optional
+
+from audio_gate import AudioGate, GateDecision
+from audio_chunking import ChunkWindow, LongAudioChunker, stitch_transcripts
+from audio_preprocess import AudioPreprocessor, shift_transcript_timestamps
+from audio_upload import AudioUploadManager, InlineAudio
+from result_cache import StageCache, sha256_file, sha256_text
+from precompare import PRECOMPARE_VERSION, combine_comparison, precompare_merged
+from prompt_cache import PromptContextCache
+from pipeline_metrics import (
+    CallMetrics, StageMetrics, current_stage, metrics_sink_for_path, record_model_call, timed_parse
+)
+from pipeline_pool import PipelinePool, get_default_pool
+from rate_limiter import ModelRateLimiter, RateLimit
+from stage_checkpoints import ArtifactWriter, StageCheckpoints, combine_fingerprint
+from transcript_stream import TranscriptStreamParser
+
+# Shared stage cache used by run_pipeline; set PIPELINE_CACHE_DIR="" to disable
+PIPELINE_CACHE_DIR = os.environ.get(
+    "PIPELINE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "audio-analysis-cache")
+)
+PIPELINE_CACHE_MAX_BYTES = int(os.environ.get("PIPELINE_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+_default_cache = None
+
+# Audio transport used by run_pipeline: "inline" (base64) or "upload" (File API)
+PIPELINE_AUDIO_TRANSPORT = os.environ.get("PIPELINE_AUDIO_TRANSPORT", "inline")
+
+# Provider-side context caching of the static prompts for run_pipeline ("1" to enable)
+PIPELINE_CONTEXT_CACHE = os.environ.get("PIPELINE_CONTEXT_CACHE", "0") == "1"
+PIPELINE_CONTEXT_CACHE_TTL = float(os.environ.get("PIPELINE_CONTEXT_CACHE_TTL", 60 * 60))
+_default_context_cache = None
+
+# Optional Step 0 audio preprocessing for run_pipeline ("1" to enable; needs ffmpeg)
+PIPELINE_PREPROCESS_AUDIO = os.environ.get("PIPELINE_PREPROCESS_AUDIO", "0") == "1"
+_default_preprocessor = None
+
+# Long-audio chunked transcription for run_pipeline ("1" to enable; needs ffmpeg)
+PIPELINE_LONG_AUDIO = os.environ.get("PIPELINE_LONG_AUDIO", "0") == "1"
+_default_chunker = None
+
+# Local pre-filter that skips unusable recordings for run_pipeline ("1" to enable)
+PIPELINE_AUDIO_GATE = os.environ.get("PIPELINE_AUDIO_GATE", "0") == "1"
+_default_gate = None
+
+# Per-call metrics sink for run_pipeline: a JSON-lines file, or Prometheus text if it ends in .prom
+PIPELINE_METRICS_PATH = os.environ.get("PIPELINE_METRICS_PATH", "")
+_default_metrics_hook = None
+
+# Shared per-model quota for run_pipeline (0 = unlimited); the SQLite state file
+# lets every process on the host draw from the same quota windows when a limit
+# is set ("" = per process)
+PIPELINE_RATE_LIMIT_RPM = float(os.environ.get("PIPELINE_RATE_LIMIT_RPM", 0))
+PIPELINE_RATE_LIMIT_TPM = float(os.environ.get("PIPELINE_RATE_LIMIT_TPM", 0))
+PIPELINE_RATE_LIMIT_STATE = os.environ.get(
+    "PIPELINE_RATE_LIMIT_STATE", os.path.join(tempfile.gettempdir(), "audio-analysis-rate-limits.sqlite")
+)
+PIPELINE_MAX_RETRIES = int(os.environ.get("PIPELINE_MAX_RETRIES", 5))
+_default_rate_limiter = None
+
+
+class PipelineStageError(RuntimeError):
+    """Raised when a pipeline stage fails; carries the name of the failing stage"""
+
+    def __init__(self, stage: str, cause: BaseException):
+        super().__init__(f"{stage} stage failed: {type(cause).__name__}: {cause}")
+        self.stage = stage
+        self.cause = cause
+
+
+@dataclass
+class StageArtifact:
+    """In-memory output of one stage: its serialized text and the parsed data"""
+    stage: str
+    text: str
+    data: Any
+
+    @functools.cached_property
+    def sha256(self) -> str:
+        return sha256_text(self.text)
+
+
+# Called with (stage, artifact, telemetry) as each stage finishes; may run on a worker thread
+StageCallback = Callable[[str, StageArtifact, StageMetrics], None]
+
+# Called with each chunk of a streamed response, and with None when the response starts over
+TextCallback = Callable[[Optional[str]], None]
+
+# Called with every transcript turn received so far while Step 1 streams in
+TranscriptCallback = Callable[[List[Dict[str, Any]]], None]
+
+# Artifacts of one call in the order they are produced (evaluation and analysis run together)
+PIPELINE_STAGES = ('transcription', 'evaluation', 'analysis', 'merged', 'comparison', 'final')
+
+
+@dataclass
+class StageEvent:
+    """
+    One step of iter_process_audio / aiter_process_audio
+
+    ``stage`` is a PIPELINE_STAGES name with its parsed output in ``data`` and
+    its telemetry (wall/model seconds, checkpoint reuse) in ``metrics``. The
+    last event has stage "result", the full process_audio result in ``data``
+    and no metrics.
+    """
+    stage: str
+    data: Any
+    metrics: Optional[StageMetrics]
+    completed: int
+    total: int = len(PIPELINE_STAGES)
+
+
+class _StageRun:
+    """Per-call state shared by the stages of one process_audio run"""
+
+    def __init__(self, paths: Dict[str, str], writer: Optional[ArtifactWriter], resume: bool, log,
+                 on_stage: Optional[StageCallback] = None, on_transcript: Optional[TranscriptCallback] = None):
+        self.paths = paths
+        self.writer = writer
+        self.resume = resume
+        self.log = log
+        self.metrics = CallMetrics()
+        self.on_stage = on_stage
+        self.on_transcript = on_transcript
+
+    def stage_done(self, stage: str, artifact: StageArtifact, metrics: StageMetrics) -> None:
+        if self.on_stage is not None:
+            self.on_stage(stage, artifact, metrics)
 
 
 class AudioAnalysisPipeline:
@@ -14,7 +151,16 @@ class AudioAnalysisPipeline:
     comparison, and final consolidated output generation.
     """
     
-    def __init__(self, credentials_path: str, project_id: str = None, location: str = "us-central1"):
+    def __init__(self, credentials_path: str, project_id: str = None, location: str = "us-central1",
+                 max_concurrent_requests: int = 64, cache: Optional[StageCache] = None,
+                 audio_transport: str = "inline", audio_uploads: Optional[AudioUploadManager] = None,
+                 context_cache: Optional[PromptContextCache] = None, local_precompare: bool = True,
+                 metrics_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 model_factory: Optional[Callable[[str], Any]] = None,
+                 preprocessor: Optional[AudioPreprocessor] = None,
+                 chunker: Optional[LongAudioChunker] = None,
+                 gate: Optional[AudioGate] = None,
+                 rate_limiter: Optional[ModelRateLimiter] = None):
         """
         Initialize the pipeline with credentials
         
@@ -22,16 +168,54 @@ class AudioAnalysisPipeline:
             credentials_path: Path to Google Cloud credentials JSON file (Gemini API key)
             project_id: Google Cloud project ID
             location: Google Cloud location
+            max_concurrent_requests: Default bound on in-flight model calls for the async API
+            cache: Optional on-disk stage cache; hits skip the model call entirely
+            audio_transport: "inline" to send base64 audio in the request, or "upload"
+                to stream it once through the File API and reference the handle
+            audio_uploads: Upload manager for the "upload" transport (defaults to the Gemini File API)
+            context_cache: Optional provider-side context cache for the static evaluation,
+                analysis and comparison prompts
+            local_precompare: Settle obvious answer pairs locally before the Step 5
+                comparison call, which is skipped entirely when nothing is left
+            metrics_hook: Optional callable receiving each call's telemetry record
+                (see pipeline_metrics for JSON-lines and Prometheus sinks)
+            model_factory: Builds the model for a model name (defaults to
+                genai.GenerativeModel); used to inject stub models offline
+            preprocessor: Optional Step 0 that downmixes, resamples, re-encodes and
+                trims silence before transcription; timestamps are mapped back
+            chunker: Optional long-audio mode: long recordings are split at silence
+                into overlapping windows, transcribed in parallel and stitched
+            gate: Optional local pre-filter; rejected recordings (invalid, too short,
+                too little speech) skip every model call
+            rate_limiter: Per-model RPM/TPM windows and 429/5xx retry policy shared by
+                every model call (defaults to unlimited, in-process, with retries)
         """
         os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
         self.project_id = project_id if project_id else str(os.environ.get("GOOGLE_CLOUD_PROJECT"))
         self.location = location
+        self.max_concurrent_requests = max_concurrent_requests
+        self.cache = cache
+        if audio_transport not in ("inline", "upload"):
+            raise ValueError(f"Unknown audio_transport: {audio_transport}")
+        self.audio_transport = audio_transport
+        self.audio_uploads = audio_uploads or (AudioUploadManager() if audio_transport == "upload" else None)
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._writer_executor = None
+        self._writer_lock = threading.Lock()
+        self.context_cache = context_cache
+        self.local_precompare = local_precompare
+        self.metrics_hook = metrics_hook
+        self.preprocessor = preprocessor
+        self.chunker = chunker
+        self.gate = gate
+        self.rate_limiter = rate_limiter or ModelRateLimiter()
         
         # Initialize Vertex AI
         vertexai.init(project=self.project_id, location=self.location)
-        self.model_lite = genai.GenerativeModel("gemini-2.5-flash")
-        ###self.model_pro = genai.GenerativeModel("gemini-2.5-pro")
-        self.model_pro = genai.GenerativeModel("gemini-2.5-flash")
+        model_factory = model_factory or genai.GenerativeModel
+        self.model_lite = model_factory("gemini-2.5-flash")
+        ###self.model_pro = model_factory("gemini-2.5-pro")
+        self.model_pro = model_factory("gemini-2.5-flash")
         self.generation_config = genai.GenerationConfig(temperature=0.1)
         
         # Initialize all prompts
@@ -683,25 +867,41 @@ Return your comparison results in the following JSON structure:
 Now, please analyze the  JSON with answer pairs and provide the semantic comparison results in the specified JSON format:
  '''
 
-    def _load_audio_to_base64(self, file_path: str) -> Tuple[str, str]:
-        """Convert audio file to base64 encoding and determine mime type"""
-        with open(file_path, "rb") as audio_file:
-            audio_data = base64.b64encode(audio_file.read()).decode("utf-8")
-        
+        # Static prompts eligible for provider-side context caching
+        self._context_cacheable_prompts = (self.evaluation_prompt, self.analysis_prompt, self.comparison_prompt)
+
+    def _audio_mime_type(self, file_path: str) -> str:
+        """Determine audio mime type from the file extension"""
         file_extension = os.path.splitext(file_path)[1].lower()
-        mime_type = {
+        return {
             '.m4a': 'audio/m4a',
             '.mp4': 'audio/mp4',
             '.mp3': 'audio/mp3',
             '.wav': 'audio/wav'
         }.get(file_extension, 'application/octet-stream')
+
+    def _load_audio_to_base64(self, file_path: str) -> Tuple[str, str]:
+        """Convert audio file to base64 encoding and determine mime type"""
+        with open(file_path, "rb") as audio_file:
+            audio_data = base64.b64encode(audio_file.read()).decode("utf-8")
         
-        return audio_data, mime_type
+        return audio_data, self._audio_mime_type(file_path)
+
+    def _audio_source(self, file_path: str, mime_type: str, audio_hash: str):
+        """
+        Lease on the recording for the configured transport
 
-    def _load_json_to_base64(self, file_path: str) -> str:
-        """Convert JSON file to base64 encoding"""
-        with open(file_path, "rb") as json_file:
-            return base64.standard_b64encode(json_file.read()).decode("utf-8")
+        The lease's ``part()`` builds the content part lazily (inline base64 or
+        a File API reference) and ``release()`` cleans up any upload.
+        """
+        if self.audio_transport == "upload":
+            return self.audio_uploads.lease(file_path, mime_type, audio_hash)
+        return InlineAudio(lambda: {'mime_type': mime_type, 'data': self._load_audio_to_base64(file_path)[0]})
+
+    def _text_part(self, artifact: StageArtifact) -> Dict[str, str]:
+        """Base64 text/plain content part for a stage artifact"""
+        data = base64.standard_b64encode(artifact.text.encode("utf-8")).decode("utf-8")
+        return {'mime_type': 'text/plain', 'data': data}
 
     def _clean_json_output(self, content: str) -> str:
         """Clean JSON output by removing markdown code blocks"""
@@ -710,46 +910,598 @@ Now, please analyze the  JSON with answer pairs and provide the semantic compari
             lines = lines[1:-1]
         return ''.join(lines)
 
-    def _save_output(self, content: str, output_path: str, clean: bool = True) -> None:
-        """Save content to file"""
-        if clean:
-            content = self._clean_json_output(content)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(content)
+    def _artifact_from_text(self, stage: str, text: str) -> StageArtifact:
+        """Stage artifact from serialized text; data falls back to the raw text if it is not JSON"""
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = text
+        return StageArtifact(stage, text, data)
+
+    def _artifact_from_data(self, stage: str, data: Any) -> StageArtifact:
+        """Stage artifact from a JSON-serializable object"""
+        return StageArtifact(stage, json.dumps(data, ensure_ascii=False, indent=2), data)
+
+    def _cache_key(self, model, prompt: str, input_hash: Optional[str]) -> Optional[str]:
+        """Stage cache key, or None when caching is disabled for this call"""
+        if self.cache is None or input_hash is None:
+            return None
+        return StageCache.make_key(input_hash, prompt, model.model_name, self.generation_config)
+
+    def _context_cached_model(self, model, prompt: str):
+        """Model bound to a provider-side cache of a static prompt, or None to send it inline"""
+        if self.context_cache is None or prompt not in self._context_cacheable_prompts:
+            return None
+        return self.context_cache.model_for(model, prompt, self.generation_config)
+
+    def _timed_generate(self, model, contents: list, on_text: Optional[TextCallback] = None):
+        """
+        generate_content within the model's rate limit, retrying 429/5xx errors and
+        recording latency, tokens and payload sizes on the current stage
+
+        With ``on_text`` the response is streamed and ``on_text`` receives the
+        text of every chunk, and None before each attempt so a retry starts over.
+        """
+        def request():
+            started = time.perf_counter()
+            if on_text is None:
+                response = model.generate_content(contents, generation_config=self.generation_config)
+            else:
+                on_text(None)
+                response = model.generate_content(contents, generation_config=self.generation_config, stream=True)
+                for chunk in response:
+                    if chunk.parts:
+                        on_text(chunk.text)
+            record_model_call(time.perf_counter() - started, contents, response)
+            return response
+
+        return self.rate_limiter.call(model.model_name, contents, request)
+
+    async def _timed_generate_async(self, model, contents: list, on_text: Optional[TextCallback] = None):
+        """Async twin of _timed_generate"""
+        async def request():
+            started = time.perf_counter()
+            if on_text is None:
+                response = await model.generate_content_async(contents, generation_config=self.generation_config)
+            else:
+                on_text(None)
+                response = await model.generate_content_async(
+                    contents, generation_config=self.generation_config, stream=True
+                )
+                async for chunk in response:
+                    if chunk.parts:
+                        on_text(chunk.text)
+            record_model_call(time.perf_counter() - started, contents, response)
+            return response
+
+        return await self.rate_limiter.call_async(model.model_name, contents, request)
+
+    def _call_model(self, model, part, prompt: str, on_text: Optional[TextCallback] = None):
+        """generate_content for one stage, using the context-cached prompt when available"""
+        cached_model = self._context_cached_model(model, prompt)
+        if cached_model is not None:
+            try:
+                return self._timed_generate(cached_model, [part], on_text)
+            except google_exceptions.NotFound:
+                # Cache expired or was deleted provider-side; fall back to the inline prompt
+                self.context_cache.invalidate(model, prompt)
+        return self._timed_generate(model, [part, prompt], on_text)
+
+    async def _call_model_async(self, model, part, prompt: str, on_text: Optional[TextCallback] = None):
+        """Async twin of _call_model"""
+        cached_model = None
+        if self.context_cache is not None and prompt in self._context_cacheable_prompts:
+            cached_model = await asyncio.to_thread(self._context_cached_model, model, prompt)
+        if cached_model is not None:
+            try:
+                return await self._timed_generate_async(cached_model, [part], on_text)
+            except google_exceptions.NotFound:
+                await asyncio.to_thread(self.context_cache.invalidate, model, prompt)
+        return await self._timed_generate_async(model, [part, prompt], on_text)
+
+    def _mark_cache_hit(self) -> None:
+        metrics = current_stage()
+        if metrics is not None:
+            metrics.cache_hit = True
+
+    def _parse_model_output(self, stage: str, text: str) -> StageArtifact:
+        """Strip the markdown fence from a model response and parse it into a stage artifact"""
+        with timed_parse():
+            return self._artifact_from_text(stage, self._clean_json_output(text))
+
+    def _generate_text(self, model, part, prompt: str, input_hash: Optional[str] = None,
+                       on_text: Optional[TextCallback] = None) -> str:
+        """
+        Call ``model`` with ``[part, prompt]`` and return the raw response text
+
+        ``part`` may be a callable returning the content part, so that cache
+        hits skip loading and encoding the input entirely. With ``on_text`` the
+        response is streamed (see _timed_generate).
+        """
+        cache_key = self._cache_key(model, prompt, input_hash)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._mark_cache_hit()
+                return cached
+
+        response = self._call_model(model, part() if callable(part) else part, prompt, on_text)
+        text = response.text
+        if cache_key is not None:
+            self.cache.put(cache_key, text)
+        return text
+
+    async def _generate_text_async(self, model, part, prompt: str, semaphore: asyncio.Semaphore,
+                                   input_hash: Optional[str] = None,
+                                   on_text: Optional[TextCallback] = None) -> str:
+        """Async twin of _generate_text; the model call is bounded by ``semaphore``"""
+        cache_key = self._cache_key(model, prompt, input_hash)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                self._mark_cache_hit()
+                return cached
+
+        if callable(part):
+            part = await asyncio.to_thread(part)
+        async with semaphore:
+            response = await self._call_model_async(model, part, prompt, on_text)
+        text = response.text
+        if cache_key is not None:
+            await asyncio.to_thread(self.cache.put, cache_key, text)
+        return text
+
+    def _run_text_stage(self, stage: str, model, source: StageArtifact, prompt: str) -> StageArtifact:
+        """Run a text-only model stage over an upstream artifact"""
+        text = self._generate_text(
+            model,
+            lambda: self._text_part(source),
+            prompt,
+            input_hash=source.sha256
+        )
+        return self._parse_model_output(stage, text)
+
+    async def _run_text_stage_async(self, stage: str, model, source: StageArtifact, prompt: str,
+                                    semaphore: asyncio.Semaphore) -> StageArtifact:
+        """Async twin of _run_text_stage"""
+        text = await self._generate_text_async(
+            model,
+            lambda: self._text_part(source),
+            prompt,
+            semaphore,
+            input_hash=source.sha256
+        )
+        return self._parse_model_output(stage, text)
+
+    def _transcription_fingerprint(self, audio_hash: str) -> str:
+        """Step 1 fingerprint; includes the preprocessing settings when Step 0 is on"""
+        fingerprint = self._stage_fingerprint(self.model_lite, self.transcription_prompt, audio_hash)
+        if self.preprocessor is not None:
+            fingerprint = combine_fingerprint('transcription', self.preprocessor.fingerprint, fingerprint)
+        if self.chunker is not None:
+            fingerprint = combine_fingerprint('transcription-chunked', self.chunker.fingerprint, fingerprint)
+        return fingerprint
+
+    def _prepare_audio(self, run: _StageRun, audio_file_path: str, mime_type: str, audio_hash: str):
+        """
+        Step 0: preprocess the recording when a preprocessor is configured
+
+        Returns:
+            Tuple of (audio path, MIME type, input hash, PreparedAudio or None)
+        """
+        if self.preprocessor is None:
+            return audio_file_path, mime_type, audio_hash, None
+        prepared = self.preprocessor.prepare(audio_file_path)
+        run.log(f"   -> Preprocessed audio: {prepared.original_bytes / 1e6:.1f} MB -> "
+                f"{prepared.processed_bytes / 1e6:.1f} MB, {prepared.original_duration:.1f} s -> "
+                f"{prepared.offset_map.processed_duration:.1f} s")
+        input_hash = combine_fingerprint('preprocessed', audio_hash, self.preprocessor.fingerprint)
+        return prepared.path, prepared.mime_type, input_hash, prepared
+
+    def _transcript_stream(self, run: _StageRun, prepared) -> Optional[TextCallback]:
+        """
+        Streaming handler for a single-request transcription, or None when nobody listens
+
+        Turns are parsed as they arrive, mapped back to original-recording times
+        when preprocessed, and reported to the run's on_transcript callback.
+        """
+        if run.on_transcript is None:
+            return None
+        parser = TranscriptStreamParser()
+
+        def on_text(chunk: Optional[str]) -> None:
+            if chunk is None:
+                parser.reset()
+                return
+            turns = parser.feed(chunk)
+            if not turns:
+                return
+            if prepared is not None:
+                shift_transcript_timestamps({"Call Details": {"Transcript": turns}}, prepared.offset_map.to_original)
+            run.on_transcript(list(parser.turns))
+
+        return on_text
+
+    def _restore_timestamps(self, transcript: StageArtifact, prepared) -> StageArtifact:
+        """Map transcript times in preprocessed audio back to the original recording"""
+        if prepared is None or not isinstance(transcript.data, dict):
+            return transcript
+        return self._artifact_from_data(
+            'transcription', shift_transcript_timestamps(transcript.data, prepared.offset_map.to_original)
+        )
 
-    def _merge_survey_jsons(self, json1_path: str, json2_path: str, output_path: str) -> None:
+    def _plan_chunks(self, run: _StageRun, path: str) -> Optional[list]:
+        """Long-audio windows for ``path``, or None to transcribe it in one request"""
+        if self.chunker is None:
+            return None
+        windows = self.chunker.plan(path)
+        if windows:
+            run.log(f"   -> Long audio: transcribing {len(windows)} overlapping windows in parallel")
+        return windows
+
+    def _chunk_request(self, path: str, input_hash: str, window: ChunkWindow, chunk_dir: str):
+        """
+        Lazy content part and cache hash for one window
+
+        The window is only cut out of the recording when the part is needed,
+        so cached windows cost nothing.
+        """
+        chunk_hash = combine_fingerprint(
+            'chunk', input_hash, self.chunker.fingerprint, f"{window.start:.3f}", f"{window.end:.3f}"
+        )
+        chunk_path = os.path.join(chunk_dir, f"window-{window.index:03d}{self.chunker.extension}")
+        audio = self._audio_source(chunk_path, self.chunker.mime_type, chunk_hash)
+
+        def part():
+            if not os.path.exists(chunk_path):
+                self.chunker.extract(path, window, chunk_path)
+            return audio.part()
+
+        return audio, part, chunk_hash
+
+    def _chunk_transcript(self, window: ChunkWindow, text: str) -> Dict[str, Any]:
+        data = self._parse_model_output('transcription', text).data
+        if not isinstance(data, dict):
+            raise ValueError(f"Transcript of window {window.index} is not a JSON object")
+        return data
+
+    def _transcribe_chunks(self, path: str, input_hash: str, windows: list) -> StageArtifact:
+        """Transcribe long-audio windows in parallel and stitch them into one transcript"""
+        chunk_dir = tempfile.mkdtemp(prefix="audio-chunks-")
+
+        def transcribe_window(window: ChunkWindow) -> Dict[str, Any]:
+            audio, part, chunk_hash = self._chunk_request(path, input_hash, window, chunk_dir)
+            with audio:
+                text = self._generate_text(self.model_lite, part, self.transcription_prompt, input_hash=chunk_hash)
+            return self._chunk_transcript(window, text)
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(windows), self.chunker.max_parallel),
+                                    thread_name_prefix="transcribe-window") as executor:
+                # Copy the context so window model calls are recorded on the transcription stage
+                futures = [
+                    executor.submit(contextvars.copy_context().run, transcribe_window, window)
+                    for window in windows
+                ]
+                transcripts = [future.result() for future in futures]
+        finally:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+        return self._artifact_from_data('transcription', stitch_transcripts(windows, transcripts))
+
+    async def _transcribe_chunks_async(self, path: str, input_hash: str, windows: list,
+                                       semaphore: asyncio.Semaphore) -> StageArtifact:
+        """Async twin of _transcribe_chunks; windows share the request semaphore"""
+        chunk_dir = await asyncio.to_thread(tempfile.mkdtemp, prefix="audio-chunks-")
+        window_slots = asyncio.Semaphore(self.chunker.max_parallel)
+
+        async def transcribe_window(window: ChunkWindow) -> Dict[str, Any]:
+            audio, part, chunk_hash = self._chunk_request(path, input_hash, window, chunk_dir)
+            async with window_slots:
+                try:
+                    text = await self._generate_text_async(
+                        self.model_lite, part, self.transcription_prompt, semaphore, input_hash=chunk_hash
+                    )
+                finally:
+                    await asyncio.to_thread(audio.release)
+            return self._chunk_transcript(window, text)
+
+        try:
+            transcripts = await asyncio.gather(*(transcribe_window(window) for window in windows))
+        finally:
+            await asyncio.to_thread(shutil.rmtree, chunk_dir, True)
+        return self._artifact_from_data('transcription', stitch_transcripts(windows, list(transcripts)))
+
+    def _transcribe(self, run: _StageRun, audio_file_path: str, mime_type: str, audio_hash: str) -> StageArtifact:
+        """Steps 0 and 1: optional preprocessing, then transcription of the recording"""
+        path, mime_type, input_hash, prepared = self._prepare_audio(run, audio_file_path, mime_type, audio_hash)
+        try:
+            windows = self._plan_chunks(run, path)
+            if windows:
+                transcript = self._transcribe_chunks(path, input_hash, windows)
+            else:
+                with self._audio_source(path, mime_type, input_hash) as audio:
+                    text = self._generate_text(
+                        self.model_lite,
+                        audio.part,
+                        self.transcription_prompt,
+                        input_hash=input_hash,
+                        on_text=self._transcript_stream(run, prepared)
+                    )
+                transcript = self._parse_model_output('transcription', text)
+        finally:
+            if prepared is not None:
+                prepared.cleanup()
+        return self._restore_timestamps(transcript, prepared)
+
+    async def _transcribe_async(self, run: _StageRun, audio_file_path: str, mime_type: str, audio_hash: str,
+                                semaphore: asyncio.Semaphore) -> StageArtifact:
+        """Async twin of _transcribe"""
+        path, mime_type, input_hash, prepared = await asyncio.to_thread(
+            self._prepare_audio, run, audio_file_path, mime_type, audio_hash
+        )
+        try:
+            windows = await asyncio.to_thread(self._plan_chunks, run, path)
+            if windows:
+                transcript = await self._transcribe_chunks_async(path, input_hash, windows, semaphore)
+            else:
+                audio = self._audio_source(path, mime_type, input_hash)
+                try:
+                    text = await self._generate_text_async(
+                        self.model_lite,
+                        audio.part,
+                        self.transcription_prompt,
+                        semaphore,
+                        input_hash=input_hash,
+                        on_text=self._transcript_stream(run, prepared)
+                    )
+                finally:
+                    await asyncio.to_thread(audio.release)
+                transcript = self._parse_model_output('transcription', text)
+        finally:
+            if prepared is not None:
+                await asyncio.to_thread(prepared.cleanup)
+        return self._restore_timestamps(transcript, prepared)
+
+    def _comparison_fingerprint(self, merged: StageArtifact) -> str:
+        """Step 5 fingerprint over the canonical merged answers; includes the local matcher version when pre-comparison is on"""
+        canonical = sha256_text(json.dumps(merged.data, ensure_ascii=False, sort_keys=True))
+        fingerprint = self._stage_fingerprint(self.model_lite, self.comparison_prompt, canonical)
+        if self.local_precompare:
+            fingerprint = combine_fingerprint('comparison', PRECOMPARE_VERSION, fingerprint)
+        return fingerprint
+
+    def _precompare(self, run: _StageRun, merged: StageArtifact):
+        """
+        Settle obvious answer pairs locally
+
+        Returns (settled, pending) where pending is the artifact of unresolved
+        pairs to send to comparison_prompt, or None if nothing is left for the model.
+        """
+        settled, unresolved = precompare_merged(merged.data)
+        settled_count = sum(len(section) for section in settled.values())
+        if not unresolved:
+            run.log(f"   -> All {settled_count} answer pairs settled locally; skipping comparison model call")
+            return settled, None
+        run.log(f"   -> {settled_count} answer pairs settled locally, "
+                f"{sum(len(section) for section in unresolved.values())} sent for semantic comparison")
+        return settled, self._artifact_from_data('comparison_input', unresolved)
+
+    def _run_comparison_stage(self, run: _StageRun, merged: StageArtifact) -> StageArtifact:
+        """Step 5: local pre-comparison, then comparison_prompt on the unresolved pairs only"""
+        if not self.local_precompare or not isinstance(merged.data, dict):
+            return self._run_text_stage('comparison', self.model_lite, merged, self.comparison_prompt)
+        settled, pending = self._precompare(run, merged)
+        model_output = None
+        if pending is not None:
+            model_output = self._run_text_stage('comparison', self.model_lite, pending, self.comparison_prompt).data
+        return self._artifact_from_data('comparison', combine_comparison(merged.data, settled, model_output))
+
+    async def _run_comparison_stage_async(self, run: _StageRun, merged: StageArtifact,
+                                          semaphore: asyncio.Semaphore) -> StageArtifact:
+        """Async twin of _run_comparison_stage"""
+        if not self.local_precompare or not isinstance(merged.data, dict):
+            return await self._run_text_stage_async(
+                'comparison', self.model_lite, merged, self.comparison_prompt, semaphore
+            )
+        settled, pending = self._precompare(run, merged)
+        model_output = None
+        if pending is not None:
+            model_output = (await self._run_text_stage_async(
+                'comparison', self.model_lite, pending, self.comparison_prompt, semaphore
+            )).data
+        return self._artifact_from_data('comparison', combine_comparison(merged.data, settled, model_output))
+
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """Return the pipeline's request semaphore for the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._async_semaphores[loop] = semaphore
+        return semaphore
+
+    def _get_writer_executor(self) -> ThreadPoolExecutor:
+        """Shared background executor for artifact persistence"""
+        with self._writer_lock:
+            if self._writer_executor is None:
+                self._writer_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="artifact-writer")
+            return self._writer_executor
+
+    def close(self) -> None:
+        """Release background resources (artifact writer threads)"""
+        with self._writer_lock:
+            executor, self._writer_executor = self._writer_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _stage_fingerprint(self, model, prompt: str, input_hash: str) -> str:
+        """Fingerprint of a model stage's inputs: input content, prompt, model and config"""
+        return StageCache.make_key(input_hash, prompt, model.model_name, self.generation_config)
+
+    def _start_run(self, output_dir: str, filenames: Dict[str, str], persist: bool, resume: bool,
+                   verbose: bool, on_stage: Optional[StageCallback] = None,
+                   on_transcript: Optional[TranscriptCallback] = None) -> _StageRun:
+        """Set up per-call state; with ``persist`` the output directory and manifest are prepared"""
+        if resume and not persist:
+            raise ValueError("resume requires persist=True")
+        log = print if verbose else (lambda *args, **kwargs: None)
+        paths = {stage: os.path.join(output_dir, filename) for stage, filename in filenames.items()}
+        writer = None
+        if persist:
+            os.makedirs(output_dir, exist_ok=True)
+            writer = ArtifactWriter(StageCheckpoints(output_dir), self._get_writer_executor())
+        return _StageRun(paths, writer, resume, log, on_stage, on_transcript)
+
+    def _reuse_checkpoint(self, run: _StageRun, stage: str, fingerprint: str) -> Optional[StageArtifact]:
+        """Artifact loaded from a valid checkpoint when resuming, otherwise None"""
+        if not run.resume:
+            return None
+        text = run.writer.checkpoints.load_valid(stage, fingerprint, run.paths[stage])
+        if text is None:
+            return None
+        run.log(f"   -> Reusing checkpointed {stage} from {run.paths[stage]}")
+        return self._artifact_from_text(stage, text)
+
+    def _finish_stage(self, run: _StageRun, artifact: StageArtifact, fingerprint: str) -> StageArtifact:
+        """Queue a freshly produced artifact for background persistence"""
+        if run.writer is not None:
+            path = run.paths[artifact.stage]
+            run.writer.submit(artifact.stage, fingerprint, path, artifact.text, artifact.sha256)
+            run.log(f"   -> Completed {artifact.stage} (saving to {path})")
+        else:
+            run.log(f"   -> Completed {artifact.stage}")
+        return artifact
+
+    def _run_stage(self, run: _StageRun, stage: str, fingerprint: str, produce) -> StageArtifact:
+        """
+        Produce one stage artifact, reusing a valid checkpoint when resuming
+
+        ``produce`` is a no-argument callable returning the stage's StageArtifact.
+        """
+        with run.metrics.track(stage) as metrics:
+            artifact = self._reuse_checkpoint(run, stage, fingerprint)
+            metrics.checkpoint_reused = artifact is not None
+            if artifact is None:
+                artifact = self._finish_stage(run, produce(), fingerprint)
+        run.stage_done(stage, artifact, metrics)
+        return artifact
+
+    async def _run_stage_async(self, run: _StageRun, stage: str, fingerprint: str, produce) -> StageArtifact:
+        """Async twin of _run_stage; ``produce`` returns an awaitable"""
+        with run.metrics.track(stage) as metrics:
+            artifact = await asyncio.to_thread(self._reuse_checkpoint, run, stage, fingerprint)
+            metrics.checkpoint_reused = artifact is not None
+            if artifact is None:
+                artifact = self._finish_stage(run, await produce(), fingerprint)
+        run.stage_done(stage, artifact, metrics)
+        return artifact
+
+    def _build_result(self, run: _StageRun, artifacts: Dict[str, StageArtifact]) -> dict:
+        """Result dict with ``<stage>_path`` (None when not persisted) and parsed ``<stage>`` content"""
+        result = {
+            f"{stage}_path": run.paths[stage] if run.writer is not None else None
+            for stage in artifacts
+        }
+        result.update({stage: artifact.data for stage, artifact in artifacts.items()})
+        return result
+
+    def _gated_result(self, run: _StageRun, artifacts: Dict[str, StageArtifact], decision: GateDecision,
+                      audio_file_path: str) -> dict:
+        """Result dict for a call rejected by the gate"""
+        result = self._build_result(run, artifacts)
+        result['gate'] = decision.to_dict()
+        self._emit_metrics(run, result, audio_file_path)
+        run.log("\n✓ Pipeline skipped: recording rejected by the pre-filter")
+        return result
+
+    def _emit_metrics(self, run: _StageRun, result: dict, audio_file_path: str) -> None:
+        """Attach the call's telemetry to ``result`` and pass it to the metrics hook"""
+        record = run.metrics.to_dict(audio_file=os.path.basename(audio_file_path))
+        result['metrics'] = record
+        if self.metrics_hook is not None:
+            self.metrics_hook(record)
+
+    def _check_gate(self, run: _StageRun, audio_file_path: str) -> Optional[GateDecision]:
+        """Run the pre-filter, if configured; None means no gate"""
+        if self.gate is None:
+            return None
+        with run.metrics.track('gate'):
+            decision = self.gate.check(audio_file_path)
+        if not decision.accepted:
+            run.log(f"   -> Skipping model stages ({decision.reason}): {decision.detail}")
+        return decision
+
+    def _rejected_artifacts(self, survey: StageArtifact, decision: GateDecision) -> Dict[str, StageArtifact]:
+        """
+        Stage artifacts for a recording rejected by the gate
+
+        Every AI-side answer, quality rating and comparison is "Not Available";
+        the final output carries the rejection under "summary".
+        """
+        status = {"status": "rejected", **decision.to_dict()}
+        transcript = {"Call Details": {"Number of Speakers": "0", "Transcript": []}}
+        evaluation = {"quality_assessment": {}, "summary": status}
+        merged = self._merge_survey_jsons(survey.data, {})
+        comparison = {"summary": status}
+        final = self._create_final_output(merged, evaluation, comparison)
+        final["summary"] = status
+        return {
+            stage: self._artifact_from_data(stage, data)
+            for stage, data in (
+                ('transcription', transcript),
+                ('evaluation', evaluation),
+                ('analysis', {}),
+                ('merged', merged),
+                ('comparison', comparison),
+                ('final', final),
+            )
+        }
+
+    def _finish_rejected(self, run: _StageRun, survey: StageArtifact, decision: GateDecision,
+                         audio_hash: str) -> Dict[str, StageArtifact]:
+        """Queue the rejected call's artifacts for persistence"""
+        artifacts = self._rejected_artifacts(survey, decision)
+        for stage, artifact in artifacts.items():
+            fingerprint = combine_fingerprint(stage, 'rejected', self.gate.fingerprint, audio_hash, survey.sha256)
+            with run.metrics.track(stage) as metrics:
+                self._finish_stage(run, artifact, fingerprint)
+            run.stage_done(stage, artifact, metrics)
+        return artifacts
+
+    def _read_survey(self, json_path: str) -> StageArtifact:
+        """Read the agent's survey JSON once, keeping its bytes' hash for fingerprints"""
+        with open(json_path, "rb") as f:
+            raw = f.read()
+        return StageArtifact("survey", raw.decode("utf-8"), json.loads(raw))
+
+    def _merge_survey_jsons(self, json1: Dict[str, Any], json2: Dict[str, Any]) -> Dict[str, Any]:
         """Merge two survey JSONs side by side"""
-        with open(json1_path, 'r', encoding='utf-8') as f:
-            json1 = json.load(f)
-        with open(json2_path, 'r', encoding='utf-8') as f:
-            json2 = json.load(f)
+        if not isinstance(json1, dict) or not isinstance(json2, dict):
+            raise ValueError("Survey answers must be JSON objects")
 
+        # First-seen order (json1, then json2) so the merged text, and every
+        # fingerprint derived from it, is the same in every process
         merged_json = {}
-        all_sections = set(json1.keys()) | set(json2.keys())
+        all_sections = dict.fromkeys([*json1.keys(), *json2.keys()])
 
         for section_key in all_sections:
             merged_json[section_key] = {}
             section1 = json1.get(section_key, {})
             section2 = json2.get(section_key, {})
-            all_questions = set(section1.keys()) | set(section2.keys())
+            all_questions = dict.fromkeys([*section1.keys(), *section2.keys()])
 
             for question_key in all_questions:
                 value1 = section1.get(question_key, "Not Available")
                 value2 = section2.get(question_key, "Not Available")
                 merged_json[section_key][question_key] = [value1, value2]
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(merged_json, f, ensure_ascii=False, indent=2)
 
-    def _create_final_output(self, answers_path: str, quality_path: str, 
-                            comparison_path: str, output_path: str) -> None:
+        return merged_json
+
+    def _create_final_output(self, answers: Dict[str, Any], quality: Dict[str, Any],
+                             comparison: Dict[str, Any]) -> Dict[str, Any]:
         """Merge three JSONs into final comprehensive output"""
-        with open(answers_path, 'r', encoding='utf-8') as f:
-            answers = json.load(f)
-        with open(quality_path, 'r', encoding='utf-8') as f:
-            quality = json.load(f)
-        with open(comparison_path, 'r', encoding='utf-8') as f:
-            comparison = json.load(f)
+        if not all(isinstance(obj, dict) for obj in (answers, quality, comparison)):
+            raise ValueError("Evaluation and comparison outputs must be JSON objects")
 
         final_output = {}
         for section_key in answers.keys():
@@ -760,8 +1512,7 @@ Now, please analyze the  JSON with answer pairs and provide the semantic compari
                 comp = comparison.get(section_key, {}).get(question_key, "Not Available")
                 final_output[section_key][question_key] = ans + [qual, comp]
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(final_output, f, ensure_ascii=False, indent=2)
+        return final_output
 
     def process_audio(
         self,
@@ -774,10 +1525,19 @@ Now, please analyze the  JSON with answer pairs and provide the semantic compari
         merged_filename: str = "merged_survey.json",
         comparison_filename: str = "comparison_output.json",
         final_filename: str = "final_output.json",
-        audio_mime_type: str = "audio/m4a"
+        audio_mime_type: str = "audio/m4a",
+        verbose: bool = True,
+        resume: bool = False,
+        persist: bool = True,
+        on_stage: Optional[StageCallback] = None,
+        on_transcript: Optional[TranscriptCallback] = None
     ) -> dict:
         """
         Execute the complete 6-step analysis pipeline
+
+        Stage outputs are handed to the next stage in memory. With ``persist``
+        each artifact is written to ``output_dir`` in the background, and all
+        writes have completed by the time this returns.
         
         Args:
             audio_file_path: Path to Hindi audio file
@@ -790,119 +1550,388 @@ Now, please analyze the  JSON with answer pairs and provide the semantic compari
             comparison_filename: Name for comparison output file
             final_filename: Name for final output file
             audio_mime_type: MIME type of the audio file
+            verbose: Print step progress to stdout
+            resume: Reuse valid stage artifacts recorded in output_dir's manifest
+                and restart from the first missing or invalid stage
+            persist: Write stage artifacts to output_dir (required for resume)
+            on_stage: Optional callback receiving (stage, artifact, telemetry) as each
+                stage finishes; evaluation and analysis report from worker threads
+            on_transcript: Optional callback receiving the transcript turns parsed so far
+                while Step 1 streams in (single-request transcription only)
             
         Returns:
-            Dictionary containing all output paths and loaded content
+            Dictionary containing all output paths (None when not persisted), content
+            and ``metrics``: per-stage wall/model time, tokens, payload bytes and parse time.
+            With a gate, ``gate`` holds its decision; rejected calls get "Not Available"
+            artifacts without any model call.
         """
-        # Create output directory
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Define output paths
-        transcript_path = os.path.join(output_dir, transcription_filename)
-        evaluation_path = os.path.join(output_dir, evaluation_filename)
-        analysis_path = os.path.join(output_dir, analysis_filename)
-        merged_path = os.path.join(output_dir, merged_filename)
-        comparison_path = os.path.join(output_dir, comparison_filename)
-        final_path = os.path.join(output_dir, final_filename)
-
-        # Step 1: Transcribe audio
-        print("Step 1/6: Transcribing audio...")
-        audio_data, detected_mime = self._load_audio_to_base64(audio_file_path)
+        run = self._start_run(output_dir, {
+            'transcription': transcription_filename,
+            'evaluation': evaluation_filename,
+            'analysis': analysis_filename,
+            'merged': merged_filename,
+            'comparison': comparison_filename,
+            'final': final_filename,
+        }, persist, resume, verbose, on_stage, on_transcript)
+        log = run.log
+        survey = self._read_survey(json_path_2)
+
+        detected_mime = self._audio_mime_type(audio_file_path)
         mime_type = audio_mime_type if audio_mime_type != "audio/m4a" else detected_mime
-        
-        contents_transcription = [
-            {'mime_type': mime_type, 'data': audio_data},
-            self.transcription_prompt
-        ]
-        
-        response = self.model_lite.generate_content(
-            contents_transcription,
-            generation_config=self.generation_config
+        audio_hash = sha256_file(audio_file_path)
+
+        # Unusable recordings short-circuit to a "Not Available" result
+        decision = self._check_gate(run, audio_file_path)
+        if decision is not None and not decision.accepted:
+            artifacts = self._finish_rejected(run, survey, decision, audio_hash)
+            if run.writer is not None:
+                run.writer.flush()
+            return self._gated_result(run, artifacts, decision, audio_file_path)
+
+        # Steps 0 and 1: optionally preprocess, then transcribe audio
+        log("Step 1/6: Transcribing audio...")
+
+        transcript = self._run_stage(
+            run, 'transcription',
+            self._transcription_fingerprint(audio_hash),
+            lambda: self._transcribe(run, audio_file_path, mime_type, audio_hash)
         )
-        self._save_output(response.text, transcript_path, clean=True)
-        print(f"   -> Saved transcript to {transcript_path}")
 
-        # Step 2: Evaluate agent questions
-        print("Step 2/6: Evaluating agent performance...")
-        transcript_b64 = self._load_json_to_base64(transcript_path)
-        
-        contents_evaluation = [
-            {'mime_type': 'text/plain', 'data': transcript_b64},
-            self.evaluation_prompt
-        ]
-        
-        response = self.model_lite.generate_content(
-            contents_evaluation,
-            generation_config=self.generation_config
+        # Steps 2 and 3 only read the transcript, so run them concurrently
+        log("Step 2/6: Evaluating agent performance...")
+        log("Step 3/6: Analyzing transcript...")
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline-stage") as executor:
+            stage_futures = {}
+            for stage, model, prompt in (
+                ('evaluation', self.model_lite, self.evaluation_prompt),
+                ('analysis', self.model_pro, self.analysis_prompt),
+            ):
+                stage_futures[stage] = executor.submit(
+                    self._run_stage, run, stage,
+                    self._stage_fingerprint(model, prompt, transcript.sha256),
+                    functools.partial(self._run_text_stage, stage, model, transcript, prompt)
+                )
+
+        # Both stages have finished here; report the first failure by stage name
+        for stage, future in stage_futures.items():
+            error = future.exception()
+            if error is not None:
+                raise PipelineStageError(stage, error) from error
+        evaluation = stage_futures['evaluation'].result()
+        analysis = stage_futures['analysis'].result()
+
+        # Step 4: Merge agent and analysis JSONs
+        log("Step 4/6: Merging survey responses...")
+        merged = self._run_stage(
+            run, 'merged',
+            combine_fingerprint('merged', survey.sha256, analysis.sha256),
+            lambda: self._artifact_from_data('merged', self._merge_survey_jsons(survey.data, analysis.data))
         )
-        self._save_output(response.text, evaluation_path, clean=True)
-        print(f"   -> Saved evaluation to {evaluation_path}")
-
-        # Step 3: Analyze transcript content
-        print("Step 3/6: Analyzing transcript...")
-        contents_analysis = [
-            {'mime_type': 'text/plain', 'data': transcript_b64},
-            self.analysis_prompt
-        ]
-        
-        response = self.model_pro.generate_content(
-            contents_analysis,
-            generation_config=self.generation_config
+
+        # Step 5: Compare merged answers
+        log("Step 5/6: Comparing responses...")
+        comparison = self._run_stage(
+            run, 'comparison',
+            self._comparison_fingerprint(merged),
+            lambda: self._run_comparison_stage(run, merged)
+        )
+
+        # Step 6: Create final output
+        log("Step 6/6: Generating final output...")
+        final = self._run_stage(
+            run, 'final',
+            combine_fingerprint('final', merged.sha256, evaluation.sha256, comparison.sha256),
+            lambda: self._artifact_from_data(
+                'final', self._create_final_output(merged.data, evaluation.data, comparison.data)
+            )
         )
-        self._save_output(response.text, analysis_path, clean=True)
-        print(f"   -> Saved analysis to {analysis_path}")
+
+        if run.writer is not None:
+            run.writer.flush()
+
+        result = self._build_result(run, {
+            'transcription': transcript,
+            'evaluation': evaluation,
+            'analysis': analysis,
+            'merged': merged,
+            'comparison': comparison,
+            'final': final,
+        })
+        self._emit_metrics(run, result, audio_file_path)
+
+        log("\n✓ Pipeline completed successfully!")
+        return result
+
+    async def process_audio_async(
+        self,
+        audio_file_path: str,
+        json_path_2: str,
+        output_dir: str = "./output",
+        transcription_filename: str = "audio_transcript.json",
+        evaluation_filename: str = "evaluation_output.json",
+        analysis_filename: str = "audio_analysis.json",
+        merged_filename: str = "merged_survey.json",
+        comparison_filename: str = "comparison_output.json",
+        final_filename: str = "final_output.json",
+        audio_mime_type: str = "audio/m4a",
+        verbose: bool = True,
+        resume: bool = False,
+        persist: bool = True,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        on_stage: Optional[StageCallback] = None,
+        on_transcript: Optional[TranscriptCallback] = None
+    ) -> dict:
+        """
+        Async twin of process_audio built on generate_content_async
+
+        Model calls are bounded by ``semaphore`` (or the pipeline's per-loop
+        semaphore of ``max_concurrent_requests``), so one event loop can keep
+        many calls in flight without a thread per request. File I/O runs in
+        the default executor.
+
+        Args:
+            Same as process_audio, plus:
+            semaphore: Optional semaphore shared across calls to bound model requests
+
+        Returns:
+            Dictionary containing all output paths (None when not persisted) and content
+        """
+        semaphore = semaphore or self._get_async_semaphore()
+        run = await asyncio.to_thread(self._start_run, output_dir, {
+            'transcription': transcription_filename,
+            'evaluation': evaluation_filename,
+            'analysis': analysis_filename,
+            'merged': merged_filename,
+            'comparison': comparison_filename,
+            'final': final_filename,
+        }, persist, resume, verbose, on_stage, on_transcript)
+        log = run.log
+        survey = await asyncio.to_thread(self._read_survey, json_path_2)
+
+        detected_mime = self._audio_mime_type(audio_file_path)
+        mime_type = audio_mime_type if audio_mime_type != "audio/m4a" else detected_mime
+        audio_hash = await asyncio.to_thread(sha256_file, audio_file_path)
+
+        # Unusable recordings short-circuit to a "Not Available" result
+        decision = await asyncio.to_thread(self._check_gate, run, audio_file_path)
+        if decision is not None and not decision.accepted:
+            artifacts = self._finish_rejected(run, survey, decision, audio_hash)
+            if run.writer is not None:
+                await run.writer.flush_async()
+            return self._gated_result(run, artifacts, decision, audio_file_path)
+
+        # Steps 0 and 1: optionally preprocess, then transcribe audio
+        log("Step 1/6: Transcribing audio...")
+
+        transcript = await self._run_stage_async(
+            run, 'transcription',
+            self._transcription_fingerprint(audio_hash),
+            lambda: self._transcribe_async(run, audio_file_path, mime_type, audio_hash, semaphore)
+        )
+
+        # Steps 2 and 3 only read the transcript, so run them concurrently
+        log("Step 2/6: Evaluating agent performance...")
+        log("Step 3/6: Analyzing transcript...")
+        stages = (
+            ('evaluation', self.model_lite, self.evaluation_prompt),
+            ('analysis', self.model_pro, self.analysis_prompt),
+        )
+        stage_results = await asyncio.gather(
+            *[
+                self._run_stage_async(
+                    run, stage,
+                    self._stage_fingerprint(model, prompt, transcript.sha256),
+                    functools.partial(
+                        self._run_text_stage_async, stage, model, transcript, prompt, semaphore
+                    )
+                )
+                for stage, model, prompt in stages
+            ],
+            return_exceptions=True
+        )
+        for (stage, *_), outcome in zip(stages, stage_results):
+            if isinstance(outcome, BaseException):
+                raise PipelineStageError(stage, outcome) from outcome
+        evaluation, analysis = stage_results
 
         # Step 4: Merge agent and analysis JSONs
-        print("Step 4/6: Merging survey responses...")
-        self._merge_survey_jsons(json_path_2, analysis_path, merged_path)
-        print(f"   -> Saved merged data to {merged_path}")
+        log("Step 4/6: Merging survey responses...")
+
+        async def merge():
+            return self._artifact_from_data('merged', self._merge_survey_jsons(survey.data, analysis.data))
+
+        merged = await self._run_stage_async(
+            run, 'merged',
+            combine_fingerprint('merged', survey.sha256, analysis.sha256),
+            merge
+        )
 
         # Step 5: Compare merged answers
-        print("Step 5/6: Comparing responses...")
-        merged_b64 = self._load_json_to_base64(merged_path)
-        
-        contents_comparison = [
-            {'mime_type': 'text/plain', 'data': merged_b64},
-            self.comparison_prompt
-        ]
-        
-        response = self.model_lite.generate_content(
-            contents_comparison,
-            generation_config=self.generation_config
+        log("Step 5/6: Comparing responses...")
+        comparison = await self._run_stage_async(
+            run, 'comparison',
+            self._comparison_fingerprint(merged),
+            lambda: self._run_comparison_stage_async(run, merged, semaphore)
         )
-        self._save_output(response.text, comparison_path, clean=True)
-        print(f"   -> Saved comparison to {comparison_path}")
 
         # Step 6: Create final output
-        print("Step 6/6: Generating final output...")
-        self._create_final_output(merged_path, evaluation_path, comparison_path, final_path)
-        print(f"   -> Saved final output to {final_path}")
+        log("Step 6/6: Generating final output...")
 
-        # Load all outputs for return
-        result = {
-            'transcription_path': transcript_path,
-            'evaluation_path': evaluation_path,
-            'analysis_path': analysis_path,
-            'merged_path': merged_path,
-            'comparison_path': comparison_path,
-            'final_path': final_path
-        }
+        async def finalize():
+            return self._artifact_from_data(
+                'final', self._create_final_output(merged.data, evaluation.data, comparison.data)
+            )
 
-        # Load JSON content
-        for key in ['transcription', 'evaluation', 'analysis', 'merged', 'comparison', 'final']:
-            path_key = f"{key}_path"
-            try:
-                with open(result[path_key], 'r', encoding='utf-8') as f:
-                    result[key] = json.load(f)
-            except json.JSONDecodeError:
-                with open(result[path_key], 'r', encoding='utf-8') as f:
-                    result[key] = f.read()
+        final = await self._run_stage_async(
+            run, 'final',
+            combine_fingerprint('final', merged.sha256, evaluation.sha256, comparison.sha256),
+            finalize
+        )
+
+        if run.writer is not None:
+            await run.writer.flush_async()
 
-        print("\n✓ Pipeline completed successfully!")
+        result = self._build_result(run, {
+            'transcription': transcript,
+            'evaluation': evaluation,
+            'analysis': analysis,
+            'merged': merged,
+            'comparison': comparison,
+            'final': final,
+        })
+        self._emit_metrics(run, result, audio_file_path)
+
+        log("\n✓ Pipeline completed successfully!")
         return result
 
+    def iter_process_audio(self, audio_file_path: str, json_path_2: str, **kwargs) -> Iterator[StageEvent]:
+        """
+        Run process_audio and yield a StageEvent as each stage finishes
 
-def run_pipeline(audio_path, json_path_2, json_path_1):
+        Evaluation and analysis finish in either order; the final event carries
+        the complete result. Errors are raised from the generator. The call
+        runs on its own thread, so closing the generator early does not stop
+        it: the remaining stages still run and are persisted.
+
+        Args:
+            audio_file_path: Path to Hindi audio file
+            json_path_2: Path to agent's survey JSON
+            **kwargs: Any other process_audio argument except on_stage
+        """
+        events = queue.Queue()
+        done = object()
+
+        def on_stage(stage: str, artifact: StageArtifact, metrics: StageMetrics) -> None:
+            events.put((stage, artifact.data, metrics))
+
+        def worker() -> None:
+            try:
+                events.put((done, self.process_audio(audio_file_path, json_path_2, on_stage=on_stage, **kwargs), None))
+            except BaseException as e:
+                events.put((done, None, e))
+
+        threading.Thread(target=worker, name="pipeline-stream", daemon=True).start()
+        completed = 0
+        while True:
+            stage, data, metrics = events.get()
+            if stage is done:
+                if metrics is not None:
+                    raise metrics
+                yield StageEvent("result", data, None, completed)
+                return
+            completed += 1
+            yield StageEvent(stage, data, metrics, completed)
+
+    async def aiter_process_audio(self, audio_file_path: str, json_path_2: str,
+                                  **kwargs) -> AsyncIterator[StageEvent]:
+        """Async twin of iter_process_audio built on process_audio_async (same arguments)"""
+        events = asyncio.Queue()
+        task = asyncio.ensure_future(self.process_audio_async(
+            audio_file_path, json_path_2,
+            on_stage=lambda stage, artifact, metrics: events.put_nowait((stage, artifact.data, metrics)),
+            **kwargs
+        ))
+        completed = 0
+        try:
+            while not (task.done() and events.empty()):
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                stage, data, metrics = getter.result()
+                completed += 1
+                yield StageEvent(stage, data, metrics, completed)
+            yield StageEvent("result", await task, None, completed)
+        finally:
+            # Unlike the threaded variant, an abandoned iteration cancels the call
+            if not task.done():
+                task.cancel()
+
+
+def get_default_cache() -> Optional[StageCache]:
+    """Return the process-wide stage cache, or None if PIPELINE_CACHE_DIR is empty"""
+    global _default_cache
+    if _default_cache is None and PIPELINE_CACHE_DIR:
+        _default_cache = StageCache(PIPELINE_CACHE_DIR, max_bytes=PIPELINE_CACHE_MAX_BYTES)
+    return _default_cache
+
+
+def get_default_context_cache() -> Optional[PromptContextCache]:
+    """Return the process-wide prompt context cache, or None unless PIPELINE_CONTEXT_CACHE=1"""
+    global _default_context_cache
+    if _default_context_cache is None and PIPELINE_CONTEXT_CACHE:
+        _default_context_cache = PromptContextCache(ttl_seconds=PIPELINE_CONTEXT_CACHE_TTL)
+    return _default_context_cache
+
+
+def get_default_preprocessor() -> Optional[AudioPreprocessor]:
+    """Return the process-wide audio preprocessor, or None unless PIPELINE_PREPROCESS_AUDIO=1"""
+    global _default_preprocessor
+    if _default_preprocessor is None and PIPELINE_PREPROCESS_AUDIO:
+        _default_preprocessor = AudioPreprocessor()
+    return _default_preprocessor
+
+
+def get_default_chunker() -> Optional[LongAudioChunker]:
+    """Return the process-wide long-audio chunker, or None unless PIPELINE_LONG_AUDIO=1"""
+    global _default_chunker
+    if _default_chunker is None and PIPELINE_LONG_AUDIO:
+        _default_chunker = LongAudioChunker()
+    return _default_chunker
+
+
+def get_default_gate() -> Optional[AudioGate]:
+    """Return the process-wide audio pre-filter, or None unless PIPELINE_AUDIO_GATE=1"""
+    global _default_gate
+    if _default_gate is None and PIPELINE_AUDIO_GATE:
+        _default_gate = AudioGate()
+    return _default_gate
+
+
+def get_default_metrics_hook():
+    """Return the process-wide metrics sink, or None if PIPELINE_METRICS_PATH is empty"""
+    global _default_metrics_hook
+    if _default_metrics_hook is None and PIPELINE_METRICS_PATH:
+        _default_metrics_hook = metrics_sink_for_path(PIPELINE_METRICS_PATH)
+    return _default_metrics_hook
+
+
+def get_default_rate_limiter() -> ModelRateLimiter:
+    """Return the process-wide rate limiter configured from PIPELINE_RATE_LIMIT_*"""
+    global _default_rate_limiter
+    if _default_rate_limiter is None:
+        _default_rate_limiter = ModelRateLimiter(
+            default_limit=RateLimit(PIPELINE_RATE_LIMIT_RPM, PIPELINE_RATE_LIMIT_TPM),
+            state_path=PIPELINE_RATE_LIMIT_STATE or None,
+            max_retries=PIPELINE_MAX_RETRIES
+        )
+    return _default_rate_limiter
+
+
+def run_pipeline(audio_path, json_path_2, json_path_1, output_dir: Optional[str] = None, resume: bool = False,
+                 pool: Optional[PipelinePool] = None, on_stage: Optional[StageCallback] = None,
+                 on_transcript: Optional[TranscriptCallback] = None):
     """
     Run the complete 6-step pipeline with audio file, agent JSON, and Gemini credentials
     
@@ -910,6 +1939,11 @@ def run_pipeline(audio_path, json_path_2, json_path_1):
         audio_path: Path to audio file
         json_path_2: Path to agent's survey JSON file
         json_path_1: Path to Gemini API credentials JSON file
+        output_dir: Output directory to use; a new temporary directory if None
+        resume: Resume from valid stage checkpoints already in output_dir
+        pool: Pipeline pool to take a warm pipeline from (defaults to the process-wide pool)
+        on_stage: Optional callback receiving (stage, artifact, telemetry) as each stage finishes
+        on_transcript: Optional callback receiving the transcript turns so far while Step 1 streams
         
     Returns:
         Tuple of (transcription_path, analysis_path, final_path, transcription_content, 
@@ -919,17 +1953,34 @@ def run_pipeline(audio_path, json_path_2, json_path_1):
     credentials_path = str(json_path_1)
     
     # Create output directory
-    out_dir = tempfile.mkdtemp(prefix="audio-analysis-pipeline-")
+    out_dir = output_dir or tempfile.mkdtemp(prefix="audio-analysis-pipeline-")
     
-    # Initialize pipeline
-    pipeline = AudioAnalysisPipeline(credentials_path=credentials_path)
+    # Reuse an initialised pipeline for these credentials, leased for this call
+    pool = pool or get_default_pool()
+    pipeline = pool.acquire(
+        credentials_path,
+        cache=get_default_cache(),
+        audio_transport=PIPELINE_AUDIO_TRANSPORT,
+        context_cache=get_default_context_cache(),
+        metrics_hook=get_default_metrics_hook(),
+        preprocessor=get_default_preprocessor(),
+        chunker=get_default_chunker(),
+        gate=get_default_gate(),
+        rate_limiter=get_default_rate_limiter()
+    )
     
     # Process audio with full 6-step pipeline
-    result = pipeline.process_audio(
-        audio_file_path=str(audio_path),
-        json_path_2=str(json_path_2),
-        output_dir=out_dir
-    )
+    try:
+        result = pipeline.process_audio(
+            audio_file_path=str(audio_path),
+            json_path_2=str(json_path_2),
+            output_dir=out_dir,
+            resume=resume,
+            on_stage=on_stage,
+            on_transcript=on_transcript
+        )
+    finally:
+        pool.release(pipeline)
     
     return (
         result['transcription_path'],
@@ -941,6 +1992,67 @@ def run_pipeline(audio_path, json_path_2, json_path_1):
     )
 
 
+async def run_pipeline_async(audio_path, json_path_2, json_path_1, output_dir: Optional[str] = None,
+                             resume: bool = False, semaphore: Optional[asyncio.Semaphore] = None,
+                             pool: Optional[PipelinePool] = None, on_stage: Optional[StageCallback] = None,
+                             on_transcript: Optional[TranscriptCallback] = None):
+    """
+    Async twin of run_pipeline
+
+    Args:
+        audio_path: Path to audio file
+        json_path_2: Path to agent's survey JSON file
+        json_path_1: Path to Gemini API credentials JSON file
+        output_dir: Output directory to use; a new temporary directory if None
+        resume: Resume from valid stage checkpoints already in output_dir
+        semaphore: Optional semaphore shared across calls to bound model requests
+        pool: Pipeline pool to take a warm pipeline from (defaults to the process-wide pool)
+        on_stage: Optional callback receiving (stage, artifact, telemetry) as each stage finishes
+        on_transcript: Optional callback receiving the transcript turns so far while Step 1 streams
+
+    Returns:
+        Same tuple as run_pipeline
+    """
+    credentials_path = str(json_path_1)
+    out_dir = output_dir or await asyncio.to_thread(tempfile.mkdtemp, prefix="audio-analysis-pipeline-")
+
+    pool = pool or get_default_pool()
+    pipeline = await asyncio.to_thread(
+        pool.acquire,
+        credentials_path,
+        cache=get_default_cache(),
+        audio_transport=PIPELINE_AUDIO_TRANSPORT,
+        context_cache=get_default_context_cache(),
+        metrics_hook=get_default_metrics_hook(),
+        preprocessor=get_default_preprocessor(),
+        chunker=get_default_chunker(),
+        gate=get_default_gate(),
+        rate_limiter=get_default_rate_limiter()
+    )
+
+    try:
+        result = await pipeline.process_audio_async(
+            audio_file_path=str(audio_path),
+            json_path_2=str(json_path_2),
+            output_dir=out_dir,
+            resume=resume,
+            semaphore=semaphore,
+            on_stage=on_stage,
+            on_transcript=on_transcript
+        )
+    finally:
+        pool.release(pipeline)
+
+    return (
+        result['transcription_path'],
+        result['analysis_path'],
+        result['final_path'],
+        result['transcription'],
+
+        result['final']
+    )
+
+
 # Example usage
 if __name__ == '__main__':
     # For direct script execution
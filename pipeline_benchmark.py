@@ -0,0 +1,447 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from dummy_processor import AudioAnalysisPipeline
+from result_cache import sha256_file
+from stage_checkpoints import write_text_atomic
+
+
+DEFAULT_CONCURRENCY = (1, 8, 64)
+DEFAULT_AUDIO_SIZES_MB = (0.25, 1.0, 4.0)
+DEFAULT_LATENCY_SECONDS = 0.05
+
+_SECTIONS = {
+    "section_1": range(1, 7),
+    "section_2": range(7, 14),
+    "section_3": range(14, 17),
+}
+
+
+def canned_survey() -> Dict[str, Any]:
+    """Agent survey answers shaped like the analysis prompt's output"""
+    answers = {
+        "question_1": "18-30 वर्ष", "question_2": "पुरुष", "question_3": "महागठबंधन | MGB",
+        "question_4": "तेजस्वी यादव", "question_5": "हाँ", "question_6": "सड़क और पानी की समस्या",
+        "question_7": "नहीं", "question_8": "JDU | NDA", "question_9": "Not Available",
+        "question_10": "हाँ", "question_11": "बदलाव चाहिए", "question_12": "हिंदू",
+        "question_13": "Not Available", "question_14": "यादव", "question_15": "किसान",
+        "question_16": "9876543210",
+    }
+    return {
+        section: {f"question_{q}": answers[f"question_{q}"] for q in questions}
+        for section, questions in _SECTIONS.items()
+    }
+
+
+def canned_outputs(transcript_turns: int = 40) -> Dict[str, Any]:
+    """Canned model outputs for each pipeline stage, keyed by stage name"""
+    transcript = [
+        {
+            "Speaker": "Agent" if turn % 2 == 0 else "Citizen",
+            "Timestamp": {"Start": f"00:{turn * 5 // 60:02d}:{turn * 5 % 60:02d}",
+                          "End": f"00:{(turn * 5 + 4) // 60:02d}:{(turn * 5 + 4) % 60:02d}"},
+            "Voice": "नमस्ते, मैं सर्वे के लिए कॉल कर रहा हूँ। आप किसे मुख्यमंत्री के रूप में देखना चाहते हैं?"
+        }
+        for turn in range(transcript_turns)
+    ]
+    analysis = canned_survey()
+    # A few answers differ from the agent's so the comparison stage still calls the model
+    analysis["section_1"]["question_3"] = "लालटेन छाप"
+    analysis["section_1"]["question_6"] = "सड़क खराब है"
+    analysis["section_2"]["question_11"] = "सरकार बदलनी चाहिए"
+    analysis["section_3"]["question_16"] = "+91 98765 43210"
+
+    comparison = {
+        section: {f"question_{q}": "matched" for q in questions}
+        for section, questions in _SECTIONS.items()
+    }
+    comparison["summary"] = {"total_questions": 16, "matched": 16, "partially_matched": 0, "not_matched": 0}
+    return {
+        "transcription": {"Call Details": {"Number of Speakers": "2", "Transcript": transcript}},
+        "evaluation": {
+            "quality_assessment": {f"question_{q}": "asked properly" for q in range(1, 17)},
+            "summary": {"total_questions": 16, "asked_properly_count": 16, "asked_count": 0,
+                        "not_asked_count": 0},
+        },
+        "analysis": analysis,
+        "comparison": comparison,
+    }
+
+
+class _StubUsage:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class _StubResponse:
+    def __init__(self, text: str, prompt_tokens: int):
+        self.text = text
+        self.usage_metadata = _StubUsage(prompt_tokens, len(text) // 4)
+
+
+class StubGenerativeModel:
+    """
+    Offline stand-in for genai.GenerativeModel
+
+    Replies to each stage prompt with its canned output (fenced like a real
+    response) after ``latency`` seconds, plus up to ``jitter`` seconds.
+    """
+
+    def __init__(self, model_name: str, stub: "StubModelFactory"):
+        self.model_name = f"models/{model_name}"
+        self._stub = stub
+
+    def _response(self, contents: Sequence[Any]) -> _StubResponse:
+        self._stub.calls += 1
+        prompt = contents[-1] if isinstance(contents[-1], str) else ""
+        stage = self._stub.stage_prompts.get(prompt)
+        if stage is None:
+            raise ValueError("Stub model received an unknown prompt")
+        body = json.dumps(self._stub.outputs[stage], ensure_ascii=False, indent=2)
+        return _StubResponse(f"```json\n{body}\n```", len(prompt) // 4)
+
+    def _delay(self) -> float:
+        return self._stub.latency + random.uniform(0, self._stub.jitter)
+
+    def generate_content(self, contents, generation_config=None, **kwargs) -> _StubResponse:
+        time.sleep(self._delay())
+        return self._response(contents)
+
+    async def generate_content_async(self, contents, generation_config=None, **kwargs) -> _StubResponse:
+        await asyncio.sleep(self._delay())
+        return self._response(contents)
+
+
+class StubModelFactory:
+    """``model_factory`` for AudioAnalysisPipeline that builds StubGenerativeModels"""
+
+    def __init__(self, latency: float = DEFAULT_LATENCY_SECONDS, jitter: float = 0.0,
+                 outputs: Optional[Dict[str, Any]] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.outputs = outputs or canned_outputs()
+        self.stage_prompts: Dict[str, str] = {}
+        self.calls = 0
+
+    def __call__(self, model_name: str) -> StubGenerativeModel:
+        return StubGenerativeModel(model_name, self)
+
+    def bind(self, pipeline: AudioAnalysisPipeline) -> None:
+        """Learn which prompt belongs to which stage"""
+        self.stage_prompts = {
+            pipeline.transcription_prompt: "transcription",
+            pipeline.evaluation_prompt: "evaluation",
+            pipeline.analysis_prompt: "analysis",
+            pipeline.comparison_prompt: "comparison",
+        }
+
+
+def build_stub_pipeline(credentials_path: str, latency: float = DEFAULT_LATENCY_SECONDS,
+                        jitter: float = 0.0, max_concurrent_requests: int = 64,
+                        outputs: Optional[Dict[str, Any]] = None) -> AudioAnalysisPipeline:
+    """AudioAnalysisPipeline wired to stub models (no stage or context cache)"""
+    factory = StubModelFactory(latency=latency, jitter=jitter, outputs=outputs)
+    pipeline = AudioAnalysisPipeline(
+        credentials_path=credentials_path,
+        project_id="offline-benchmark",
+        max_concurrent_requests=max_concurrent_requests,
+        model_factory=factory
+    )
+    factory.bind(pipeline)
+    return pipeline
+
+
+def _write_audio(path: str, size_mb: float) -> None:
+    """Random bytes stand in for audio: the pipeline only hashes and encodes it"""
+    remaining = int(size_mb * 1024 * 1024)
+    with open(path, "wb") as f:
+        while remaining > 0:
+            chunk = min(remaining, 1024 * 1024)
+            f.write(os.urandom(chunk))
+            remaining -= chunk
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def measure_overheads(pipeline: AudioAnalysisPipeline, outputs: Dict[str, Any], audio_path: str,
+                      work_dir: str, repeat: int = 20) -> Dict[str, float]:
+    """
+    Median milliseconds of the local (non-model) work in one call
+
+    Returns:
+        Dictionary of step name to median milliseconds
+    """
+    survey = canned_survey()
+    fenced_analysis = "```json\n" + json.dumps(outputs["analysis"], ensure_ascii=False, indent=2) + "\n```"
+    merged = pipeline._merge_survey_jsons(survey, outputs["analysis"])
+    artifact_texts = {
+        stage: json.dumps(data, ensure_ascii=False, indent=2)
+        for stage, data in {**outputs, "merged": merged}.items()
+    }
+
+    def write_artifacts():
+        for stage, text in artifact_texts.items():
+            write_text_atomic(os.path.join(work_dir, f"{stage}.json"), text)
+
+    return {
+        "sha256_file": _median_ms(lambda: sha256_file(audio_path), repeat),
+        "base64_encode": _median_ms(lambda: pipeline._load_audio_to_base64(audio_path), repeat),
+        "parse_output": _median_ms(lambda: pipeline._parse_model_output("analysis", fenced_analysis), repeat),
+        "merge": _median_ms(lambda: pipeline._merge_survey_jsons(survey, outputs["analysis"]), repeat),
+        "final_assembly": _median_ms(
+            lambda: pipeline._create_final_output(merged, outputs["evaluation"], outputs["comparison"]), repeat
+        ),
+        "artifact_io": _median_ms(write_artifacts, repeat),
+    }
+
+
+def _critical_path_model_seconds(metrics: Dict[str, Any]) -> float:
+    """Model time on the call's critical path (evaluation and analysis overlap)"""
+    stages = metrics["stages"]
+    return (
+        stages["transcription"]["model_seconds"]
+        + max(stages["evaluation"]["model_seconds"], stages["analysis"]["model_seconds"])
+        + stages["comparison"]["model_seconds"]
+    )
+
+
+async def _run_calls(pipeline: AudioAnalysisPipeline, audio_path: str, survey_path: str, work_dir: str,
+                     calls: int, concurrency: int, persist: bool) -> List[Dict[str, Any]]:
+    # Concurrency counts whole calls; each call may have two model requests in flight
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> Dict[str, Any]:
+        async with slots:
+            started = time.perf_counter()
+            result = await pipeline.process_audio_async(
+                audio_file_path=audio_path,
+                json_path_2=survey_path,
+                output_dir=os.path.join(work_dir, f"call-{index:05d}"),
+                verbose=False,
+                persist=persist
+            )
+            wall = time.perf_counter() - started
+        return {"wall": wall, "overhead": wall - _critical_path_model_seconds(result["metrics"])}
+
+    return await asyncio.gather(*(one(i) for i in range(calls)))
+
+
+def measure_throughput(pipeline: AudioAnalysisPipeline, audio_path: str, survey_path: str, work_dir: str,
+                       concurrency: int, calls: int, persist: bool = True) -> Dict[str, float]:
+    """
+    Run ``calls`` pipeline calls through process_audio_async, ``concurrency`` at a time
+
+    Returns:
+        calls_per_second, mean/p95 call latency and mean per-call overhead (ms),
+        where overhead is call wall time minus critical-path model time
+    """
+    started = time.perf_counter()
+    records = asyncio.run(_run_calls(pipeline, audio_path, survey_path, work_dir, calls, concurrency, persist))
+    elapsed = time.perf_counter() - started
+    walls = sorted(r["wall"] for r in records)
+    return {
+        "calls": calls,
+        "calls_per_second": calls / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": statistics.mean(walls) * 1000,
+        "p95_ms": walls[min(len(walls) - 1, int(round(0.95 * (len(walls) - 1))))] * 1000,
+        "overhead_ms": statistics.mean(r["overhead"] for r in records) * 1000,
+    }
+
+
+def run_benchmark(
+    credentials_path: Optional[str] = None,
+    concurrency: Sequence[int] = DEFAULT_CONCURRENCY,
+    audio_sizes_mb: Sequence[float] = DEFAULT_AUDIO_SIZES_MB,
+    latency: float = DEFAULT_LATENCY_SECONDS,
+    jitter: float = 0.0,
+    calls_per_worker: int = 4,
+    repeat: int = 20,
+    persist: bool = True
+) -> Dict[str, Any]:
+    """
+    Offline benchmark of the pipeline's hot path with stub models
+
+    Args:
+        credentials_path: Credentials file passed to the pipeline (a dummy file if None)
+        concurrency: Concurrency levels for the throughput runs
+        audio_sizes_mb: Synthetic audio sizes in MiB
+        latency: Stub model latency in seconds per call
+        jitter: Extra random stub latency, up to this many seconds
+        calls_per_worker: Calls per throughput run = concurrency * calls_per_worker
+        repeat: Repetitions for each overhead measurement
+        persist: Write stage artifacts during throughput runs (includes file I/O)
+
+    Returns:
+        ``{"settings": {...}, "overheads": [...], "throughput": [...]}``
+    """
+    work_root = tempfile.mkdtemp(prefix="pipeline-benchmark-")
+    try:
+        if credentials_path is None:
+            credentials_path = os.path.join(work_root, "credentials.json")
+            with open(credentials_path, "w", encoding="utf-8") as f:
+                json.dump({"type": "offline-benchmark"}, f)
+        survey_path = os.path.join(work_root, "survey.json")
+        with open(survey_path, "w", encoding="utf-8") as f:
+            json.dump(canned_survey(), f, ensure_ascii=False)
+
+        outputs = canned_outputs()
+        pipeline = build_stub_pipeline(credentials_path, latency=latency, jitter=jitter,
+                                       max_concurrent_requests=2 * max(concurrency), outputs=outputs)
+        overheads, throughput = [], []
+        try:
+            for size_mb in audio_sizes_mb:
+                audio_path = os.path.join(work_root, f"audio-{size_mb:g}mb.m4a")
+                _write_audio(audio_path, size_mb)
+
+                io_dir = os.path.join(work_root, f"overhead-{size_mb:g}mb")
+                os.makedirs(io_dir)
+                overheads.append({"audio_mb": size_mb, **measure_overheads(pipeline, outputs, audio_path, io_dir, repeat)})
+
+                for level in concurrency:
+                    run_dir = os.path.join(work_root, f"run-{size_mb:g}mb-c{level}")
+                    stats = measure_throughput(pipeline, audio_path, survey_path, run_dir, level,
+                                               level * calls_per_worker, persist)
+                    throughput.append({"audio_mb": size_mb, "concurrency": level, **stats})
+                    shutil.rmtree(run_dir, ignore_errors=True)
+                os.remove(audio_path)
+        finally:
+            pipeline.close()
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    return {
+        "settings": {
+            "latency": latency, "jitter": jitter, "calls_per_worker": calls_per_worker,
+            "repeat": repeat, "persist": persist,
+        },
+        "overheads": overheads,
+        "throughput": throughput,
+    }
+
+
+def _format_table(headers: List[str], rows: List[List[str]]) -> str:
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    lines = [
+        "  ".join(str(h).rjust(w) for h, w in zip(headers, widths)),
+        "  ".join("-" * w for w in widths),
+    ]
+    lines += ["  ".join(str(c).rjust(w) for c, w in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+
+def _delta(value: float, baseline: Optional[float], higher_is_better: bool = False) -> str:
+    """Percentage change against the baseline, marked with ! when it is a regression"""
+    if baseline is None or baseline == 0:
+        return ""
+    change = (value - baseline) / baseline * 100
+    regressed = change < 0 if higher_is_better else change > 0
+    return f"{change:+.1f}%" + ("!" if regressed and abs(change) >= 10 else "")
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Comparison tables for a benchmark report
+
+    With ``baseline`` (an earlier report) each metric gets a delta column;
+    changes of 10% or more in the wrong direction are marked with "!".
+    """
+    base_overheads = {row["audio_mb"]: row for row in (baseline or {}).get("overheads", [])}
+    base_throughput = {
+        (row["audio_mb"], row["concurrency"]): row for row in (baseline or {}).get("throughput", [])
+    }
+
+    steps = ["sha256_file", "base64_encode", "parse_output", "merge", "final_assembly", "artifact_io"]
+    headers = ["audio_mb"]
+    for step in steps:
+        headers += [f"{step}_ms"] + (["Δ"] if baseline else [])
+    rows = []
+    for row in report["overheads"]:
+        cells = [f"{row['audio_mb']:g}"]
+        for step in steps:
+            cells.append(f"{row[step]:.3f}")
+            if baseline:
+                cells.append(_delta(row[step], base_overheads.get(row["audio_mb"], {}).get(step)))
+        rows.append(cells)
+    sections = ["Per-call local overhead (median)", _format_table(headers, rows)]
+
+    columns = [("calls_per_second", True), ("mean_ms", False), ("p95_ms", False), ("overhead_ms", False)]
+    headers = ["audio_mb", "concurrency"]
+    for name, _ in columns:
+        headers += [name] + (["Δ"] if baseline else [])
+    rows = []
+    for row in report["throughput"]:
+        cells = [f"{row['audio_mb']:g}", str(row["concurrency"])]
+        base = base_throughput.get((row["audio_mb"], row["concurrency"]), {})
+        for name, higher_is_better in columns:
+            cells.append(f"{row[name]:.2f}")
+            if baseline:
+                cells.append(_delta(row[name], base.get(name), higher_is_better))
+        rows.append(cells)
+    settings = report["settings"]
+    sections += [
+        "",
+        f"Throughput (stub latency {settings['latency'] * 1000:g} ms, "
+        f"{settings['calls_per_worker']} calls per concurrent worker)",
+        _format_table(headers, rows),
+    ]
+    return "\n".join(sections)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark with stub Gemini models")
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)),
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--audio-mb", default=",".join(f"{s:g}" for s in DEFAULT_AUDIO_SIZES_MB),
+                        help="Comma-separated synthetic audio sizes in MiB")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_SECONDS,
+                        help="Stub model latency per call in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency in seconds")
+    parser.add_argument("--calls-per-worker", type=int, default=4,
+                        help="Calls per throughput run = concurrency * this")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions per overhead measurement")
+    parser.add_argument("--no-persist", action="store_true", help="Skip artifact writes in throughput runs")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        concurrency=[int(c) for c in args.concurrency.split(",") if c],
+        audio_sizes_mb=[float(s) for s in args.audio_mb.split(",") if s],
+        latency=args.latency,
+        jitter=args.jitter,
+        calls_per_worker=args.calls_per_worker,
+        repeat=args.repeat,
+        persist=not args.no_persist
+    )
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
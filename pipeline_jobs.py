@@ -0,0 +1,153 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dummy_processor import PIPELINE_STAGES, StageArtifact, run_pipeline
+from pipeline_metrics import StageMetrics
+
+
+# Status shown while each stage is the next one to finish
+STAGE_LABELS = {
+    'transcription': "Transcribing audio...",
+    'evaluation': "Evaluating agent performance...",
+    'analysis': "Analyzing transcript...",
+    'merged': "Merging survey responses...",
+    'comparison': "Comparing responses...",
+    'final': "Generating final output...",
+}
+
+
+@dataclass
+class JobState:
+    """Snapshot of one background pipeline job"""
+    job_id: str
+    status: str = "queued"  # queued, running, done or failed
+    completed_stages: List[str] = field(default_factory=list)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    outputs: Dict[str, Any] = field(default_factory=dict)  # parsed output of each completed stage
+    partial_transcript: List[Dict[str, Any]] = field(default_factory=list)  # turns streamed so far in Step 1
+    result: Optional[Tuple] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the pipeline's stages completed (0.0 - 1.0)"""
+        if self.status == "done":
+            return 1.0
+        return len(self.completed_stages) / len(PIPELINE_STAGES)
+
+    @property
+    def message(self) -> str:
+        if self.status == "queued":
+            return "Waiting for a free worker..."
+        if self.status == "done":
+            return "Processing complete!"
+        if self.status == "failed":
+            return f"Failed: {self.error}"
+        pending = [stage for stage in PIPELINE_STAGES if stage not in self.completed_stages]
+        if not pending:
+            return "Finishing up..."
+        # Evaluation and analysis run side by side
+        side_by_side = [stage for stage in pending if stage in ('evaluation', 'analysis')]
+        running = side_by_side if pending[0] in side_by_side else pending[:1]
+        return " / ".join(STAGE_LABELS[stage] for stage in running)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+class PipelineJobExecutor:
+    """
+    Runs run_pipeline calls on a bounded pool of worker threads
+
+    ``submit`` returns at once with a job id; ``get`` returns a snapshot of the
+    job's state, updated with each stage's output as soon as it finishes.
+    Jobs outlive the caller (a Streamlit script run), so a session only needs
+    to keep the id. Finished jobs are dropped ``retention_seconds`` after
+    they complete.
+    """
+
+    def __init__(self, max_workers: int = 4, retention_seconds: float = 60 * 60):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline-job")
+        self._jobs: Dict[str, JobState] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, on_finish: Optional[Callable[[], None]] = None, **run_kwargs: Any) -> str:
+        """
+        Queue run_pipeline(**run_kwargs) and return the job id
+
+        ``on_finish`` runs on the worker once the job ends, whether it succeeded or not.
+        """
+        job = JobState(job_id=uuid.uuid4().hex)
+        with self._lock:
+            self._prune_locked()
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job.job_id, run_kwargs, on_finish)
+        return job.job_id
+
+    def get(self, job_id: str) -> Optional[JobState]:
+        """Copy of the job's current state, or None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return replace(job, completed_stages=list(job.completed_stages), stage_seconds=dict(job.stage_seconds),
+                           outputs=dict(job.outputs), partial_transcript=list(job.partial_transcript))
+
+    def forget(self, job_id: str) -> None:
+        """Drop a job's state (it keeps running if not finished)"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _update(self, job_id: str, **changes: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                for name, value in changes.items():
+                    setattr(job, name, value)
+
+    def _stage_done(self, job_id: str, stage: str, artifact: StageArtifact, metrics: StageMetrics) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and stage not in job.completed_stages:
+                job.completed_stages.append(stage)
+                job.stage_seconds[stage] = round(metrics.wall_seconds, 3)
+                job.outputs[stage] = artifact.data
+
+    def _run(self, job_id: str, run_kwargs: Dict[str, Any], on_finish: Optional[Callable[[], None]]) -> None:
+        self._update(job_id, status="running", started_at=time.time())
+        try:
+            result = run_pipeline(
+                on_stage=lambda stage, artifact, metrics: self._stage_done(job_id, stage, artifact, metrics),
+                on_transcript=lambda turns: self._update(job_id, partial_transcript=turns),
+                **run_kwargs
+            )
+        except Exception as e:
+            traceback.print_exc()
+            self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+        else:
+            self._update(job_id, status="done", result=result, finished_at=time.time())
+        finally:
+            if on_finish is not None:
+                try:
+                    on_finish()
+                except Exception:
+                    traceback.print_exc()
+
+    def _prune_locked(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[job_id]
@@ -0,0 +1,223 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from stage_checkpoints import write_text_atomic
+
+
+@dataclass
+class StageMetrics:
+    """Telemetry for one pipeline stage of one call"""
+    stage: str
+    wall_seconds: float = 0.0
+    model_seconds: float = 0.0
+    model_calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    parse_seconds: float = 0.0
+    retries: int = 0
+    throttled_seconds: float = 0.0
+    cache_hit: bool = False
+    checkpoint_reused: bool = False
+
+
+# Metrics of the stage running in the current thread / task
+_current_stage: contextvars.ContextVar[Optional[StageMetrics]] = contextvars.ContextVar(
+    "pipeline_current_stage", default=None
+)
+
+_SUMMED_FIELDS = (
+    "model_seconds", "model_calls", "prompt_tokens", "output_tokens",
+    "bytes_sent", "bytes_received", "parse_seconds", "retries", "throttled_seconds",
+)
+
+
+def current_stage() -> Optional[StageMetrics]:
+    """Metrics of the stage being produced in this context, or None outside a stage"""
+    return _current_stage.get()
+
+
+def payload_bytes(contents: List[Any]) -> int:
+    """Bytes of inline request content (base64 data and text); file references count as 0"""
+    total = 0
+    for part in contents:
+        if isinstance(part, str):
+            total += len(part.encode("utf-8"))
+        elif isinstance(part, dict) and isinstance(part.get("data"), (str, bytes)):
+            data = part["data"]
+            total += len(data) if isinstance(data, bytes) else len(data.encode("utf-8"))
+    return total
+
+
+def record_model_call(latency: float, contents: List[Any], response) -> None:
+    """Add one generate_content round-trip to the current stage's metrics"""
+    metrics = current_stage()
+    if metrics is None:
+        return
+    metrics.model_calls += 1
+    metrics.model_seconds += latency
+    metrics.bytes_sent += payload_bytes(contents)
+    try:
+        metrics.bytes_received += len(response.text.encode("utf-8"))
+    except ValueError:
+        # Blocked or empty responses have no text
+        pass
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        metrics.prompt_tokens += getattr(usage, "prompt_token_count", 0) or 0
+        metrics.output_tokens += getattr(usage, "candidates_token_count", 0) or 0
+
+
+@contextmanager
+def timed_parse() -> Iterator[None]:
+    """Attribute the enclosed block to the current stage's parse/cleanup time"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = current_stage()
+        if metrics is not None:
+            metrics.parse_seconds += time.perf_counter() - started
+
+
+class CallMetrics:
+    """Collects the StageMetrics of one process_audio call"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._stages: Dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, stage: str) -> Iterator[StageMetrics]:
+        """Make ``stage`` current for the enclosed block and add its wall-clock time"""
+        with self._lock:
+            metrics = self._stages.setdefault(stage, StageMetrics(stage))
+        token = _current_stage.set(metrics)
+        started = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.wall_seconds += time.perf_counter() - started
+            _current_stage.reset(token)
+
+    def to_dict(self, **labels: Any) -> Dict[str, Any]:
+        """
+        JSON-serializable record of the call
+
+        Returns:
+            ``{**labels, "started_at", "wall_seconds", "stages": {stage: {...}}, "totals": {...}}``
+        """
+        with self._lock:
+            stages = {name: asdict(metrics) for name, metrics in self._stages.items()}
+        totals = {name: sum(stage[name] for stage in stages.values()) for name in _SUMMED_FIELDS}
+        for stage in stages.values():
+            del stage["stage"]
+            for name in ("wall_seconds", "model_seconds", "parse_seconds"):
+                stage[name] = round(stage[name], 6)
+        for name in ("model_seconds", "parse_seconds"):
+            totals[name] = round(totals[name], 6)
+        return {
+            **labels,
+            "started_at": self.started_at,
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": stages,
+            "totals": totals,
+        }
+
+
+class JsonLinesMetricsSink:
+    """Metrics hook appending one JSON line per call to ``path``"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class PrometheusMetricsSink:
+    """
+    Metrics hook aggregating calls into Prometheus text exposition format
+
+    Per-stage counters are cumulative over the life of the sink. ``render()``
+    returns the current text; with ``path`` the file is rewritten atomically
+    after every call (for the node_exporter textfile collector).
+    """
+
+    _STAGE_COUNTERS = (
+        ("wall_seconds", "pipeline_stage_wall_seconds_total", "Wall-clock seconds spent in the stage"),
+        ("model_seconds", "pipeline_stage_model_seconds_total", "Seconds spent waiting on model calls"),
+        ("model_calls", "pipeline_stage_model_calls_total", "Model calls made"),
+        ("prompt_tokens", "pipeline_stage_prompt_tokens_total", "Prompt tokens reported by usage_metadata"),
+        ("output_tokens", "pipeline_stage_output_tokens_total", "Output tokens reported by usage_metadata"),
+        ("bytes_sent", "pipeline_stage_bytes_sent_total", "Inline request payload bytes"),
+        ("bytes_received", "pipeline_stage_bytes_received_total", "Response text bytes"),
+        ("parse_seconds", "pipeline_stage_parse_seconds_total", "Seconds spent cleaning and parsing output"),
+        ("retries", "pipeline_stage_retries_total", "Model calls retried after 429/5xx errors"),
+        ("throttled_seconds", "pipeline_stage_throttled_seconds_total", "Seconds waiting on rate limits and backoff"),
+        ("cache_hit", "pipeline_stage_cache_hits_total", "Stage results served from the stage cache"),
+        ("checkpoint_reused", "pipeline_stage_checkpoint_reuses_total", "Stage results reused from checkpoints"),
+    )
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._calls = 0
+        self._call_seconds = 0.0
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._calls += 1
+            self._call_seconds += record["wall_seconds"]
+            for stage, metrics in record["stages"].items():
+                totals = self._stages.setdefault(stage, {})
+                for field, _, _ in self._STAGE_COUNTERS:
+                    totals[field] = totals.get(field, 0) + float(metrics[field])
+            text = self._render_locked()
+        if self.path:
+            write_text_atomic(self.path, text)
+
+    def render(self) -> str:
+        with self._lock:
+            return self._render_locked()
+
+    def _render_locked(self) -> str:
+        lines = [
+            "# HELP pipeline_calls_total Completed process_audio calls",
+            "# TYPE pipeline_calls_total counter",
+            f"pipeline_calls_total {self._calls}",
+            "# HELP pipeline_call_seconds_total Wall-clock seconds of completed calls",
+            "# TYPE pipeline_call_seconds_total counter",
+            f"pipeline_call_seconds_total {self._call_seconds:.6f}",
+        ]
+        for field, name, help_text in self._STAGE_COUNTERS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage in sorted(self._stages):
+                lines.append(f'{name}{{stage="{stage}"}} {_format_value(self._stages[stage].get(field, 0))}')
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6f}"
+
+
+def metrics_sink_for_path(path: str):
+    """Prometheus textfile sink for ``*.prom`` paths, JSON-lines sink otherwise"""
+    if os.path.splitext(path)[1].lower() == ".prom":
+        return PrometheusMetricsSink(path)
+    return JsonLinesMetricsSink(path)
@@ -0,0 +1,218 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import google.generativeai as genai
+
+from result_cache import sha256_file
+
+
+DEFAULT_MAX_IDLE_SECONDS = 30 * 60
+DEFAULT_HEALTH_CHECK_INTERVAL = 5 * 60
+
+
+def _default_factory(**kwargs):
+    # Imported lazily: dummy_processor uses this module for run_pipeline
+    from dummy_processor import AudioAnalysisPipeline
+    return AudioAnalysisPipeline(**kwargs)
+
+
+def _default_health_check(pipeline) -> None:
+    """Cheap metadata round-trip proving the client and credentials still work"""
+    genai.get_model(pipeline.model_lite.model_name)
+
+
+class _PoolEntry:
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.last_used = time.time()
+        self.last_checked = time.time()
+        self.leases = 0  # process_audio calls currently running on this pipeline
+        self.retired = False  # dropped from the pool; closed once the last lease ends
+
+
+class PipelinePool:
+    """
+    Process-wide pool of initialised AudioAnalysisPipeline instances
+
+    Pipelines are keyed by the credentials file *content* (uploads of the
+    same credentials land at new temp paths), project and location, plus any
+    extra constructor arguments. A pooled pipeline is health-checked at most
+    every ``health_check_interval`` seconds and rebuilt if the check fails;
+    entries idle for longer than ``max_idle_seconds`` are evicted.
+
+    Pipelines are safe to share between threads: all per-call state lives
+    in process_audio. Callers running a pipeline hold a lease (``lease`` or
+    ``acquire``/``release``); a leased pipeline is never evicted, and one
+    replaced after a failed health check is only closed when its last lease
+    is released, so other calls running on it are not cut off.
+    """
+
+    def __init__(
+        self,
+        max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        factory: Callable[..., Any] = _default_factory,
+        health_check: Optional[Callable[[Any], None]] = _default_health_check
+    ):
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_interval = health_check_interval
+        self.factory = factory
+        self.health_check = health_check
+        self._entries: Dict[Tuple, _PoolEntry] = {}
+        self._leased: Dict[int, _PoolEntry] = {}  # id(pipeline) -> entry while leased
+        self._lock = threading.Lock()
+
+    def _make_key(self, credentials_path: str, project_id: Optional[str], location: str,
+                  extra: Dict[str, Any]) -> Tuple:
+        project = project_id or str(os.environ.get("GOOGLE_CLOUD_PROJECT"))
+        frozen_extra = tuple(sorted((name, repr(value)) for name, value in extra.items()))
+        return (sha256_file(credentials_path), project, location, frozen_extra)
+
+    def get(self, credentials_path: str, project_id: Optional[str] = None, location: str = "us-central1",
+            **pipeline_kwargs):
+        """Return a warm pipeline for these settings without a lease (it may be closed once retired)"""
+        return self._checkout(credentials_path, project_id, location, pipeline_kwargs, lease=False).pipeline
+
+    def acquire(self, credentials_path: str, project_id: Optional[str] = None, location: str = "us-central1",
+                **pipeline_kwargs):
+        """Like get, but leased until ``release(pipeline)``: the pipeline stays open while in use"""
+        return self._checkout(credentials_path, project_id, location, pipeline_kwargs, lease=True).pipeline
+
+    def release(self, pipeline) -> None:
+        """End a lease taken with acquire"""
+        with self._lock:
+            entry = self._leased.get(id(pipeline))
+            if entry is None:
+                raise ValueError("Pipeline is not leased from this pool")
+        self._release_entry(entry)
+
+    @contextmanager
+    def lease(self, credentials_path: str, project_id: Optional[str] = None, location: str = "us-central1",
+              **pipeline_kwargs) -> Iterator[Any]:
+        """Context manager around acquire/release"""
+        pipeline = self.acquire(credentials_path, project_id, location, **pipeline_kwargs)
+        try:
+            yield pipeline
+        finally:
+            self.release(pipeline)
+
+    def _checkout(self, credentials_path: str, project_id: Optional[str], location: str,
+                  pipeline_kwargs: Dict[str, Any], lease: bool) -> _PoolEntry:
+        credentials_path = str(credentials_path)
+        key = self._make_key(credentials_path, project_id, location, pipeline_kwargs)
+        self.evict_idle()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._lease_locked(entry, lease)
+
+        if entry is not None and not self._check(entry):
+            self._retire(key, entry)
+            if lease:
+                self._release_entry(entry)
+            entry = None
+
+        if entry is None:
+            pipeline = self.factory(
+                credentials_path=credentials_path,
+                project_id=project_id,
+                location=location,
+                **pipeline_kwargs
+            )
+            with self._lock:
+                # Another thread may have built one meanwhile; keep the first
+                entry = self._entries.setdefault(key, _PoolEntry(pipeline))
+                self._lease_locked(entry, lease)
+            if entry.pipeline is not pipeline:
+                self._close(pipeline)
+        else:
+            # Same credentials content may arrive under a new path
+            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
+
+        entry.last_used = time.time()
+        return entry
+
+    def _lease_locked(self, entry: _PoolEntry, lease: bool) -> None:
+        if lease:
+            entry.leases += 1
+            self._leased[id(entry.pipeline)] = entry
+
+    def _release_entry(self, entry: _PoolEntry) -> None:
+        with self._lock:
+            entry.leases -= 1
+            entry.last_used = time.time()
+            if entry.leases > 0:
+                return
+            self._leased.pop(id(entry.pipeline), None)
+            close = entry.retired
+        if close:
+            self._close(entry.pipeline)
+
+    def _retire(self, key: Tuple, entry: _PoolEntry) -> None:
+        """Drop an entry from the pool; close it now if idle, else when its last lease ends"""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            if entry.retired:
+                return
+            entry.retired = True
+            close = entry.leases == 0
+        if close:
+            self._close(entry.pipeline)
+
+    def _check(self, entry: _PoolEntry) -> bool:
+        """Run the health check if it is due; False means the pipeline should be rebuilt"""
+        if self.health_check is None:
+            return True
+        now = time.time()
+        if now - entry.last_checked < self.health_check_interval:
+            return True
+        entry.last_checked = now
+        try:
+            self.health_check(entry.pipeline)
+        except Exception:
+            return False
+        return True
+
+    def _close(self, pipeline) -> None:
+        close = getattr(pipeline, "close", None)
+        if close is not None:
+            close()
+
+    def evict_idle(self) -> int:
+        """Drop unleased pipelines idle longer than max_idle_seconds; returns how many were evicted"""
+        cutoff = time.time() - self.max_idle_seconds
+        with self._lock:
+            stale = [(key, entry) for key, entry in self._entries.items()
+                     if entry.leases == 0 and entry.last_used < cutoff]
+        for key, entry in stale:
+            self._retire(key, entry)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every pooled pipeline, closing each once it is no longer leased"""
+        with self._lock:
+            entries = list(self._entries.items())
+        for key, entry in entries:
+            self._retire(key, entry)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> PipelinePool:
+    """Return the process-wide pipeline pool"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = PipelinePool()
+        return _default_pool
@@ -0,0 +1,180 @@
+import re
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+
+# Bump when the matching rules change so checkpoints built by older rules are invalidated
+PRECOMPARE_VERSION = "2"
+
+MATCHED = "matched"
+PARTIALLY_MATCHED = "partially matched"
+NOT_MATCHED = "not matched"
+
+_NOT_AVAILABLE = {"", "not available", "notavailable", "n/a", "na", "none", "null", "-"}
+
+# Devanagari letters with a precomposed nukta map to their base letter (the nukta is dropped too)
+_NUKTA_LETTERS = {
+    "\u0958": "\u0915",  # qa -> ka
+    "\u0959": "\u0916",  # khha -> kha
+    "\u095A": "\u0917",  # ghha -> ga
+    "\u095B": "\u091C",  # za -> ja
+    "\u095C": "\u0921",  # dddha -> dda
+    "\u095D": "\u0922",  # rha -> ddha
+    "\u095E": "\u092B",  # fa -> pha
+    "\u095F": "\u092F",  # yya -> ya
+}
+_DEVANAGARI_DIGITS = {chr(0x0966 + i): str(i) for i in range(10)}
+_CHAR_MAP = str.maketrans({
+    **_NUKTA_LETTERS,
+    **_DEVANAGARI_DIGITS,
+    "\u093C": None,      # nukta
+    "\u0901": "\u0902",  # chandrabindu -> anusvara
+    "\u200C": None,      # zero width non-joiner
+    "\u200D": None,      # zero width joiner
+    "\u0964": " ",       # danda
+    "\u0965": " ",       # double danda
+})
+_PUNCTUATION = re.compile(r"[\s\.,;:!?'\"`()\[\]{}|/\\_\-–—]+")
+
+# Party and election-symbol aliases, from the options and symbol table in the prompts
+_PARTY_ALIASES = {
+    "MGB": ["महागठबंधन", "mgb", "महागठबंधन | mgb", "महागठबंधन (mgb)", "लालटेन", "लालटेन छाप"],
+    "NDA": ["jdu | nda", "jdu (nda)", "jdu", "nda", "जदयू", "तीर", "तीर छाप"],
+    "JSP": ["जन सुराज पार्टी", "जन सुराज", "jan suraj", "jan suraaj", "पतंग", "पतंग छाप"],
+    "BSP": ["बीएसपि | bsp", "बीएसपि (bsp)", "बीएसपि", "बीएसपी", "bsp", "बसपा"],
+    "LJP": ["लोक जनशक्ति पार्टी (लोजपा)", "लोक जनशक्ति पार्टी", "लोजपा", "ljp"],
+    "NOTA": ["nota", "नोटा"],
+}
+
+
+def normalize_digits(value: str) -> str:
+    """Map Devanagari digits to ASCII"""
+    return value.translate(str.maketrans(_DEVANAGARI_DIGITS))
+
+
+def normalize_text(value: str) -> str:
+    """Unicode, Devanagari, digit, case, punctuation and whitespace normalisation"""
+    value = unicodedata.normalize("NFC", value).translate(_CHAR_MAP).casefold()
+    return _PUNCTUATION.sub(" ", value).strip()
+
+
+_PARTY_LOOKUP = {
+    normalize_text(alias): party
+    for party, aliases in _PARTY_ALIASES.items()
+    for alias in aliases
+}
+
+
+def is_not_available(value: Any) -> bool:
+    if value is None:
+        return True
+    return isinstance(value, str) and normalize_text(value) in _NOT_AVAILABLE
+
+
+def canonical_party(value: str) -> Optional[str]:
+    """Canonical party code for an option, alias or symbol, or None"""
+    return _PARTY_LOOKUP.get(normalize_text(value))
+
+
+def mobile_number(value: str) -> Optional[str]:
+    """Last 10 digits of a mobile number (country code / trunk prefix dropped), or None"""
+    text = normalize_digits(value)
+    if re.search(r"[^\d\s+\-()]", text):
+        return None
+    digits = re.sub(r"\D", "", text)
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits if len(digits) == 10 else None
+
+
+def compare_pair(value1: Any, value2: Any) -> Optional[str]:
+    """Verdict for one answer pair, or None if it needs semantic comparison"""
+    na1, na2 = is_not_available(value1), is_not_available(value2)
+    if na1 and na2:
+        return MATCHED
+    if na1 or na2:
+        return NOT_MATCHED
+
+    if not isinstance(value1, str) or not isinstance(value2, str):
+        return MATCHED if value1 == value2 else None
+
+    if normalize_text(value1) == normalize_text(value2):
+        return MATCHED
+
+    phone1, phone2 = mobile_number(value1), mobile_number(value2)
+    if phone1 and phone2:
+        return MATCHED if phone1 == phone2 else NOT_MATCHED
+
+    party1, party2 = canonical_party(value1), canonical_party(value2)
+    if party1 and party2:
+        if party1 == party2:
+            return MATCHED
+        # "NOTA vs any specific party" is not matched; other differing parties may
+        # share an alliance ("partially matched"), which is left to the model
+        return NOT_MATCHED if "NOTA" in (party1, party2) else None
+
+    return None
+
+
+def precompare_merged(merged: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, Any]]]:
+    """
+    Split merged answer pairs into locally settled verdicts and unresolved pairs
+
+    Settled pairs are the obvious ones (identical after normalisation, "Not
+    Available" on either side, same party under an alias, same mobile number),
+    decided with the rules spelled out in comparison_prompt.
+
+    Returns:
+        Tuple of (settled, unresolved), both shaped like the merged JSON:
+        ``{section: {question: verdict}}`` and ``{section: {question: [a, b]}}``
+    """
+    settled: Dict[str, Dict[str, str]] = {}
+    unresolved: Dict[str, Dict[str, Any]] = {}
+    for section_key, questions in merged.items():
+        if not isinstance(questions, dict):
+            continue
+        for question_key, pair in questions.items():
+            verdict = None
+            if isinstance(pair, list) and len(pair) == 2:
+                verdict = compare_pair(pair[0], pair[1])
+            if verdict is None:
+                unresolved.setdefault(section_key, {})[question_key] = pair
+            else:
+                settled.setdefault(section_key, {})[question_key] = verdict
+    return settled, unresolved
+
+
+def combine_comparison(merged: Dict[str, Any], settled: Dict[str, Dict[str, str]],
+                       model_output: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Comparison JSON in the comparison_prompt format from local and model verdicts
+
+    Local verdicts win for settled questions; the summary is recomputed.
+    """
+    model_output = model_output if isinstance(model_output, dict) else {}
+    comparison: Dict[str, Any] = {}
+    counts = {MATCHED: 0, PARTIALLY_MATCHED: 0, NOT_MATCHED: 0}
+    total = 0
+    for section_key, questions in merged.items():
+        if not isinstance(questions, dict):
+            continue
+        section = {}
+        for question_key in questions:
+            verdict = settled.get(section_key, {}).get(question_key)
+            if verdict is None:
+                verdict = model_output.get(section_key, {}).get(question_key, "Not Available")
+            section[question_key] = verdict
+            total += 1
+            if isinstance(verdict, str) and verdict.strip().lower() in counts:
+                counts[verdict.strip().lower()] += 1
+        comparison[section_key] = section
+
+    comparison["summary"] = {
+        "total_questions": total,
+        "matched": counts[MATCHED],
+        "partially_matched": counts[PARTIALLY_MATCHED],
+        "not_matched": counts[NOT_MATCHED],
+    }
+    return comparison
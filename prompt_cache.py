@@ -0,0 +1,126 @@
+import datetime
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import google.generativeai as genai
+from google.generativeai import caching
+
+from result_cache import sha256_text
+
+
+DEFAULT_TTL_SECONDS = 60 * 60
+DEFAULT_REFRESH_MARGIN_SECONDS = 5 * 60
+DEFAULT_RETRY_AFTER_FAILURE_SECONDS = 10 * 60
+
+
+class _CacheEntry:
+    def __init__(self, cached_content, model, expires_at: float):
+        self.cached_content = cached_content
+        self.model = model
+        self.expires_at = expires_at
+        self.lock = threading.Lock()
+
+
+class PromptContextCache:
+    """
+    Provider-side context caches for the large static prompt prefixes
+
+    The first request for a (model, prompt) pair creates a CachedContent
+    holding the prompt and a model bound to it; later requests only send the
+    per-call input. Entries are refreshed (TTL extended) once they get within
+    ``refresh_margin_seconds`` of expiry, and recreated if the refresh fails.
+
+    ``model_for`` returns None whenever caching is unavailable (creation
+    failed, prompt below the provider's minimum size, ...) so callers fall
+    back to sending the prompt inline. After a failure the pair is not
+    retried for ``retry_after_failure_seconds``.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        refresh_margin_seconds: float = DEFAULT_REFRESH_MARGIN_SECONDS,
+        retry_after_failure_seconds: float = DEFAULT_RETRY_AFTER_FAILURE_SECONDS
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.retry_after_failure_seconds = retry_after_failure_seconds
+        self._entries: Dict[Tuple[str, str], _CacheEntry] = {}
+        self._failed_until: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, model, prompt: str) -> Tuple[str, str]:
+        return (model.model_name, sha256_text(prompt))
+
+    def _create(self, model, prompt: str, generation_config) -> _CacheEntry:
+        cached_content = caching.CachedContent.create(
+            model=model.model_name,
+            display_name=f"audio-pipeline-{sha256_text(prompt)[:12]}",
+            contents=[prompt],
+            ttl=datetime.timedelta(seconds=self.ttl_seconds)
+        )
+        cached_model = genai.GenerativeModel.from_cached_content(
+            cached_content=cached_content,
+            generation_config=generation_config
+        )
+        return _CacheEntry(cached_content, cached_model, time.time() + self.ttl_seconds)
+
+    def _refresh(self, entry: _CacheEntry) -> bool:
+        try:
+            entry.cached_content.update(ttl=datetime.timedelta(seconds=self.ttl_seconds))
+        except Exception:
+            return False
+        entry.expires_at = time.time() + self.ttl_seconds
+        return True
+
+    def model_for(self, model, prompt: str, generation_config: Any = None):
+        """Model bound to a cached copy of ``prompt``, or None to send the prompt inline"""
+        key = self._key(model, prompt)
+        with self._lock:
+            if self._failed_until.get(key, 0) > time.time():
+                return None
+            entry = self._entries.get(key)
+
+        if entry is not None:
+            with entry.lock:
+                if entry.expires_at - time.time() > self.refresh_margin_seconds:
+                    return entry.model
+                if self._refresh(entry):
+                    return entry.model
+            self.invalidate(model, prompt)
+
+        try:
+            entry = self._create(model, prompt, generation_config)
+        except Exception:
+            with self._lock:
+                self._failed_until[key] = time.time() + self.retry_after_failure_seconds
+            return None
+
+        with self._lock:
+            existing = self._entries.setdefault(key, entry)
+        if existing is not entry:
+            self._delete(entry)
+        return existing.model
+
+    def invalidate(self, model, prompt: str) -> None:
+        """Forget the cache for this pair (e.g. after the provider reported it missing)"""
+        with self._lock:
+            entry = self._entries.pop(self._key(model, prompt), None)
+        if entry is not None:
+            self._delete(entry)
+
+    def _delete(self, entry: _CacheEntry) -> None:
+        try:
+            entry.cached_content.delete()
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        """Delete every provider-side cache created by this instance"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._failed_until.clear()
+        for entry in entries:
+            self._delete(entry)
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from google.api_core import exceptions as google_exceptions
+
+from pipeline_metrics import current_stage
+
+
+# Errors worth retrying: quota (429), overload (503), transient server errors
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+)
+
+_RETRY_IN_MESSAGE = re.compile(r"retry in\s+([\d.]+)\s*s", re.IGNORECASE)
+
+
+@dataclass
+class RateLimit:
+    """Per-model quota; 0 means unlimited"""
+    requests_per_minute: float = 0
+    tokens_per_minute: float = 0
+
+
+def estimate_tokens(contents: List[Any], audio_bytes_per_token: float = 500.0,
+                    expected_output_tokens: int = 2048) -> int:
+    """
+    Rough token cost of a request before it is sent
+
+    Text counts ~4 characters per token, inline audio ``audio_bytes_per_token``
+    decoded bytes per token (base64 is 4/3 of that); the estimate is corrected
+    from usage_metadata once the response arrives.
+    """
+    tokens = expected_output_tokens
+    for part in contents:
+        if isinstance(part, str):
+            tokens += len(part) // 4
+        elif isinstance(part, dict) and isinstance(part.get("data"), str):
+            raw_bytes = len(part["data"]) * 3 // 4
+            if str(part.get("mime_type", "")).startswith("text/"):
+                tokens += raw_bytes // 4
+            else:
+                tokens += int(raw_bytes / audio_bytes_per_token)
+    return tokens
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-requested delay from a Retry-After header, RetryInfo detail or error message"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+    for detail in getattr(error, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+    match = _RETRY_IN_MESSAGE.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+class _MemoryState:
+    """Window state shared by the threads of one process"""
+
+    def __init__(self):
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self, model: str) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            yield self._rows.setdefault(model, {})
+
+
+class _SqliteState:
+    """
+    Window state in a SQLite file shared by every process on the host
+
+    Each read-modify-write runs in a ``BEGIN IMMEDIATE`` transaction, so
+    concurrent workers serialise on the database lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS rate_windows (model TEXT PRIMARY KEY, state TEXT NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, model: str) -> Iterator[Dict[str, Any]]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            found = conn.execute("SELECT state FROM rate_windows WHERE model = ?", (model,)).fetchone()
+            row = json.loads(found[0]) if found else {}
+            yield row
+            conn.execute("INSERT OR REPLACE INTO rate_windows (model, state) VALUES (?, ?)", (model, json.dumps(row)))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+# Length of the quota window
+WINDOW_SECONDS = 60.0
+
+
+class ModelRateLimiter:
+    """
+    Request scheduler shared by every model call
+
+    Each model keeps a log of the requests (and their token estimates) sent
+    in the last minute; a call waits until adding it keeps both the request
+    and the token count of every 60-second window within the model's quota,
+    so the limits are never exceeded, even in bursts. Token estimates are
+    corrected from usage_metadata once the response arrives. Retryable
+    errors (429/5xx) are retried up to ``max_retries`` times with full-jitter
+    exponential backoff, or after the server's Retry-After when given. A 429
+    also blocks the model for everyone sharing the state until that delay
+    has passed.
+
+    With ``state_path`` (and at least one limit configured) the log lives in
+    a SQLite file so worker processes on the same host share one quota;
+    otherwise it is per process.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RateLimit]] = None,
+        default_limit: Optional[RateLimit] = None,
+        state_path: Optional[str] = None,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        estimate: Callable[[List[Any]], int] = estimate_tokens
+    ):
+        self.limits = {self._model_key(name): limit for name, limit in (limits or {}).items()}
+        self.default_limit = default_limit or RateLimit()
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.estimate = estimate
+        limited = any(limit.requests_per_minute or limit.tokens_per_minute
+                      for limit in [self.default_limit, *self.limits.values()])
+        # Without limits only the 429 block is shared, which does not need a database round-trip per call
+        self._state = _SqliteState(state_path) if state_path and limited else _MemoryState()
+
+    @staticmethod
+    def _model_key(model_name: str) -> str:
+        return model_name.split("/", 1)[1] if model_name.startswith("models/") else model_name
+
+    def _limit(self, model: str) -> RateLimit:
+        return self.limits.get(model, self.default_limit)
+
+    def _reserve(self, model: str, tokens: int) -> Tuple[float, Optional[int]]:
+        """
+        Log one request of ``tokens`` if the window allows it
+
+        Returns:
+            Tuple of (seconds to wait, reservation id); the id is None unless
+            the request was logged (wait 0)
+        """
+        limit = self._limit(model)
+        now = time.time()
+        with self._state.transaction(model) as row:
+            wait = row.get("blocked_until", 0.0) - now
+            if not limit.requests_per_minute and not limit.tokens_per_minute:
+                return max(0.0, wait), None
+            # Entries are [sent_at, tokens, id], oldest first
+            log = [entry for entry in row.get("log", []) if entry[0] > now - WINDOW_SECONDS]
+            allowed = max(1, int(limit.requests_per_minute))
+            if limit.requests_per_minute and len(log) >= allowed:
+                # The oldest entries must leave the window until this one fits
+                oldest_kept = log[len(log) - allowed]
+                wait = max(wait, oldest_kept[0] + WINDOW_SECONDS - now)
+            if limit.tokens_per_minute:
+                excess = sum(entry[1] for entry in log) + min(tokens, limit.tokens_per_minute) \
+                    - limit.tokens_per_minute
+                for entry in log:
+                    if excess <= 0:
+                        break
+                    excess -= entry[1]
+                    wait = max(wait, entry[0] + WINDOW_SECONDS - now)
+            reservation = None
+            if wait <= 0:
+                reservation = random.getrandbits(48)
+                log.append([now, tokens, reservation])
+            row["log"] = log
+        return max(0.0, wait), reservation
+
+    def _settle(self, model: str, reservation: Optional[int], response) -> None:
+        """Replace the request's token estimate with the usage the response actually reported"""
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "total_token_count", 0) or (
+            (getattr(usage, "prompt_token_count", 0) or 0) + (getattr(usage, "candidates_token_count", 0) or 0)
+        )
+        if not actual or reservation is None or not self._limit(model).tokens_per_minute:
+            return
+        with self._state.transaction(model) as row:
+            for entry in row.get("log", []):
+                if entry[2] == reservation:
+                    entry[1] = actual
+
+    def _release(self, model: str, reservation: Optional[int]) -> None:
+        """Drop the logged request the server rejected"""
+        if reservation is None:
+            return
+        with self._state.transaction(model) as row:
+            row["log"] = [entry for entry in row.get("log", []) if entry[2] != reservation]
+
+    def _block(self, model: str, seconds: float) -> None:
+        """Hold back every caller of ``model`` for ``seconds`` (after a quota error)"""
+        with self._state.transaction(model) as row:
+            row["blocked_until"] = max(row.get("blocked_until", 0.0), time.time() + seconds)
+
+    def _backoff(self, attempt: int, error: BaseException, model: str, reservation: Optional[int]) -> float:
+        self._release(model, reservation)
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        elif isinstance(error, (google_exceptions.TooManyRequests, google_exceptions.ResourceExhausted)):
+            self._block(model, delay)
+        return delay
+
+    def _record(self, retries: int, waited: float) -> None:
+        metrics = current_stage()
+        if metrics is not None:
+            metrics.retries += retries
+            metrics.throttled_seconds += waited
+
+    def call(self, model_name: str, contents: List[Any], request: Callable[[], Any]):
+        """Run ``request`` (one generate_content call) within the model's quota, retrying transient errors"""
+        model = self._model_key(model_name)
+        tokens = self.estimate(contents)
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            while True:
+                wait, reservation = self._reserve(model, tokens)
+                if wait <= 0:
+                    break
+                waited += wait
+                time.sleep(wait)
+            try:
+                response = request()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self._record(attempt, waited)
+                    raise
+                delay = self._backoff(attempt, e, model, reservation)
+                waited += delay
+                time.sleep(delay)
+                continue
+            self._settle(model, reservation, response)
+            self._record(attempt, waited)
+            return response
+
+    async def call_async(self, model_name: str, contents: List[Any], request: Callable[[], Any]):
+        """Async twin of call; ``request`` returns an awaitable"""
+        model = self._model_key(model_name)
+        tokens = self.estimate(contents)
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            while True:
+                wait, reservation = await asyncio.to_thread(self._reserve, model, tokens)
+                if wait <= 0:
+                    break
+                waited += wait
+                await asyncio.sleep(wait)
+            try:
+                response = await request()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self._record(attempt, waited)
+                    raise
+                delay = await asyncio.to_thread(self._backoff, attempt, e, model, reservation)
+                waited += delay
+                await asyncio.sleep(delay)
+                continue
+            await asyncio.to_thread(self._settle, model, reservation, response)
+            self._record(attempt, waited)
+            return response
@@ -0,0 +1,156 @@
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Optional, Any
+
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GiB
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(file_path: str) -> str:
+    """SHA-256 of a file, read in chunks so large recordings are not held in memory"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_text(text) -> str:
+    """SHA-256 of a str or bytes value"""
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha256(text).hexdigest()
+
+
+def config_fingerprint(generation_config: Any) -> str:
+    """Stable JSON form of a generation config (dataclass, mapping or None)"""
+    if generation_config is None:
+        data = {}
+    elif dataclasses.is_dataclass(generation_config):
+        data = dataclasses.asdict(generation_config)
+    elif isinstance(generation_config, dict):
+        data = dict(generation_config)
+    else:
+        data = getattr(generation_config, "__dict__", {"repr": repr(generation_config)})
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+class StageCache:
+    """
+    Persistent, content-addressed cache of pipeline stage outputs
+
+    Entries are raw model response texts stored one file per key under
+    ``cache_dir``. Keys combine the input hash, the stage prompt hash, the
+    model name and the generation config, so any change to one of them misses.
+    When the total size goes over ``max_bytes`` the least recently used
+    entries (by file mtime, refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(input_hash: str, prompt: str, model_name: str, generation_config: Any) -> str:
+        """Build the cache key for one stage invocation"""
+        parts = [
+            input_hash,
+            sha256_text(prompt),
+            str(model_name),
+            config_fingerprint(generation_config),
+        ]
+        return sha256_text("\n".join(parts))
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached text for ``key`` or None on a miss"""
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store ``text`` under ``key`` and evict old entries if over quota"""
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = text.encode("utf-8")
+
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            with self._lock:
+                # An overwritten entry's bytes leave the total with it
+                try:
+                    replaced = os.path.getsize(path)
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                if self._total_bytes is None:
+                    self._total_bytes = self._scan_size()
+                else:
+                    self._total_bytes += len(data) - replaced
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _iter_entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".txt"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat
+
+    def _scan_size(self) -> int:
+        return sum(stat.st_size for _, stat in self._iter_entries())
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is at 90% of quota"""
+        entries = sorted(self._iter_entries(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        target = int(self.max_bytes * 0.9)
+        for path, stat in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= stat.st_size
+            except FileNotFoundError:
+                pass
+        self._total_bytes = total
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        with self._lock:
+            for path, _ in list(self._iter_entries()):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._total_bytes = 0
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor, Future
+from typing import Dict, Any, List, Optional
+
+from result_cache import sha256_file, sha256_text
+
+
+MANIFEST_FILENAME = "pipeline_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def combine_fingerprint(stage: str, *parts: str) -> str:
+    """Fingerprint of a local (non-model) stage from the hashes of its inputs"""
+    return sha256_text("\n".join((stage,) + tuple(str(p) for p in parts)))
+
+
+class StageCheckpoints:
+    """
+    Manifest of completed stage artifacts in a pipeline output directory
+
+    For each stage the manifest records the artifact filename, a fingerprint
+    of the inputs it was built from and the SHA-256 of the artifact itself.
+    A checkpoint is valid only if the artifact still exists, still hashes to
+    the recorded value, parses as JSON and was built from the same inputs.
+    """
+
+    def __init__(self, output_dir: str, manifest_filename: str = MANIFEST_FILENAME):
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, manifest_filename)
+        self._lock = threading.Lock()
+        self._stages = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("stages", {})
+
+    def load_valid(self, stage: str, fingerprint: str, artifact_path: str) -> Optional[str]:
+        """
+        Text of ``artifact_path`` if it is a completed, intact output of
+        ``stage`` for these inputs, otherwise None
+        """
+        with self._lock:
+            entry = self._stages.get(stage)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+        if entry.get("filename") != os.path.basename(artifact_path):
+            return None
+        try:
+            with open(artifact_path, "rb") as f:
+                data = f.read()
+            if sha256_text(data) != entry.get("sha256"):
+                return None
+            text = data.decode("utf-8")
+            json.loads(text)
+        except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        return text
+
+    def is_valid(self, stage: str, fingerprint: str, artifact_path: str) -> bool:
+        """True if ``artifact_path`` is a completed, intact output of ``stage`` for these inputs"""
+        return self.load_valid(stage, fingerprint, artifact_path) is not None
+
+    def artifact_hash(self, stage: str) -> Optional[str]:
+        """Recorded SHA-256 of a stage artifact, if any"""
+        with self._lock:
+            entry = self._stages.get(stage)
+        return entry.get("sha256") if entry else None
+
+    def record(self, stage: str, fingerprint: str, artifact_path: str, artifact_sha: Optional[str] = None) -> str:
+        """
+        Record ``artifact_path`` as the output of ``stage`` and return its SHA-256
+
+        Pass ``artifact_sha`` when the hash of the written content is already
+        known to avoid reading the file back.
+        """
+        if artifact_sha is None:
+            artifact_sha = sha256_file(artifact_path)
+        with self._lock:
+            self._stages[stage] = {
+                "filename": os.path.basename(artifact_path),
+                "fingerprint": fingerprint,
+                "sha256": artifact_sha,
+            }
+            self._write()
+        return artifact_sha
+
+    def _write(self) -> None:
+        """Atomically rewrite the manifest (caller holds the lock)"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "stages": self._stages}, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def write_text_atomic(path: str, text: str) -> None:
+    """Write ``text`` to ``path`` via a temp file and rename so readers never see partial files"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ArtifactWriter:
+    """
+    Persists stage artifacts off the critical path
+
+    Each ``submit`` writes one artifact on ``executor`` and then records its
+    checkpoint, so the manifest only ever points at fully written files.
+    ``flush`` waits for every pending write and re-raises the first failure.
+    """
+
+    def __init__(self, checkpoints: StageCheckpoints, executor: Executor):
+        self.checkpoints = checkpoints
+        self._executor = executor
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(self, stage: str, fingerprint: str, artifact_path: str, text: str, artifact_sha: str) -> Future:
+        future = self._executor.submit(self._write, stage, fingerprint, artifact_path, text, artifact_sha)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def _write(self, stage: str, fingerprint: str, artifact_path: str, text: str, artifact_sha: str) -> None:
+        write_text_atomic(artifact_path, text)
+        self.checkpoints.record(stage, fingerprint, artifact_path, artifact_sha)
+
+    def _drain(self) -> List[Future]:
+        with self._lock:
+            futures, self._futures = self._futures, []
+        return futures
+
+    def flush(self) -> None:
+        """Block until all submitted artifacts are on disk"""
+        errors = [f.exception() for f in self._drain()]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    async def flush_async(self) -> None:
+        """Async twin of flush"""
+        futures = self._drain()
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True)
+        for outcome in results:
+            if isinstance(outcome, BaseException):
+                raise outcome
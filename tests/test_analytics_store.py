@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from analytics_store import UNKNOWN_AGENT, AnalyticsStore, call_counters
+
+
+FINAL = {
+    "Profile": {
+        "Q1": ["30", "30", "Asked properly", "Matched"],
+        "Q2": ["yes", "no", "Asked", "Not matched"],
+        "Q3": ["", "maybe", "Not asked", "Partially matched"],
+    }
+}
+REJECTED = {"summary": {"status": "rejected", "reason": "silent"}, "Profile": {"Q1": ["", "", "", ""]}}
+
+
+def _at(day, hour):
+    return time.mktime(time.strptime(f"{day} {hour:02d}:30", "%Y-%m-%d %H:%M"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AnalyticsStore(str(tmp_path / "analytics.sqlite"))
+
+
+def test_call_counters():
+    counters = call_counters(FINAL)
+
+    assert counters["completed"] == 1
+    assert counters["questions"] == 3
+    assert (counters["asked_properly"], counters["asked"], counters["not_asked"]) == (1, 1, 1)
+    assert (counters["matched"], counters["partially_matched"], counters["not_matched"]) == (1, 1, 1)
+    assert call_counters(REJECTED)["rejected"] == 1
+
+
+def test_rollups_by_agent_day_month_and_hour(store):
+    store.record_call("c1", "alice", FINAL, wall_seconds=10, recorded_at=_at("2026-09-30", 9))
+    store.record_call("c2", "alice", FINAL, wall_seconds=20, recorded_at=_at("2026-10-01", 9))
+    store.record_call("c3", "bob", REJECTED, wall_seconds=1, recorded_at=_at("2026-10-01", 14))
+    store.record_call("c4", None, FINAL, recorded_at=_at("2026-10-01", 14))
+
+    assert store.agents() == ["alice", "bob", UNKNOWN_AGENT]
+    assert store.totals()["calls"] == 4
+    assert store.totals("alice")["wall_seconds"] == 30
+    assert [(row["day"], row["calls"]) for row in store.daily()] == [("2026-09-30", 1), ("2026-10-01", 3)]
+    assert [row["day"] for row in store.daily(since="2026-10-01")] == ["2026-10-01"]
+    assert [(row["month"], row["matched"]) for row in store.monthly("alice")] == [("2026-09", 1), ("2026-10", 1)]
+    assert [(row["hour"], row["calls"]) for row in store.hourly()] == [(9, 2), (14, 2)]
+    assert store.totals("bob")["rejected"] == 1
+
+
+def test_recording_a_call_again_replaces_its_contribution(store):
+    store.record_call("c1", "alice", FINAL, recorded_at=_at("2026-10-01", 9))
+    store.record_call("c1", "bob", REJECTED, recorded_at=_at("2026-10-02", 10))
+
+    assert store.agents() == ["bob"]
+    assert store.totals()["calls"] == 1
+    assert store.totals("alice")["calls"] == 0
+    assert [row["day"] for row in store.daily() if row["calls"]] == ["2026-10-02"]
+
+
+def test_telemetry_fills_timings_and_tokens(store):
+    metrics = {"started_at": _at("2026-10-01", 9), "wall_seconds": 42.5,
+               "totals": {"model_calls": 5, "prompt_tokens": 1000, "output_tokens": 200}}
+    store.record_result("c1", "alice", {"final": FINAL, "metrics": metrics})
+
+    totals = store.totals("alice")
+    assert (totals["model_calls"], totals["prompt_tokens"], totals["output_tokens"]) == (5, 1000, 200)
+    assert totals["wall_seconds"] == 42.5
+    assert store.daily()[0]["day"] == "2026-10-01"
+
+
+def test_concurrent_writers_keep_rollups_consistent(tmp_path):
+    path = str(tmp_path / "analytics.sqlite")
+    AnalyticsStore(path)
+
+    def worker(index):
+        store = AnalyticsStore(path)
+        for call in range(10):
+            store.record_call(f"w{index}-c{call}", f"agent{index % 2}", FINAL, recorded_at=_at("2026-10-01", 9))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    store = AnalyticsStore(path)
+    assert store.totals()["calls"] == 40
+    assert store.totals()["questions"] == 120
+    assert sum(row["calls"] for row in store.hourly()) == 40
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import analytics_store
+import artifact_store
+from analytics_store import AnalyticsStore
+from artifact_store import ArtifactStore
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    # The app renders its assets by relative path and builds its stores from the module defaults
+    monkeypatch.chdir(APP_DIR)
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    monkeypatch.setattr(artifact_store, "_default_artifact_store", store)
+    monkeypatch.setattr(analytics_store, "_default_analytics_store", AnalyticsStore(str(tmp_path / "analytics.sqlite")))
+    return store
+
+
+def test_fresh_session_loads_and_keeps_its_artifacts_alive(stores):
+    app = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=60).run()
+
+    assert not app.exception
+    seen_at = app.session_state["artifacts_seen_at"]
+    app.run()
+    assert not app.exception
+    # Throttled: a rerun within the minute does not touch the index again
+    assert app.session_state["artifacts_seen_at"] == seen_at
@@ -0,0 +1,127 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from artifact_store import ArtifactStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path / "artifacts"), max_bytes=1000, min_idle_seconds=0)
+
+
+def _age(store, key, seconds):
+    with store._index() as conn:
+        conn.execute("UPDATE artifacts SET last_used = last_used - ? WHERE key = ?", (seconds, key))
+
+
+def _write_run(path, size):
+    with open(os.path.join(path, "final_output.json"), "wb") as f:
+        f.write(b"x" * size)
+
+
+def test_uploads_are_deduplicated_and_refcounted_by_session(store):
+    path, sha256 = store.save_upload(io.BytesIO(b"audio"), ".m4a", session_id="a", label="call.m4a")
+    again, _ = store.save_upload(io.BytesIO(b"audio"), ".m4a", session_id="b")
+
+    assert again == path
+    assert [entry.sha256 for entry in store.find(kind="upload")] == [sha256]
+    assert store.release_session("a") == 0
+    assert os.path.exists(path)
+    assert store.release_session("b") == 1
+    assert not os.path.exists(path)
+    assert store.find() == []
+
+
+def test_run_dir_size_is_recorded_on_touch(store):
+    run = store.new_run_dir(session_id="a", label="call.m4a")
+    assert store.total_bytes() == 0
+
+    _write_run(run, 300)
+    store.touch(run)
+    assert store.total_bytes() == 300
+
+
+def test_quota_evicts_least_recently_used_unreferenced_artifacts(store):
+    runs = []
+    for age in (300, 200, 100):
+        run = store.new_run_dir()
+        _write_run(run, 400)
+        store.touch(run)
+        _age(store, f"run:{os.path.basename(run)}", age)
+        runs.append(run)
+
+    # 1200 bytes against a 1000 byte quota: the oldest goes, leaving 800 (under 90%)
+    assert store.enforce_quota() == 1
+    assert [os.path.exists(run) for run in runs] == [False, True, True]
+    assert store.total_bytes() == 800
+
+
+def test_referenced_artifacts_are_never_evicted(store):
+    referenced = store.new_run_dir(session_id="live")
+    unreferenced = store.new_run_dir()
+    for run in (referenced, unreferenced):
+        _write_run(run, 800)
+        store.touch(run)
+        _age(store, f"run:{os.path.basename(run)}", 10 * 24 * 60 * 60)
+
+    store.enforce_quota()
+    assert os.path.exists(referenced)
+    assert not os.path.exists(unreferenced)
+    assert store.total_bytes() == 800
+
+
+def test_sessions_not_seen_within_the_timeout_lose_their_references(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"), max_bytes=100, min_idle_seconds=0,
+                          session_timeout_seconds=60)
+    kept = store.new_run_dir(session_id="open-tab")
+    gone = store.new_run_dir(session_id="closed-tab")
+    for run in (kept, gone):
+        _write_run(run, 100)
+        store.touch(run)
+    with store._index() as conn:
+        conn.execute("UPDATE session_refs SET last_seen = last_seen - 120")
+    store.touch_session("open-tab")
+
+    store.enforce_quota()
+    assert os.path.exists(kept)
+    assert not os.path.exists(gone)
+
+
+def test_recently_used_artifacts_are_kept(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"), max_bytes=100, min_idle_seconds=60)
+    run = store.new_run_dir()
+    _write_run(run, 500)
+    store.touch(run)
+
+    assert store.enforce_quota() == 0
+    assert os.path.exists(run)
+
+
+def test_release_does_not_delete_an_upload_saved_again_concurrently(store):
+    stop = threading.Event()
+    missing = []
+
+    def save_again():
+        while not stop.is_set():
+            path, _ = store.save_upload(io.BytesIO(b"shared audio"), ".m4a", session_id="b")
+            if not os.path.exists(path):
+                missing.append(path)
+            store.release_session("b")
+
+    store.save_upload(io.BytesIO(b"shared audio"), ".m4a", session_id="a")
+    thread = threading.Thread(target=save_again)
+    thread.start()
+    try:
+        deadline = time.time() + 1.0
+        while time.time() < deadline:
+            store.save_upload(io.BytesIO(b"shared audio"), ".m4a", session_id="a")
+            store.release_session("a")
+    finally:
+        stop.set()
+        thread.join()
+
+    assert missing == []
@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+
+import pytest
+
+import batch_runner
+
+
+class StubPipeline:
+    """Stands in for AudioAnalysisPipeline; the audio file name picks the outcome"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def process_audio(self, audio_file_path, json_path_2, output_dir, verbose=True, resume=False):
+        self.calls.append({"audio": audio_file_path, "output_dir": output_dir, "resume": resume})
+        self.threads.add(threading.get_ident())
+        name = os.path.basename(audio_file_path)
+        if name.startswith("broken"):
+            raise RuntimeError("model unavailable")
+        os.makedirs(output_dir, exist_ok=True)
+        final_path = os.path.join(output_dir, "final_output.json")
+        with open(final_path, "w", encoding="utf-8") as f:
+            json.dump({"Section": {"Q1": ["yes", "yes", "asked", "matched"]}}, f)
+        result = {
+            "final": {"Section": {"Q1": ["yes", "yes", "asked", "matched"]}},
+            "final_path": final_path,
+            "metrics": {"totals": {"model_calls": 5}, "wall_seconds": 1.0},
+        }
+        if name.startswith("silent"):
+            result["gate"] = {"accepted": False, "reason": "silent", "detail": "near-silent recording"}
+        return result
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    pipeline = StubPipeline()
+    monkeypatch.setattr(batch_runner._thread_state, "pipeline", pipeline, raising=False)
+    monkeypatch.setattr(batch_runner, "_build_pipeline", lambda pipeline_kwargs: pipeline)
+    return pipeline
+
+
+def _job(job_id, audio):
+    return {"id": job_id, "audio": audio, "survey": "survey.json", "agent": "alice"}
+
+
+def test_run_job_reports_ok_skipped_and_error(stub, tmp_path):
+    ok = batch_runner._run_job(_job("a", "call.m4a"), str(tmp_path), resume=True)
+    skipped = batch_runner._run_job(_job("b", "silent.m4a"), str(tmp_path))
+    error = batch_runner._run_job(_job("c", "broken.m4a"), str(tmp_path))
+
+    assert ok["status"] == "ok"
+    assert ok["final_path"] == os.path.join(str(tmp_path), "a", "final_output.json")
+    assert ok["metrics"] == {"model_calls": 5}
+    assert skipped["status"] == "skipped"
+    assert skipped["reason"] == "silent"
+    assert error["status"] == "error"
+    assert error["error"] == "RuntimeError: model unavailable"
+    assert [call["resume"] for call in stub.calls] == [True, False, False]
+    assert all("seconds" in record for record in (ok, skipped, error))
+
+
+def test_run_job_keeps_ok_status_when_analytics_fail(stub, tmp_path, monkeypatch):
+    class BrokenStore:
+        def record_result(self, call_id, agent, result):
+            raise OSError("disk full")
+
+    monkeypatch.setattr(batch_runner, "_get_analytics_store", lambda path: BrokenStore())
+    record = batch_runner._run_job(_job("a", "call.m4a"), str(tmp_path), analytics_path="analytics.sqlite")
+
+    assert record["status"] == "ok"
+    assert record["analytics_error"] == "OSError: disk full"
+
+
+def test_run_job_records_analytics(stub, tmp_path):
+    analytics_path = str(tmp_path / "analytics.sqlite")
+    batch_runner._run_job(_job("a", "call.m4a"), str(tmp_path), analytics_path=analytics_path)
+
+    totals = batch_runner._get_analytics_store(analytics_path).totals("alice")
+    assert totals["calls"] == 1
+    assert totals["matched"] == 1
+
+
+def test_run_batch_summary_and_resume(stub, tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    audio = ["call1.m4a", "silent.m4a", "broken.m4a", "call2.m4a", "call3.m4a", "call4.m4a"]
+    manifest.write_text("".join(json.dumps({"id": f"job{i}", "audio": name, "survey": "s.json"}) + "\n"
+                                for i, name in enumerate(audio)))
+    output_root = str(tmp_path / "out")
+
+    summary = batch_runner.run_batch(str(manifest), "cred.json", output_root=output_root, workers=3,
+                                     parquet_dir=str(tmp_path / "parquet"))
+
+    assert summary["total"] == 6
+    assert summary["succeeded"] == 5
+    assert summary["failed"] == 1
+    assert summary["skipped"] == 1
+    assert [record["id"] for record in summary["results"]] == [f"job{i}" for i in range(6)]
+    assert summary["parquet_rows"] == 5
+    assert batch_runner._pipeline_kwargs["rate_limit_state"] == os.path.join(output_root, ".rate_limits.sqlite")
+    with open(os.path.join(output_root, "batch_summary.json"), encoding="utf-8") as f:
+        assert json.load(f)["succeeded"] == 5
+
+    resumed = batch_runner.run_batch(str(manifest), "cred.json", output_root=output_root, workers=3, resume=True,
+                                     parquet_dir=str(tmp_path / "parquet"))
+
+    assert resumed["succeeded"] == 5
+    assert resumed["parquet_rows"] == 0  # already exported by the first run
+    assert all(call["resume"] for call in stub.calls[6:])
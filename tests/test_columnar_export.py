@@ -0,0 +1,75 @@
+import io
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from columnar_export import (
+    RESULT_SCHEMA, ParquetResultWriter, export_output_root, exported_call_ids, final_output_table, parquet_bytes
+)
+
+
+FINAL = {
+    "summary": {"status": "completed"},
+    "Profile": {
+        "Question 1": ["30", "30", "Asked properly", "Matched"],
+        "Question 12": ["yes", None, "Asked", "Not matched"],
+    },
+    "Closing": {"Question 3": ["ok"]},
+}
+
+
+def _read(root):
+    return ds.dataset(root, format="parquet", partitioning="hive").to_table()
+
+
+def test_final_output_table_has_one_typed_row_per_question():
+    table = final_output_table(FINAL, call_id="run-1", agent="alice", recorded_at=1_790_000_000)
+
+    assert table.schema == RESULT_SCHEMA
+    assert table.num_rows == 3
+    rows = table.to_pylist()
+    assert [row["question_number"] for row in rows] == [1, 12, 3]
+    assert rows[1]["ai_finding"] is None
+    assert rows[2]["semantic"] is None
+    assert {row["call_id"] for row in rows} == {"run-1"}
+    assert pq.read_table(io.BytesIO(parquet_bytes(table))).num_rows == 3
+
+
+def test_free_text_values_do_not_overflow():
+    final = {"Profile": {f"Q{i}": ["a", "b", f"asked {i}", f"verdict {i}"] for i in range(300)}}
+
+    table = final_output_table(final, call_id="run-1")
+    assert table.schema.field("semantic").type == pa.string()
+    assert len(set(table.column("semantic").to_pylist())) == 300
+
+
+def test_writer_partitions_by_day_and_skips_exported_calls(tmp_path):
+    root = str(tmp_path / "parquet")
+    with ParquetResultWriter(root, rows_per_file=4) as writer:
+        assert writer.add(FINAL, "run-1", recorded_at=1_790_000_000)
+        assert writer.add(FINAL, "run-2", recorded_at=1_790_100_000)
+        assert not writer.add(FINAL, "run-1")
+    assert writer.rows_written == 6
+    assert sorted(os.listdir(root)) == ["call_date=2026-09-21", "call_date=2026-09-22"]
+
+    with ParquetResultWriter(root) as writer:
+        assert not writer.add(FINAL, "run-2")
+        assert writer.add(FINAL, "run-3", recorded_at=1_790_100_000)
+    assert writer.rows_written == 3
+    assert exported_call_ids(root) == {"run-1", "run-2", "run-3"}
+    assert _read(root).num_rows == 9
+
+
+def test_export_output_root_uses_directory_names_as_call_ids(tmp_path):
+    output_root = tmp_path / "batch"
+    for call_id in ("job1", "job2"):
+        (output_root / call_id).mkdir(parents=True)
+        (output_root / call_id / "final_output.json").write_text(json.dumps(FINAL))
+    root = str(tmp_path / "parquet")
+
+    assert export_output_root(str(output_root), root) == 6
+    assert export_output_root(str(output_root), root) == 0
+    assert sorted(set(_read(root).column("call_id").to_pylist())) == ["job1", "job2"]
@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+import pipeline_jobs
+from pipeline_jobs import PipelineJobExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = PipelineJobExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def _wait(executor, job_id, finished):
+    assert finished.wait(5)
+    executor.shutdown()
+    return executor.get(job_id)
+
+
+def test_on_finish_runs_after_a_successful_job(executor, monkeypatch):
+    monkeypatch.setattr(pipeline_jobs, "run_pipeline", lambda on_stage, on_transcript, **kwargs: ("result", kwargs))
+    finished = threading.Event()
+
+    job_id = executor.submit(on_finish=finished.set, audio_path="call.m4a")
+    job = _wait(executor, job_id, finished)
+
+    assert job.status == "done"
+    assert job.result == ("result", {"audio_path": "call.m4a"})
+
+
+def test_on_finish_runs_after_a_failed_job(executor, monkeypatch):
+    def fail(on_stage, on_transcript, **kwargs):
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(pipeline_jobs, "run_pipeline", fail)
+    finished = threading.Event()
+
+    job_id = executor.submit(on_finish=finished.set)
+    job = _wait(executor, job_id, finished)
+
+    assert job.status == "failed"
+    assert job.error == "quota exceeded"
+
+
+def test_failing_on_finish_does_not_change_the_job(executor, monkeypatch):
+    monkeypatch.setattr(pipeline_jobs, "run_pipeline", lambda on_stage, on_transcript, **kwargs: "result")
+
+    def on_finish():
+        raise OSError("index locked")
+
+    job_id = executor.submit(on_finish=on_finish)
+    executor.shutdown()
+
+    assert executor.get(job_id).status == "done"
@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from pipeline_pool import PipelinePool
+
+
+class FakePipeline:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def credentials(tmp_path, monkeypatch):
+    # The pool points GOOGLE_APPLICATION_CREDENTIALS at the file; restore it afterwards
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+    path = tmp_path / "credentials.json"
+    path.write_text('{"type": "service_account"}')
+    return str(path)
+
+
+def test_pipelines_are_reused_by_credentials_content(credentials, tmp_path):
+    pool = PipelinePool(factory=FakePipeline, health_check=None)
+    copy = tmp_path / "copy.json"
+    copy.write_text(open(credentials).read())
+
+    first = pool.get(credentials, project_id="p")
+    assert pool.get(str(copy), project_id="p") is first
+    assert pool.get(credentials, project_id="other") is not first
+    assert len(pool) == 2
+
+
+def test_leased_pipeline_is_not_evicted(credentials):
+    pool = PipelinePool(max_idle_seconds=0, factory=FakePipeline, health_check=None)
+
+    with pool.lease(credentials, project_id="p") as pipeline:
+        assert pool.evict_idle() == 0
+        assert not pipeline.closed
+    assert pool.evict_idle() == 1
+    assert pipeline.closed
+    assert len(pool) == 0
+
+
+def test_retired_pipeline_closes_when_last_lease_ends(credentials):
+    pool = PipelinePool(factory=FakePipeline, health_check=None)
+    first = pool.acquire(credentials, project_id="p")
+    second = pool.acquire(credentials, project_id="p")
+    assert first is second
+
+    pool.clear()
+    assert len(pool) == 0
+    pool.release(first)
+    assert not first.closed
+    pool.release(second)
+    assert first.closed
+    with pytest.raises(ValueError):
+        pool.release(first)
+
+
+def test_failed_health_check_replaces_pipeline_without_closing_running_calls(credentials):
+    healthy = {"ok": True}
+
+    def health_check(pipeline):
+        if not healthy["ok"]:
+            raise RuntimeError("credentials revoked")
+
+    pool = PipelinePool(health_check_interval=0, factory=FakePipeline, health_check=health_check)
+    running = pool.acquire(credentials, project_id="p")
+
+    healthy["ok"] = False
+    replacement = pool.acquire(credentials, project_id="p")
+    assert replacement is not running
+    assert not running.closed
+
+    pool.release(running)
+    assert running.closed
+    pool.release(replacement)
+    assert not replacement.closed
+
+
+def test_concurrent_acquire_builds_one_pipeline(credentials):
+    built = []
+
+    def factory(**kwargs):
+        pipeline = FakePipeline(**kwargs)
+        built.append(pipeline)
+        return pipeline
+
+    pool = PipelinePool(factory=factory, health_check=None)
+    barrier = threading.Barrier(8)
+    leased = []
+
+    def worker():
+        barrier.wait()
+        leased.append(pool.acquire(credentials, project_id="p"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    kept = leased[0]
+    assert all(pipeline is kept for pipeline in leased)
+    # Duplicates built by racing threads are closed, the pooled one stays open
+    assert [pipeline.closed for pipeline in built].count(False) == 1
+    for pipeline in leased:
+        pool.release(pipeline)
+    assert not kept.closed
@@ -0,0 +1,132 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+import rate_limiter
+from rate_limiter import WINDOW_SECONDS, ModelRateLimiter, RateLimit, _MemoryState, _SqliteState
+
+
+class FakeClock:
+    """Replaces the module's time: sleeping advances the clock instead of blocking"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self._lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.now += max(0.0, seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def _max_in_window(times, weights=None):
+    weights = weights or [1] * len(times)
+    return max(
+        sum(weight for other, weight in zip(times, weights) if start <= other < start + WINDOW_SECONDS)
+        for start in times
+    )
+
+
+def _send(limiter, clock, sent, tokens=None):
+    def request():
+        sent.append(clock.time())
+        return SimpleNamespace(usage_metadata=SimpleNamespace(total_token_count=tokens or 0))
+
+    return limiter.call("models/gemini-flash", ["prompt"], request)
+
+
+def test_requests_never_exceed_rpm_in_any_window(clock):
+    limiter = ModelRateLimiter(default_limit=RateLimit(requests_per_minute=20), estimate=lambda contents: 1)
+    sent = []
+    for _ in range(65):
+        _send(limiter, clock, sent)
+
+    assert len(sent) == 65
+    assert _max_in_window(sent) == 20
+    # Bursts go out at once, then one request per freed slot
+    assert sent[19] == sent[0]
+    assert sent[20] == pytest.approx(sent[0] + WINDOW_SECONDS)
+
+
+def test_tokens_never_exceed_tpm_in_any_window(clock):
+    limiter = ModelRateLimiter(default_limit=RateLimit(tokens_per_minute=1000), estimate=lambda contents: 400)
+    sent = []
+    for _ in range(10):
+        _send(limiter, clock, sent)
+
+    assert _max_in_window(sent, [400] * len(sent)) <= 1000
+
+
+def test_actual_usage_replaces_the_estimate(clock):
+    limiter = ModelRateLimiter(default_limit=RateLimit(tokens_per_minute=1000), estimate=lambda contents: 400)
+    sent = []
+    for _ in range(5):
+        _send(limiter, clock, sent, tokens=100)
+
+    # Each call really used 100 tokens, so all five fit in the first window
+    assert sent == [sent[0]] * 5
+
+
+def test_rejected_request_frees_its_slot(clock):
+    limiter = ModelRateLimiter(default_limit=RateLimit(requests_per_minute=1), estimate=lambda contents: 1,
+                               max_retries=1)
+    attempts = []
+
+    def request():
+        attempts.append(clock.time())
+        if len(attempts) == 1:
+            raise google_exceptions.ServiceUnavailable("overloaded")
+        return SimpleNamespace(usage_metadata=None)
+
+    limiter.call("gemini-flash", ["prompt"], request)
+    # The retry is not held back a whole window by the failed attempt's reservation
+    assert attempts[1] - attempts[0] < WINDOW_SECONDS
+
+
+def test_quota_error_blocks_every_caller(clock):
+    limiter = ModelRateLimiter(max_retries=1)
+    attempts = []
+
+    def request():
+        attempts.append(clock.time())
+        if len(attempts) == 1:
+            raise google_exceptions.TooManyRequests("quota exceeded, retry in 7s")
+        return SimpleNamespace(usage_metadata=None)
+
+    limiter.call("gemini-flash", ["prompt"], request)
+    assert attempts[1] - attempts[0] == pytest.approx(7)
+    wait, _ = limiter._reserve("gemini-flash", 1)
+    assert wait == 0
+
+
+def test_processes_share_the_window_through_sqlite(clock, tmp_path):
+    state_path = str(tmp_path / "rate_limits.sqlite")
+    workers = [
+        ModelRateLimiter(default_limit=RateLimit(requests_per_minute=10), state_path=state_path,
+                         estimate=lambda contents: 1)
+        for _ in range(2)
+    ]
+    assert all(isinstance(worker._state, _SqliteState) for worker in workers)
+
+    sent = []
+    for i in range(30):
+        _send(workers[i % 2], clock, sent)
+    assert _max_in_window(sent) == 10
+
+
+def test_unlimited_limiter_keeps_state_in_memory(tmp_path):
+    limiter = ModelRateLimiter(state_path=str(tmp_path / "rate_limits.sqlite"))
+
+    assert isinstance(limiter._state, _MemoryState)
+    assert not (tmp_path / "rate_limits.sqlite").exists()
@@ -0,0 +1,44 @@
+import os
+import time
+
+from result_cache import StageCache
+
+
+def _key(n):
+    return StageCache.make_key(f"input-{n}", "prompt", "gemini-flash", {"temperature": 0})
+
+
+def test_make_key_changes_with_every_part():
+    key = StageCache.make_key("input", "prompt", "gemini-flash", {"temperature": 0})
+
+    assert key == StageCache.make_key("input", "prompt", "gemini-flash", {"temperature": 0})
+    assert key != StageCache.make_key("other", "prompt", "gemini-flash", {"temperature": 0})
+    assert key != StageCache.make_key("input", "prompt 2", "gemini-flash", {"temperature": 0})
+    assert key != StageCache.make_key("input", "prompt", "gemini-pro", {"temperature": 0})
+    assert key != StageCache.make_key("input", "prompt", "gemini-flash", {"temperature": 1})
+
+
+def test_overwriting_an_entry_does_not_inflate_the_total(tmp_path):
+    cache = StageCache(str(tmp_path), max_bytes=1000)
+    cache.put(_key(0), "a" * 100)
+    for _ in range(50):
+        cache.put(_key(1), "b" * 100)
+
+    assert cache._total_bytes == cache._scan_size() == 200
+    assert cache.get(_key(0)) == "a" * 100
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = StageCache(str(tmp_path), max_bytes=1000)
+    for n in range(5):
+        cache.put(_key(n), str(n) * 200)
+        path = cache._entry_path(_key(n))
+        os.utime(path, (time.time() - 100 + n, time.time() - 100 + n))
+    assert cache.get(_key(0)) is not None  # refreshes entry 0
+
+    cache.put(_key(5), "5" * 200)
+
+    assert cache.get(_key(1)) is None
+    assert cache.get(_key(2)) is None
+    assert all(cache.get(_key(n)) is not None for n in (0, 3, 4, 5))
+    assert cache._total_bytes <= 900
@@ -0,0 +1,85 @@
+import json
+import random
+
+import pytest
+
+from transcript_stream import TranscriptStreamParser
+
+
+TURNS = [
+    {"Speaker": "Agent", "Timestamp": "00:00 - 00:04", "Text": "Hello, this is a {survey} call [recorded]."},
+    {"Speaker": "Customer", "Timestamp": "00:04 - 00:07", "Text": "Sure, \"go ahead\" \\ ask away."},
+    {"Speaker": "Agent", "Timestamp": "00:07 - 00:12", "Text": "Question one: which party? }]"},
+]
+
+RESPONSE = "```json\n" + json.dumps(
+    {"Call Details": {"Language": "en", "Transcript": TURNS, "Notes": [{"ignored": True}]}}, indent=2
+) + "\n```"
+
+
+def _feed_in_pieces(parser, text, sizes):
+    completed = []
+    position = 0
+    for size in sizes:
+        completed.extend(parser.feed(text[position:position + size]))
+        position += size
+    completed.extend(parser.feed(text[position:]))
+    return completed
+
+
+def test_whole_response_at_once():
+    parser = TranscriptStreamParser()
+
+    assert parser.feed(RESPONSE) == TURNS
+    assert parser.turns == TURNS
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_any_chunking_gives_the_same_turns(seed):
+    rng = random.Random(seed)
+    sizes = [rng.randint(1, 12) for _ in range(len(RESPONSE))]
+    parser = TranscriptStreamParser()
+
+    assert _feed_in_pieces(parser, RESPONSE, sizes) == TURNS
+    assert parser.turns == TURNS
+
+
+def test_turns_are_reported_as_soon_as_they_close():
+    parser = TranscriptStreamParser()
+    first_end = RESPONSE.index("}", RESPONSE.index('[recorded]."')) + 1
+
+    assert parser.feed(RESPONSE[:first_end - 1]) == []
+    assert parser.feed(RESPONSE[first_end - 1:first_end]) == TURNS[:1]
+
+
+def test_only_the_open_turn_is_buffered():
+    parser = TranscriptStreamParser()
+    long_text = json.dumps({"Transcript": [{"Text": "x" * 50}] * 2000})
+    for i in range(0, len(long_text), 7):
+        parser.feed(long_text[i:i + 7])
+        assert len(parser._text) <= 200
+
+    assert len(parser.turns) == 2000
+
+
+def test_key_split_across_chunks_is_found():
+    parser = TranscriptStreamParser()
+    text = '{"Trans' + 'cript"  :  ' + json.dumps(TURNS) + "}"
+
+    assert _feed_in_pieces(parser, text, [3, 4, 5]) == TURNS
+
+
+def test_malformed_turn_is_skipped():
+    parser = TranscriptStreamParser()
+    text = '{"Transcript": [{"Speaker": "Agent", "Text": "ok"}, {"Speaker": Agent}, {"Speaker": "Customer"}]}'
+
+    assert parser.feed(text) == [{"Speaker": "Agent", "Text": "ok"}, {"Speaker": "Customer"}]
+
+
+def test_reset_starts_over_for_a_retried_request():
+    parser = TranscriptStreamParser()
+    parser.feed(RESPONSE[:len(RESPONSE) // 2])
+    parser.reset()
+
+    assert parser.turns == []
+    assert parser.feed(RESPONSE) == TURNS
@@ -0,0 +1,85 @@
+import json
+import re
+from typing import Any, Dict, List
+
+
+# Key whose array value holds the turns, immediately before its opening bracket
+_TRANSCRIPT_KEY = re.compile(r'"(?:Transcript|transcript)"\s*:\s*$')
+_LOOK_BACK = 64
+
+
+class TranscriptStreamParser:
+    """
+    Incremental parser pulling complete turns out of a partial transcript JSON
+
+    Feed it each chunk of the model's output as it streams in; each object of
+    the "Transcript" array is parsed as soon as its closing brace arrives.
+    Every character is scanned once and only the unfinished turn (plus a
+    short look-back for the "Transcript" key) is kept, so a whole response
+    costs time linear in its length. Text around the JSON (such as a
+    ```json fence) is ignored. Call ``reset`` when the response starts over
+    (the request was retried).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything fed so far"""
+        self.turns: List[Dict[str, Any]] = []
+        self._text = ""  # unconsumed tail: the open turn, or the look-back for the key
+        self._stack: List[str] = []  # "{", "[" or "T" for the transcript array
+        self._in_string = False
+        self._escape = False
+        self._turn_start = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Advance by ``chunk`` (the output received since the previous call)
+
+        Returns:
+            Turns completed by this chunk (also appended to ``turns``)
+        """
+        start = len(self._text)
+        text = self._text + chunk
+        completed = []
+        for i in range(start, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "[" and _TRANSCRIPT_KEY.search(text, max(0, i - _LOOK_BACK), i):
+                self._stack.append("T")
+            elif char in "{[":
+                if char == "{" and self._stack and self._stack[-1] == "T":
+                    self._turn_start = i
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if char == "}" and self._turn_start is not None and self._stack and self._stack[-1] == "T":
+                    turn = self._parse_turn(text[self._turn_start:i + 1])
+                    self._turn_start = None
+                    if turn is not None:
+                        self.turns.append(turn)
+                        completed.append(turn)
+        keep = max(0, len(text) - _LOOK_BACK)
+        if self._turn_start is not None:
+            keep = min(keep, self._turn_start)
+            self._turn_start -= keep
+        self._text = text[keep:]
+        return completed
+
+    @staticmethod
+    def _parse_turn(text: str):
+        try:
+            turn = json.loads(text)
+        except ValueError:
+            # Malformed turn: skipped here, the final parse of the full output decides
+            return None
+        return turn if isinstance(turn, dict) else None
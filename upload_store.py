@@ -0,0 +1,64 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import BinaryIO, Optional, Tuple
+
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+_SAFE_SUFFIX = re.compile(r"\.[a-z0-9]{1,8}")
+
+
+class UploadStore:
+    """
+    Content-addressed store for uploaded files
+
+    Uploads are copied to disk ``chunk_size`` bytes at a time and hashed on
+    the way, so nothing beyond one chunk is held next to the source. Each
+    distinct content is kept once as ``<sha256><suffix>`` under ``root``;
+    saving it again returns the existing file and refreshes its mtime.
+    """
+
+    def __init__(self, root: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.root = root
+        self.chunk_size = chunk_size
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, sha256: str, suffix: str = "") -> str:
+        suffix = suffix.lower()
+        return os.path.join(self.root, sha256 + (suffix if _SAFE_SUFFIX.fullmatch(suffix) else ""))
+
+    def save(self, source: BinaryIO, suffix: str = "") -> Tuple[str, str]:
+        """
+        Stream ``source`` (a binary file object) into the store
+
+        Returns:
+            Tuple of (stored path, SHA-256 of the content)
+        """
+        if source.seekable():
+            source.seek(0)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: source.read(self.chunk_size), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            path = self.path_for(sha256, suffix)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                os.utime(path, None)
+            else:
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path, sha256
+
+    def find(self, sha256: str, suffix: str = "") -> Optional[str]:
+        """Stored path for content already uploaded, or None"""
+        path = self.path_for(sha256, suffix)
+        return path if os.path.exists(path) else None